@@ -15,9 +15,174 @@ RELEVANCE_THRESHOLD = float(os.getenv("RELEVANCE_THRESHOLD", "70.0"))  # Minimum
 # Scraping configurations
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 REQUEST_TIMEOUT = 30  # seconds
-SCRAPING_DELAY = 2  # seconds between requests
+SCRAPING_DELAY = float(os.getenv("SCRAPING_DELAY", "2"))  # seconds between requests to hosts without their own rate below
 
 # Source URLs
 LINKEDIN_JOBS_URL = "https://www.linkedin.com/jobs/search"
 INDEED_JOBS_URL = "https://www.indeed.com/jobs"
-GLASSDOOR_JOBS_URL = "https://www.glassdoor.com/Job/jobs.htm"
\ No newline at end of file
+GLASSDOOR_JOBS_URL = "https://www.glassdoor.com/Job/jobs.htm"
+# Upstream API endpoints; overridable to point the scrapers at local stand-ins (see benchmarks/)
+LINKEDIN_GUEST_API_URL = os.getenv(
+    "LINKEDIN_GUEST_API_URL", "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+)
+LINKEDIN_JOB_POSTING_URL = os.getenv(
+    "LINKEDIN_JOB_POSTING_URL", "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting"
+)
+SCRAPERAPI_URL = os.getenv("SCRAPERAPI_URL", "http://api.scraperapi.com")
+APIFY_API_URL = os.getenv("APIFY_API_URL", "https://api.apify.com")
+
+# Source orchestration
+# Comma-separated list of sources queried by /search-jobs (linkedin, glassdoor, indeed)
+ENABLED_SOURCES = [
+    name.strip().lower()
+    for name in os.getenv("ENABLED_SOURCES", "linkedin,glassdoor").split(",")
+    if name.strip()
+]
+# Per-source latency budget in seconds; a source that misses it is reported as timed out
+SOURCE_TIMEOUTS = {
+    "linkedin": float(os.getenv("LINKEDIN_TIMEOUT", "20")),
+    "glassdoor": float(os.getenv("GLASSDOOR_TIMEOUT", "20")),
+    "indeed": float(os.getenv("INDEED_TIMEOUT", "25")),
+}
+DEFAULT_SOURCE_TIMEOUT = float(os.getenv("DEFAULT_SOURCE_TIMEOUT", "20"))
+# Listings a search collects across all sources before pagination stops (0 = no shared target;
+# a request's max_results overrides it)
+SEARCH_TARGET_RESULTS = int(os.getenv("SEARCH_TARGET_RESULTS", "0"))
+
+# LinkedIn scraping
+LINKEDIN_ASYNC = os.getenv("LINKEDIN_ASYNC", "true").lower() == "true"  # False falls back to the threaded requests scraper
+LINKEDIN_PAGE_CONCURRENCY = int(os.getenv("LINKEDIN_PAGE_CONCURRENCY", "3"))  # Result pages fetched at the same time
+LINKEDIN_REQUESTS_PER_SECOND = float(os.getenv("LINKEDIN_REQUESTS_PER_SECOND", "1.0"))  # Shared across all searches
+
+# Indeed (Apify)
+INDEED_DATASET_PAGE_SIZE = int(os.getenv("INDEED_DATASET_PAGE_SIZE", "25"))  # Dataset items read (and converted) per request
+# Seconds the dataset of a finished actor run is reused for identical run inputs instead of starting a new run (0 disables)
+INDEED_RUN_REUSE_TTL = float(os.getenv("INDEED_RUN_REUSE_TTL", "3600"))
+
+# Shared HTTP connection pool (one pooled client per upstream)
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))  # Per upstream
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))  # Idle connections kept open per upstream
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))  # seconds
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "10"))  # Max seconds to wait for a free connection
+
+# Source result cache
+SOURCE_CACHE_ENABLED = os.getenv("SOURCE_CACHE_ENABLED", "true").lower() == "true"
+SOURCE_CACHE_MAX_ENTRIES = int(os.getenv("SOURCE_CACHE_MAX_ENTRIES", "512"))  # In-process LRU size
+SOURCE_CACHE_SQLITE_PATH = os.getenv("SOURCE_CACHE_SQLITE_PATH", "")  # Empty disables the on-disk tier
+# Seconds a source's results stay fresh
+SOURCE_CACHE_TTLS = {
+    "linkedin": float(os.getenv("LINKEDIN_CACHE_TTL", "900")),
+    "glassdoor": float(os.getenv("GLASSDOOR_CACHE_TTL", "1800")),
+    "indeed": float(os.getenv("INDEED_CACHE_TTL", "3600")),
+}
+DEFAULT_SOURCE_CACHE_TTL = float(os.getenv("DEFAULT_SOURCE_CACHE_TTL", "900"))
+
+# LLM relevance verdict cache, keyed on (candidate profile, apply_link)
+RELEVANCE_CACHE_ENABLED = os.getenv("RELEVANCE_CACHE_ENABLED", "true").lower() == "true"
+RELEVANCE_CACHE_MAX_ENTRIES = int(os.getenv("RELEVANCE_CACHE_MAX_ENTRIES", "20000"))
+RELEVANCE_CACHE_TTL = float(os.getenv("RELEVANCE_CACHE_TTL", "21600"))  # seconds
+
+# LLM filtering
+LLM_CHUNK_SIZE = int(os.getenv("LLM_CHUNK_SIZE", "25"))  # Jobs per Gemini prompt
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))  # Chunks scored at the same time per search
+LLM_BATCH_PROFILES = int(os.getenv("LLM_BATCH_PROFILES", "8"))  # Candidate profiles scored per Gemini prompt in batch searches
+
+# Local relevance ranking (BM25)
+# off: LLM only; prefilter: only the RANKER_TOP_K best-ranked jobs go to the LLM; replace: rank locally, no LLM
+RANKER_MODE = os.getenv("RANKER_MODE", "prefilter").lower()
+RANKER_TOP_K = int(os.getenv("RANKER_TOP_K", "50"))
+
+# Batch searches (POST /search-jobs/batch)
+BATCH_MAX_SEARCHES = int(os.getenv("BATCH_MAX_SEARCHES", "100"))  # Searches accepted in one batch
+
+# Admission control: searches beyond ADMISSION_MAX_SEARCHES wait in a short priority queue, and are turned
+# away with 429 (queue full) or 503 (no slot within ADMISSION_QUEUE_TIMEOUT) and a Retry-After header
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_MAX_SEARCHES = int(os.getenv("ADMISSION_MAX_SEARCHES", "32"))  # /search-jobs, stream and batch requests running at once
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))  # Seconds a search may wait for a slot
+# Per-stage limits shared by every search, background ones included (0 = unlimited); waiters are served by priority
+ADMISSION_SOURCE_CONCURRENCY = int(os.getenv("ADMISSION_SOURCE_CONCURRENCY", "16"))  # Upstream source fetches
+ADMISSION_LLM_CONCURRENCY = int(os.getenv("ADMISSION_LLM_CONCURRENCY", "16"))  # Gemini calls
+ADMISSION_ENRICH_CONCURRENCY = int(os.getenv("ADMISSION_ENRICH_CONCURRENCY", "8"))  # Searches enriching postings
+
+# Background search queue (POST /searches)
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "4"))  # Searches processed at the same time
+SEARCH_QUEUE_MAX_PENDING = int(os.getenv("SEARCH_QUEUE_MAX_PENDING", "100"))  # Further submissions are rejected
+SEARCH_RESULT_TTL = float(os.getenv("SEARCH_RESULT_TTL", "3600"))  # Seconds finished searches stay pollable
+# Background searches can wait on slow sources such as Indeed (Apify)
+SEARCH_QUEUE_SOURCES = [
+    name.strip().lower()
+    for name in os.getenv("SEARCH_QUEUE_SOURCES", "linkedin,glassdoor,indeed").split(",")
+    if name.strip()
+]
+SEARCH_QUEUE_SOURCE_TIMEOUT = float(os.getenv("SEARCH_QUEUE_SOURCE_TIMEOUT", "300"))
+
+# Cross-source deduplication
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_SIMILARITY = float(os.getenv("DEDUP_SIMILARITY", "0.8"))  # Min estimated Jaccard of (title, company, location) shingles
+MINHASH_PERMUTATIONS = int(os.getenv("MINHASH_PERMUTATIONS", "64"))
+MINHASH_BANDS = int(os.getenv("MINHASH_BANDS", "16"))  # LSH bands; must divide MINHASH_PERMUTATIONS
+
+# HTML parsing process pool (0 parses inline on the event loop)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Startup: source modules and the Gemini SDK are imported lazily; with STARTUP_WARMUP the enabled ones are
+# loaded in a background thread as soon as the app starts serving, instead of on the first search
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+
+# Per-host adaptive rate limiting and circuit breaking (keyed on the registrable domain)
+HOST_REQUESTS_PER_SECOND = {
+    "linkedin.com": LINKEDIN_REQUESTS_PER_SECOND,
+    "scraperapi.com": float(os.getenv("SCRAPERAPI_REQUESTS_PER_SECOND", "5")),
+    "apify.com": float(os.getenv("APIFY_REQUESTS_PER_SECOND", "2")),
+}
+# Extra or overriding host rates as "host=rate,host=rate" (e.g. "127.0.0.1=500" for local stand-ins)
+HOST_REQUESTS_PER_SECOND.update(
+    (host.strip().lower(), float(rate))
+    for host, _, rate in (item.partition("=") for item in os.getenv("HOST_RATE_LIMITS", "").split(","))
+    if host.strip() and rate.strip()
+)
+RATE_LIMIT_MAX_MULTIPLIER = float(os.getenv("RATE_LIMIT_MAX_MULTIPLIER", "2"))  # How far above its base rate a host may be probed
+RATE_LIMIT_MIN_MULTIPLIER = float(os.getenv("RATE_LIMIT_MIN_MULTIPLIER", "0.0625"))  # Floor after repeated 429s
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))  # Consecutive failures before failing fast
+CIRCUIT_COOLDOWN = float(os.getenv("CIRCUIT_COOLDOWN", "30"))  # seconds
+
+# Detail-page enrichment: read each listing's real salary, experience and job nature from its posting page
+ENRICHMENT_ENABLED = os.getenv("ENRICHMENT_ENABLED", "false").lower() == "true"
+# Sources whose listings are enriched; Glassdoor detail pages cost a ScraperAPI credit each
+ENRICHMENT_SOURCES = [s.strip().lower() for s in os.getenv("ENRICHMENT_SOURCES", "linkedin,glassdoor").split(",") if s.strip()]
+ENRICHMENT_TIME_BUDGET = float(os.getenv("ENRICHMENT_TIME_BUDGET", "3"))  # Seconds a search may spend enriching
+ENRICHMENT_MAX_JOBS = int(os.getenv("ENRICHMENT_MAX_JOBS", "50"))  # Listings enriched per search
+ENRICHMENT_CONCURRENCY = int(os.getenv("ENRICHMENT_CONCURRENCY", "4"))  # Detail pages fetched at the same time per host
+ENRICHMENT_CACHE_MAX_ENTRIES = int(os.getenv("ENRICHMENT_CACHE_MAX_ENTRIES", "5000"))
+ENRICHMENT_CACHE_TTL = float(os.getenv("ENRICHMENT_CACHE_TTL", "86400"))  # seconds
+
+# Hedged requests (async clients only): a GET slower than its host's recent latency percentile is sent again
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+HEDGE_HOSTS = [h.strip().lower() for h in os.getenv("HEDGE_HOSTS", "linkedin.com,scraperapi.com").split(",") if h.strip()]
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))  # Latency percentile after which a hedge is sent
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "1.0"))  # Never hedge sooner than this many seconds
+HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.05"))  # Max share of a host's requests that are hedged
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "200"))  # Recent responses per host the percentile is taken over
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))  # Responses seen before a host is hedged at all
+
+# Background crawler feeding a local job index that /search-jobs answers from
+CRAWLER_ENABLED = os.getenv("CRAWLER_ENABLED", "false").lower() == "true"
+# Popular queries to keep fresh: "position|location" pairs separated by ";"
+CRAWLER_QUERIES = [
+    tuple(part.strip() for part in query.split("|", 1)) if "|" in query else (query.strip(), "")
+    for query in os.getenv("CRAWLER_QUERIES", "").split(";")
+    if query.strip()
+]
+CRAWLER_SOURCES = [s.strip() for s in os.getenv("CRAWLER_SOURCES", "linkedin,glassdoor").split(",") if s.strip()]
+CRAWLER_INTERVAL = float(os.getenv("CRAWLER_INTERVAL", "1800"))  # seconds between crawl rounds
+CRAWLER_MAX_ITEMS = int(os.getenv("CRAWLER_MAX_ITEMS", "50"))  # Listings per source per query and round
+JOB_INDEX_PATH = os.getenv("JOB_INDEX_PATH", "job_index.sqlite3")
+JOB_INDEX_MAX_AGE = float(os.getenv("JOB_INDEX_MAX_AGE", "86400"))  # Postings not seen for this long are not served
+JOB_INDEX_MIN_RESULTS = int(os.getenv("JOB_INDEX_MIN_RESULTS", "5"))  # Fewer matches than this count as a miss
+
+# Logging: level for the app's loggers and "text" or "json" (one object per line) output
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
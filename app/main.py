@@ -1,16 +1,94 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import List
+
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.config import (
+    BATCH_MAX_SEARCHES,
+    DEDUP_ENABLED,
+    ENABLED_SOURCES,
+    ENRICHMENT_ENABLED,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    SEARCH_QUEUE_SOURCES,
+)
+from app.models.listing import Listing
+from app.models.schemas import (
+    JobSearchBatchRequest,
+    JobSearchBatchResponse,
+    JobSearchRequest,
+    JobSearchResponse,
+    SearchProgress,
+    SearchSubmitted,
+    SourceStatus,
+)
+from app.services import hedging, http_pool, rate_limit
+from app.services.admission import PRIORITY_BATCH, PRIORITY_INTERACTIVE, AdmissionRejected, admission
+from app.services.batch import search_batch
+from app.services.cache import source_cache
+from app.services.crawler import crawler
+from app.services.dedup import deduplicate_jobs
+from app.services.enrichment import enricher
+from app.services.llm_service import filter_relevant_jobs, relevance_cache
+from app.services.parse_pool import parse_pool
+from app.services.orchestrator import RUNNING, fetch_all_sources, stream_sources
+from app.services.search_queue import QueueFullError, search_queue
+from app.services.sources import REGISTRY
+from app.services.telemetry import configure_logging, render_metrics, span
+from app.services.warmup import warmup
+
+configure_logging(LOG_LEVEL, LOG_FORMAT)
+logger = logging.getLogger("app.main")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await parse_pool.start()
+    search_queue.start()
+    crawler.start()
+    # Sources and the Gemini SDK load lazily; get the enabled ones in while the first requests are served
+    warmup.start(ENABLED_SOURCES + SEARCH_QUEUE_SOURCES + (crawler.sources if crawler.index is not None else []))
+    yield
+    await warmup.stop()
+    await crawler.stop()
+    await search_queue.stop()
+    parse_pool.shutdown()
+    # Release pooled upstream connections on shutdown
+    await http_pool.aclose()
+    source_cache.close()
+    if crawler.index is not None:
+        crawler.index.close()
 
-from app.models.schemas import JobSearchRequest, JobSearchResponse
-from app.services import linkedin, indeed, glassdoor
-from app.services.llm_service import filter_relevant_jobs
+def _search_result(relevant_jobs: List[Listing], source_statuses: List[SourceStatus]) -> dict:
+    # Listings take the public JobListing shape only here, at the response boundary
+    return {
+        "relevant_jobs": [job.to_dict() for job in relevant_jobs],
+        "sources": [status.model_dump() for status in source_statuses],
+    }
+
+def _json_response(content: dict) -> Response:
+    # Search results are already plain data, so skip response_model re-validation and encode with orjson
+    return Response(orjson.dumps(content), media_type="application/json")
 
 app = FastAPI(
     title="Job Finder API",
     description="API that fetches and filters relevant job listings from multiple sources",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request, exc: AdmissionRejected):
+    # Saturated: answer at once and tell the client when capacity is likely to be back
+    return JSONResponse(
+        status_code=exc.status_code, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -24,27 +102,140 @@ app.add_middleware(
 async def root():
     return {"message": "Welcome to the Job Finder API"}
 
+@app.get("/stats")
+async def stats():
+    return {
+        "http_pool": http_pool.get_stats(),
+        "source_cache": source_cache.stats(),
+        "relevance_cache": relevance_cache.stats(),
+        "search_queue": search_queue.stats(),
+        "parse_pool": parse_pool.stats(),
+        "crawler": crawler.stats(),
+        "hedging": hedging.get_stats(),
+        "enrichment": enricher.stats(),
+        "warmup": warmup.stats(),
+        "admission": admission.stats(),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/sources")
+async def sources():
+    return [plugin.describe() for plugin in REGISTRY.values()]
+
+@app.get("/rate-limits")
+async def rate_limits():
+    return rate_limit.get_stats()
+
 @app.post("/search-jobs", response_model=JobSearchResponse)
 async def search_jobs(request: JobSearchRequest):
-    try:
-        # Fetch jobs from different sources
-        linkedin_jobs = await linkedin.fetch_linkedin_jobs(request)
-        #NOTE: The apify api takes too much time to respond that's why it has been commented out but the code is functional and properly working.
-        # indeed_jobs = await indeed.fetch_jobs(request)
-        glassdoor_jobs = await glassdoor.fetch_glassdoor_jobs(request)
-
-        # Combine all job listings
-        all_jobs = linkedin_jobs + glassdoor_jobs  # add indeed_jobs here
-        print(all_jobs)
-        print(f"Total jobs from all sources before filtering: {len(all_jobs)}")
-
-        # Filter jobs by relevance using LLM
-        relevant_jobs = await filter_relevant_jobs(request, all_jobs)
-        
-        return JobSearchResponse(relevant_jobs=relevant_jobs)
+    # Turned away with 429/503 and Retry-After when too many searches are running or waiting
+    with await admission.admit(PRIORITY_INTERACTIVE):
+        try:
+            # One trace per search; every stage below logs and measures under it
+            with span("search"):
+                # Fetch jobs from the request's sources (or ENABLED_SOURCES) concurrently, each under its own deadline.
+                #NOTE: Indeed (Apify) is slow and paid, so it is off by default; pick it per request or add it to ENABLED_SOURCES.
+                # Crawled queries are answered from the local index; anything else is scraped live
+                indexed = await crawler.search(request)
+                if indexed is not None:
+                    all_jobs, index_status = indexed
+                    source_statuses = [index_status]
+                else:
+                    all_jobs, source_statuses = await fetch_all_sources(request)
+                logger.info("Total jobs from all sources before filtering: %d", len(all_jobs))
+
+                # The same posting often appears more than once across sources
+                if DEDUP_ENABLED:
+                    all_jobs = deduplicate_jobs(all_jobs)
+
+                # Result pages lack real salary/experience/job nature; read them from the postings
+                if ENRICHMENT_ENABLED:
+                    all_jobs = await enricher.enrich(all_jobs)
+
+                # Filter jobs by relevance using LLM
+                relevant_jobs = await filter_relevant_jobs(request, all_jobs)
+
+            return _json_response(_search_result(relevant_jobs, source_statuses))
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error searching jobs: {str(e)}")
+        except Exception as e:
+            logger.exception("Search failed")
+            raise HTTPException(status_code=500, detail=f"Error searching jobs: {str(e)}")
+
+@app.post("/search-jobs/batch", response_model=JobSearchBatchResponse)
+async def search_jobs_batch(batch: JobSearchBatchRequest):
+    """
+    /search-jobs for many candidate profiles at once. Profiles with the same
+    position and location share one scrape, and are scored together in as few
+    LLM calls as LLM_CHUNK_SIZE and LLM_BATCH_PROFILES allow.
+    """
+    if len(batch.searches) > BATCH_MAX_SEARCHES:
+        raise HTTPException(status_code=422, detail=f"At most {BATCH_MAX_SEARCHES} searches per batch")
+    # One search slot for the whole batch; its fetches and LLM calls queue behind interactive searches
+    with await admission.admit(PRIORITY_BATCH):
+        try:
+            results = await search_batch(batch.searches)
+        except Exception as e:
+            logger.exception("Batch search failed")
+            raise HTTPException(status_code=500, detail=f"Error searching jobs: {str(e)}")
+    return _json_response({"results": [_search_result(jobs, statuses) for jobs, statuses in results]})
+
+@app.post("/search-jobs/stream")
+async def search_jobs_stream(request: JobSearchRequest):
+    """
+    NDJSON variant of /search-jobs: one "source" event per source as soon as it
+    finishes, then a final "relevant" event with the LLM-filtered jobs.
+    """
+    # Admitted before the response starts, so a rejection is still a plain 429/503
+    permit = await admission.admit(PRIORITY_INTERACTIVE)
+
+    async def events():
+        all_jobs = []
+        source_statuses = []
+        try:
+            async for jobs, status in stream_sources(request):
+                all_jobs.extend(jobs)
+                # A page of a source still being read; its "source" event follows once it finishes
+                event = "page" if status.status == RUNNING else "source"
+                if event == "source":
+                    source_statuses.append(status)
+                yield orjson.dumps({"event": event, "status": status.model_dump(), "jobs": [job.to_dict() for job in jobs]}) + b"\n"
+
+            if DEDUP_ENABLED:
+                all_jobs = deduplicate_jobs(all_jobs)
+            if ENRICHMENT_ENABLED:
+                all_jobs = await enricher.enrich(all_jobs)
+            relevant_jobs = await filter_relevant_jobs(request, all_jobs)
+            yield orjson.dumps({"event": "relevant", **_search_result(relevant_jobs, source_statuses)}) + b"\n"
+        except Exception as e:
+            # Headers are already sent, so errors are reported in-band
+            yield orjson.dumps({"event": "error", "detail": f"Error searching jobs: {str(e)}"}) + b"\n"
+        finally:
+            permit.release()
+
+    # The background task also frees the slot when the client leaves before the stream starts
+    return StreamingResponse(events(), media_type="application/x-ndjson", background=BackgroundTask(permit.release))
+
+@app.post("/searches", response_model=SearchSubmitted, status_code=202)
+async def submit_search(request: JobSearchRequest):
+    """
+    Queue a search and return its id at once; poll GET /searches/{search_id} for results.
+    """
+    try:
+        record = search_queue.submit(request)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return SearchSubmitted(search_id=record.search_id, status=record.status)
+
+@app.get("/searches/{search_id}", response_model=SearchProgress)
+async def get_search(search_id: str):
+    record = search_queue.get(search_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Search not found")
+    return record
 
 if __name__ == "__main__":
     import uvicorn
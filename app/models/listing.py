@@ -0,0 +1,101 @@
+"""
+Internal job listing record passed between the pipeline stages.
+
+Scrapers, dedup, enrichment, ranking and the LLM filter handle listings by
+the hundred per search, so they pass this slotted class around instead of
+the pydantic JobListing: building one skips validation, it has no per-instance
+__dict__, and the strings that repeat across listings (source, company,
+location, ...) are interned so every listing shares one copy of each. A
+listing takes the public JobListing shape once, at the response boundary.
+"""
+import sys
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, Optional, Sequence
+
+from app.models.schemas import JobListing
+
+# JobListing's fields, in its order
+FIELDS = ("job_title", "company", "experience", "jobNature", "location", "salary", "apply_link", "source", "sources")
+
+
+# json.dumps's own string encoder, without its per-call setup
+_quote = encode_basestring_ascii
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if type(value) is str else value
+
+
+class Listing:
+    __slots__ = FIELDS + ("_prompt",)
+
+    def __init__(
+        self,
+        *,
+        job_title: str,
+        company: str,
+        experience: str,
+        jobNature: Optional[str] = None,
+        location: str,
+        salary: Optional[str] = None,
+        apply_link: str,
+        source: str,
+        sources: Sequence[str] = (),
+    ):
+        self.job_title = job_title
+        self.company = _intern(company)
+        self.experience = _intern(experience)
+        self.jobNature = _intern(jobNature)
+        self.location = _intern(location)
+        self.salary = _intern(salary)
+        self.apply_link = apply_link
+        self.source = _intern(source)
+        self.sources = tuple(sources)
+        self._prompt: Optional[str] = None
+
+    def __repr__(self) -> str:
+        return f"Listing({self.job_title!r}, {self.company!r}, {self.source!r})"
+
+    def replace(self, **changes: Any) -> "Listing":
+        """
+        Copy of the listing with some fields changed.
+        """
+        fields = {name: getattr(self, name) for name in FIELDS}
+        fields.update(changes)
+        return Listing(**fields)
+
+    def prompt_fields(self) -> str:
+        """
+        The listing's fields as they appear in the LLM prompt: the members of a
+        JSON object, without braces. Built once per listing and reused by every
+        prompt (and every batched profile) it goes into.
+        """
+        if self._prompt is None:
+            self._prompt = (
+                f'"title":{_quote(self.job_title)},"company":{_quote(self.company)},'
+                f'"experience":{_quote(self.experience)},"location":{_quote(self.location)},'
+                f'"job_nature":{_quote(self.jobNature or "Not specified")}'
+            )
+        return self._prompt
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The public JobListing as plain data, ready for the JSON encoder.
+        """
+        return {
+            "job_title": self.job_title,
+            "company": self.company,
+            "experience": self.experience,
+            "jobNature": self.jobNature,
+            "location": self.location,
+            "salary": self.salary,
+            "apply_link": self.apply_link,
+            "source": self.source,
+            "sources": list(self.sources),
+        }
+
+    def to_public(self) -> JobListing:
+        """
+        The public JobListing model, for responses built from pydantic models.
+        """
+        return JobListing.model_construct(**self.to_dict())
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 
 class JobSearchRequest(BaseModel):
     position: str
@@ -8,6 +9,9 @@ class JobSearchRequest(BaseModel):
     jobNature: Optional[str] = None
     location: Optional[str] = None
     skills: str
+    sources: Optional[List[str]] = Field(None, description="Sources to query instead of the server default (see GET /sources)")
+    max_results: Optional[int] = Field(None, ge=1, description="Listings wanted; dearer sources are skipped once cheaper ones return this many")
+    source_budgets: Optional[Dict[str, int]] = Field(None, description="Maximum listings to fetch per source, e.g. {\"linkedin\": 25}")
 
 class JobListing(BaseModel):
     job_title: str
@@ -18,6 +22,36 @@ class JobListing(BaseModel):
     salary: Optional[str] = None
     apply_link: str
     source: str = Field(..., description="Source of job listing (LinkedIn, Indeed, etc.)")
+    sources: List[str] = Field(default_factory=list, description="Every source this listing was found on after deduplication")
+
+class SourceStatus(BaseModel):
+    source: str
+    status: str = Field(..., description="Outcome of the source fetch: ok, timed_out, errored or skipped; running while a source read page by page is still going")
+    item_count: int = 0
+    elapsed_ms: float
+    cached: bool = False
+    error: Optional[str] = None
 
 class JobSearchResponse(BaseModel):
-    relevant_jobs: List[JobListing]
\ No newline at end of file
+    relevant_jobs: List[JobListing]
+    sources: List[SourceStatus] = Field(default_factory=list, description="Per-source fetch status")
+
+class JobSearchBatchRequest(BaseModel):
+    searches: List[JobSearchRequest] = Field(..., min_length=1, description="Candidate searches; those with the same position and location share their scrapes")
+
+class JobSearchBatchResponse(BaseModel):
+    results: List[JobSearchResponse] = Field(..., description="One response per search, in request order")
+
+class SearchSubmitted(BaseModel):
+    search_id: str
+    status: str
+
+class SearchProgress(BaseModel):
+    search_id: str
+    status: str = Field(..., description="queued, running, completed or failed")
+    created_at: datetime
+    updated_at: datetime
+    pending_sources: List[str] = Field(default_factory=list)
+    sources: List[SourceStatus] = Field(default_factory=list)
+    relevant_jobs: Optional[List[JobListing]] = None
+    error: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Admission control and load shedding for the search endpoints.
+
+At most ADMISSION_MAX_SEARCHES /search-jobs, stream and batch requests run at
+once. Further ones wait in a queue of ADMISSION_QUEUE_SIZE, served by
+priority (interactive searches before batches) and then in arrival order.
+A search that finds the queue full is rejected at once with 429, unless it
+outranks a queued one, which is then rejected instead. A search that gets no
+slot within ADMISSION_QUEUE_TIMEOUT is rejected with 503. Both carry a
+Retry-After estimated from how long searches have recently held their slots.
+
+Admitted searches, and background ones from the search queue and crawler,
+also share per-stage limits on upstream source fetches, Gemini calls and
+enrichment, so a spike cannot take every executor thread or hammer the
+upstreams. Stage waits are not bounded (the search is already under way)
+but are served by priority too.
+
+Wait times and rejections are exported as jobfinder_admission_wait_seconds
+and jobfinder_admission_rejections_total.
+"""
+import asyncio
+import contextvars
+import itertools
+import math
+import time
+from typing import Dict, List, Optional
+
+from app.config import (
+    ADMISSION_ENABLED,
+    ADMISSION_ENRICH_CONCURRENCY,
+    ADMISSION_LLM_CONCURRENCY,
+    ADMISSION_MAX_SEARCHES,
+    ADMISSION_QUEUE_SIZE,
+    ADMISSION_QUEUE_TIMEOUT,
+    ADMISSION_SOURCE_CONCURRENCY,
+)
+from app.services.telemetry import ADMISSION_REJECTIONS, ADMISSION_WAIT
+
+# Lower is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch", PRIORITY_BACKGROUND: "background"}
+
+# Bounds of the Retry-After estimate, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 60
+
+# Priority of the search the current task works for; stage gates serve waiters by it
+_priority: contextvars.ContextVar = contextvars.ContextVar("admission_priority", default=PRIORITY_BACKGROUND)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class Permit:
+    """
+    A held slot; release() (or leaving a with block) hands it on. Releasing twice is harmless.
+    """
+
+    def __init__(self, gate: Optional["Gate"] = None):
+        self._gate = gate
+        self._started = time.monotonic()
+
+    def release(self) -> None:
+        gate, self._gate = self._gate, None
+        if gate is not None:
+            gate.release(time.monotonic() - self._started)
+
+    def __enter__(self) -> "Permit":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class _Waiter:
+    __slots__ = ("priority", "order", "future")
+
+    def __init__(self, priority: int, order: int, future: "asyncio.Future[None]"):
+        self.priority = priority
+        self.order = order
+        self.future = future
+
+
+class Gate:
+    """
+    Concurrency limit with a priority-ordered wait queue.
+
+    Args:
+        name: Label of the gate in metrics and /stats.
+        limit: Slots; 0 or less means unlimited.
+        queue_size: Waiters allowed; None for no bound.
+        queue_timeout: Seconds a waiter may wait; None for no bound.
+    """
+
+    def __init__(
+        self, name: str, limit: int, queue_size: Optional[int] = None, queue_timeout: Optional[float] = None
+    ):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waiters: List[_Waiter] = []
+        self._order = itertools.count()
+        # Moving average of how long a slot is held, for Retry-After
+        self._hold: Optional[float] = None
+
+    def _retry_after(self) -> int:
+        if self._hold is None or self.limit <= 0:
+            return MIN_RETRY_AFTER
+        # Time for the queue ahead to drain at the current pace
+        seconds = self._hold * (len(self._waiters) + 1) / self.limit
+        return min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(seconds)))
+
+    def _reject(self, priority: int, reason: str, status_code: int, message: str) -> AdmissionRejected:
+        self.rejected += 1
+        ADMISSION_REJECTIONS.inc(PRIORITY_NAMES[priority], reason)
+        return AdmissionRejected(message, status_code, self._retry_after())
+
+    def _enqueue(self, priority: int) -> _Waiter:
+        if self.queue_size is not None and len(self._waiters) >= self.queue_size:
+            lowest = max(self._waiters, key=lambda waiter: (waiter.priority, waiter.order), default=None)
+            if lowest is None or lowest.priority <= priority:
+                raise self._reject(priority, "queue_full", 429, "Too many searches in progress, try again later")
+            # Make room by shedding the newest of the lowest-priority waiters
+            self._waiters.remove(lowest)
+            lowest.future.set_exception(
+                self._reject(lowest.priority, "shed", 429, "Too many searches in progress, try again later")
+            )
+        waiter = _Waiter(priority, next(self._order), asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+            waiter.future.cancel()
+        elif waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+            # The slot was handed over just as the waiter gave up; pass it on
+            self.release()
+
+    async def acquire(self, priority: int) -> Permit:
+        started = time.monotonic()
+        if self.limit <= 0 or (self.active < self.limit and not self._waiters):
+            self.active += 1
+        else:
+            waiter = self._enqueue(priority)
+            try:
+                # asyncio.wait (unlike wait_for) leaves the future alone on timeout, so a grant is never lost
+                await asyncio.wait((waiter.future,), timeout=self.queue_timeout)
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+            if not waiter.future.done():
+                self._abandon(waiter)
+                raise self._reject(priority, "timeout", 503, "Search capacity is saturated, try again later")
+            # Raises AdmissionRejected if a higher-priority search took its place
+            waiter.future.result()
+        self.admitted += 1
+        ADMISSION_WAIT.observe(time.monotonic() - started, self.name, PRIORITY_NAMES[priority])
+        return Permit(self)
+
+    def release(self, held: Optional[float] = None) -> None:
+        if held is not None:
+            self._hold = held if self._hold is None else 0.8 * self._hold + 0.2 * held
+        while self._waiters:
+            waiter = min(self._waiters, key=lambda waiter: (waiter.priority, waiter.order))
+            self._waiters.remove(waiter)
+            if not waiter.future.done():
+                # The slot passes straight to the waiter, so active stays the same
+                waiter.future.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_hold_seconds": round(self._hold, 3) if self._hold is not None else None,
+        }
+
+
+class AdmissionController:
+    def __init__(self, enabled: bool, searches: Gate, stages: Dict[str, Gate]):
+        self.enabled = enabled
+        self.searches = searches
+        self.stages = stages
+
+    async def admit(self, priority: int) -> Permit:
+        """
+        A search slot, waiting for one if needed.
+
+        Raises:
+            AdmissionRejected: The queue is full (429) or no slot freed up in time (503).
+        """
+        _priority.set(priority)
+        if not self.enabled:
+            return Permit()
+        return await self.searches.acquire(priority)
+
+    async def stage(self, name: str) -> Permit:
+        """
+        A slot of one pipeline stage ("sources", "llm" or "enrich") for the current search.
+        """
+        gate = self.stages.get(name)
+        if not self.enabled or gate is None:
+            return Permit()
+        return await gate.acquire(_priority.get())
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "searches": self.searches.stats(),
+            "stages": {name: gate.stats() for name, gate in self.stages.items()},
+        }
+
+
+admission = AdmissionController(
+    ADMISSION_ENABLED,
+    Gate("search", ADMISSION_MAX_SEARCHES, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT),
+    {
+        "sources": Gate("sources", ADMISSION_SOURCE_CONCURRENCY),
+        "llm": Gate("llm", ADMISSION_LLM_CONCURRENCY),
+        "enrich": Gate("enrich", ADMISSION_ENRICH_CONCURRENCY),
+    },
+)
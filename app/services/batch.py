@@ -0,0 +1,81 @@
+"""
+Batch searches: many candidate profiles served from shared scrapes and shared LLM calls.
+
+Profiles that want the same position and location need the same listings,
+so a batch runs every distinct source query once (orchestrator
+fetch_sources_batch) or answers it from the crawler's index. Listings are
+kept profile-free (request-echoing sources leave PLACEHOLDER), so profiles
+whose listings come out identical share one pool: it is deduplicated and
+enriched once and scored for all of its profiles together by
+filter_relevant_jobs_batch. Each profile's own experience, job nature and
+salary are echoed into its relevant jobs at the end.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from app.config import DEDUP_ENABLED, ENRICHMENT_ENABLED
+from app.models.listing import Listing
+from app.models.schemas import JobSearchRequest, SourceStatus
+from app.services.crawler import crawler
+from app.services.dedup import deduplicate_jobs
+from app.services.enrichment import enricher
+from app.services.llm_service import filter_relevant_jobs_batch
+from app.services.orchestrator import fetch_sources_batch
+from app.services.sources import echo_request, source_of
+from app.services.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+
+def _personalize(job: Listing, request: JobSearchRequest) -> Listing:
+    plugin = source_of(job)
+    return echo_request(job, request) if plugin is not None and plugin.echoes_request else job
+
+
+async def _score_pool(requests: List[JobSearchRequest], jobs: List[Listing]) -> List[List[Listing]]:
+    if DEDUP_ENABLED:
+        jobs = deduplicate_jobs(jobs)
+    if ENRICHMENT_ENABLED:
+        jobs = await enricher.enrich(jobs)
+    relevant = await filter_relevant_jobs_batch(requests, jobs)
+    return [
+        [_personalize(job, request) for job in relevant_jobs]
+        for request, relevant_jobs in zip(requests, relevant)
+    ]
+
+
+async def search_batch(requests: List[JobSearchRequest]) -> List[Tuple[List[Listing], List[SourceStatus]]]:
+    """
+    Run /search-jobs for every request, sharing scrapes and LLM calls between them.
+
+    Returns:
+        The relevant listings and source statuses of every request, in order.
+    """
+    with span("batch_search", searches=len(requests)):
+        found: List[Optional[Tuple[List[Listing], List[SourceStatus]]]] = [None] * len(requests)
+        indexed = await asyncio.gather(*(crawler.search(request, echo=False) for request in requests))
+        for i, hit in enumerate(indexed):
+            if hit is not None:
+                found[i] = (hit[0], [hit[1]])
+
+        live = [i for i, result in enumerate(found) if result is None]
+        if live:
+            for i, result in zip(live, await fetch_sources_batch([requests[i] for i in live])):
+                found[i] = result
+
+        # Profiles that got the same listings in the same order share a pool
+        pools: Dict[Tuple[Tuple[str, str], ...], List[int]] = {}
+        for i, (jobs, _) in enumerate(found):
+            pools.setdefault(tuple((job.source, job.apply_link) for job in jobs), []).append(i)
+        logger.info("Batch of %d searches: %d listing pools to score", len(requests), len(pools))
+
+        scored = await asyncio.gather(*(
+            _score_pool([requests[i] for i in members], found[members[0]][0]) for members in pools.values()
+        ))
+        relevant: List[List[Listing]] = [[] for _ in requests]
+        for members, pool_results in zip(pools.values(), scored):
+            for i, relevant_jobs in zip(members, pool_results):
+                relevant[i] = relevant_jobs
+
+    return [(relevant_jobs, statuses) for relevant_jobs, (_, statuses) in zip(relevant, found)]
@@ -0,0 +1,93 @@
+"""
+Per-search result budget shared by every source of one search.
+
+Sources report the listings they collect page by page and stop paginating
+once the search as a whole has enough. Page fetches run through `run()`, so
+when the budget fills up the fetches still in flight, on any source, are
+cancelled instead of spending upstream requests (and ScraperAPI credits)
+on results nobody needs.
+"""
+import asyncio
+import threading
+from typing import Awaitable, Callable, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+
+class BudgetExhausted(Exception):
+    pass
+
+
+class SearchBudget:
+    """
+    Args:
+        target: Listings wanted across all sources of the search.
+    """
+
+    def __init__(self, target: int):
+        self.target = target
+        self.collected = 0
+        self.cancelled_fetches = 0
+        self._pending: Set[asyncio.Future] = set()
+        self._cancelled: Set[asyncio.Future] = set()
+        self._lock = threading.Lock()
+        self._loop = asyncio.get_event_loop()
+
+    @property
+    def satisfied(self) -> bool:
+        return self.collected >= self.target
+
+    def add(self, count: int) -> None:
+        """
+        Record collected listings. Safe to call from worker threads.
+        """
+        with self._lock:
+            was_satisfied = self.satisfied
+            self.collected += count
+            filled = not was_satisfied and self.satisfied
+        if filled:
+            self._loop.call_soon_threadsafe(self._cancel_pending)
+
+    def _cancel_pending(self) -> None:
+        for fetch in list(self._pending):
+            if not fetch.done():
+                self._cancelled.add(fetch)
+                fetch.cancel()
+                self.cancelled_fetches += 1
+
+    async def run(self, page_fetch: Awaitable[T], measure: Optional[Callable[[T], int]] = None) -> T:
+        """
+        Await one page fetch, cancelling it if the budget fills up meanwhile.
+
+        Args:
+            page_fetch: Awaitable fetching (and parsing) one result page.
+            measure: Counts the listings a finished page contributes; they are
+                added to the budget right away, so fetches of sibling pages
+                can be cancelled before they finish.
+
+        Raises:
+            BudgetExhausted: The budget was already full, or filled up while waiting.
+        """
+        if self.satisfied:
+            if asyncio.iscoroutine(page_fetch):
+                page_fetch.close()
+            raise BudgetExhausted()
+        fetch = asyncio.ensure_future(page_fetch)
+        self._pending.add(fetch)
+        try:
+            result = await fetch
+        except asyncio.CancelledError:
+            # Only swallow our own cancellation; the caller being cancelled must propagate
+            if fetch in self._cancelled:
+                raise BudgetExhausted()
+            raise
+        finally:
+            self._pending.discard(fetch)
+            self._cancelled.discard(fetch)
+        if measure is not None:
+            self.add(measure(result))
+        return result
+
+
+def budget_satisfied(budget: Optional[SearchBudget]) -> bool:
+    return budget is not None and budget.satisfied
@@ -0,0 +1,257 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.config import SOURCE_CACHE_MAX_ENTRIES, SOURCE_CACHE_SQLITE_PATH
+from app.models.listing import Listing
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """
+    Lower-case and collapse whitespace so near-identical inputs share a key.
+    """
+    return " ".join((value or "").lower().split())
+
+
+def make_key(namespace: str, *parts: Optional[str]) -> str:
+    return "|".join([namespace] + [normalize_text(part) for part in parts])
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache whose entries expire after a per-entry TTL.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+class SQLiteCache:
+    """
+    On-disk cache tier so source results survive restarts.
+
+    Values are stored as JSON text; calls are synchronous and meant to be run
+    through asyncio.to_thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Returns:
+            The stored JSON text and its remaining TTL in seconds, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0], row[1] - now
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        return {"path": self.path, "hits": self.hits, "misses": self.misses}
+
+
+class SourceResultCache:
+    """
+    Memory -> SQLite tiered cache for source fetches with single-flight.
+
+    Concurrent lookups of the same key while it is being fetched wait on the
+    one upstream fetch instead of starting their own. The fetch runs as its
+    own task, so a caller hitting its deadline does not cancel it for the
+    others (and its result still lands in the cache). A fetch that can come
+    out cut short for its caller's own reasons (a search budget) is not
+    shared.
+    """
+
+    def __init__(self, max_entries: int, sqlite_path: str = ""):
+        self.memory = TTLCache(max_entries)
+        self.disk = SQLiteCache(sqlite_path) if sqlite_path else None
+        self._inflight: Dict[str, "asyncio.Task[List[Listing]]"] = {}
+        self.coalesced = 0
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        ttl: float,
+        fetch: Callable[[], Awaitable[List[Listing]]],
+        cacheable: Optional[Callable[[List[Listing]], bool]] = None,
+        shared: bool = True,
+    ) -> Tuple[List[Listing], bool, bool]:
+        """
+        Args:
+            key: Normalized cache key (see make_key).
+            ttl: Seconds the fetched result stays fresh.
+            fetch: Zero-argument coroutine factory doing the real upstream fetch.
+            cacheable: Decides whether a fetched (non-empty) result may be stored.
+            shared: Whether other callers may wait on this caller's fetch. Pass
+                False when `fetch` may stop early for this caller's own reasons;
+                it then runs privately, though it still joins a shared fetch
+                already in flight.
+
+        Returns:
+            The job listings, whether they were served from cache, and whether
+            they came from a fetch another caller started.
+        """
+        jobs = await self.lookup(key)
+        if jobs is not None:
+            return jobs, True, False
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return list(await asyncio.shield(task)), False, True
+        if not shared:
+            return await self._fetch_and_store(key, ttl, fetch, cacheable), False, False
+
+        task = asyncio.ensure_future(self._fetch_and_store(key, ttl, fetch, cacheable))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        jobs = await asyncio.shield(task)
+        return list(jobs), False, False
+
+    async def lookup(self, key: str) -> Optional[List[Listing]]:
+        """
+        Fresh listings stored under key, from memory or else SQLite, or None.
+        """
+        jobs = self.memory.get(key)
+        if jobs is not None:
+            return list(jobs)
+
+        if self.disk is not None:
+            stored = await asyncio.to_thread(self.disk.get, key)
+            if stored is not None:
+                value, remaining_ttl = stored
+                jobs = [Listing(**item) for item in orjson.loads(value)]
+                self.memory.set(key, jobs, remaining_ttl)
+                return list(jobs)
+        return None
+
+    def fetching(self, key: str) -> bool:
+        """
+        Whether a shared fetch of key is in flight.
+        """
+        return key in self._inflight
+
+    async def store(
+        self,
+        key: str,
+        ttl: float,
+        jobs: List[Listing],
+        cacheable: Optional[Callable[[List[Listing]], bool]] = None,
+    ) -> None:
+        """
+        Store a finished fetch's listings under key in both tiers, if they may be cached.
+        """
+        # An empty result is not cached: it is more often a transient gap (a page
+        # that rendered no cards, a cut-short search) than a true "no jobs"
+        if jobs and (cacheable is None or cacheable(jobs)):
+            self.memory.set(key, jobs, ttl)
+            if self.disk is not None:
+                value = orjson.dumps([job.to_dict() for job in jobs]).decode()
+                await asyncio.to_thread(self.disk.set, key, value, ttl)
+
+    def _finish(self, key: str, task: "asyncio.Task[List[Listing]]") -> None:
+        self._inflight.pop(key, None)
+        # Mark a failure as retrieved even if every waiter already gave up on it
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch_and_store(
+        self,
+        key: str,
+        ttl: float,
+        fetch: Callable[[], Awaitable[List[Listing]]],
+        cacheable: Optional[Callable[[List[Listing]], bool]] = None,
+    ) -> List[Listing]:
+        # Failed fetches raise here, so they are never stored
+        jobs = await fetch()
+        await self.store(key, ttl, jobs, cacheable)
+        return jobs
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> dict:
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+            "inflight": len(self._inflight),
+            "coalesced": self.coalesced,
+        }
+
+
+source_cache = SourceResultCache(SOURCE_CACHE_MAX_ENTRIES, SOURCE_CACHE_SQLITE_PATH)
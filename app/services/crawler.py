@@ -0,0 +1,158 @@
+"""
+Background crawler that keeps the local job index fresh for popular queries.
+
+Every CRAWLER_INTERVAL seconds it runs the regular LinkedIn and Glassdoor
+fetchers for each (position, location) in CRAWLER_QUERIES and adds what they
+return to the job index. /search-jobs answers from the index when it has
+enough fresh matches and only scrapes live on a miss.
+"""
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from app.config import (
+    CRAWLER_INTERVAL,
+    CRAWLER_MAX_ITEMS,
+    CRAWLER_QUERIES,
+    CRAWLER_SOURCES,
+    JOB_INDEX_MAX_AGE,
+    JOB_INDEX_MIN_RESULTS,
+)
+from app.models.listing import Listing
+from app.models.schemas import JobSearchRequest, SourceStatus
+from app.services.job_index import JobIndex, job_index
+from app.services.orchestrator import fetch_upstream, selected_sources
+from app.services.sources import PLACEHOLDER, echo_request, get_source
+from app.services.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+
+class Crawler:
+    def __init__(self, index: Optional[JobIndex], queries: List[Tuple[str, str]], sources: List[str], interval: float):
+        self.index = index
+        self.queries = queries
+        self.sources = [name for name in sources if get_source(name) is not None]
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.rounds = 0
+        self.last_round_at: Optional[float] = None
+        self.last_round_seconds = 0.0
+        self.last_round_new = 0
+        self.hits = 0
+        self.misses = 0
+
+    def start(self) -> None:
+        if self.index is None or self._task is not None:
+            return
+        self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.crawl_once()
+            except Exception as e:
+                logger.exception("Crawl round failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    async def _crawl_source(self, name: str, request: JobSearchRequest) -> int:
+        plugin = get_source(name)
+        try:
+            if plugin is None:
+                raise ValueError(f"Unknown source {name!r}")
+            # Fresh from the upstream, but within the same concurrency and per-search item limits as live searches
+            jobs = await fetch_upstream(plugin, request, min(CRAWLER_MAX_ITEMS, plugin.max_items))
+        except Exception as e:
+            logger.warning("Crawling %s for %r failed: %s", name, request.position, e)
+            return 0
+        return await asyncio.to_thread(self.index.add, name, jobs)
+
+    async def crawl_once(self) -> int:
+        """
+        Crawl every configured query once and return how many new postings were indexed.
+        """
+        started = time.perf_counter()
+        new_postings = 0
+        for position, location in self.queries:
+            # Placeholder experience so request-echoing sources store "unknown", filled per search on read
+            request = JobSearchRequest(position=position, location=location or None, experience=PLACEHOLDER, skills="")
+            counts = await asyncio.gather(*(self._crawl_source(name, request) for name in self.sources))
+            new_postings += sum(counts)
+        await asyncio.to_thread(self.index.prune, JOB_INDEX_MAX_AGE)
+
+        self.rounds += 1
+        self.last_round_at = time.time()
+        self.last_round_seconds = time.perf_counter() - started
+        self.last_round_new = new_postings
+        logger.info("Crawl round %d: %d new postings in %.1fs", self.rounds, new_postings, self.last_round_seconds)
+        return new_postings
+
+    async def search(
+        self, request: JobSearchRequest, echo: bool = True
+    ) -> Optional[Tuple[List[Listing], SourceStatus]]:
+        """
+        Answer a search from the index.
+
+        Args:
+            request: The search.
+            echo: Fill the fields request-echoing sources copy from the
+                searcher; off, they keep the PLACEHOLDER they were indexed with.
+
+        Returns:
+            The indexed listings and an "index" source status, or None on a miss:
+            the index is off, the search wants a source that is not crawled, or
+            fewer than JOB_INDEX_MIN_RESULTS (or max_results) fresh postings match.
+        """
+        if self.index is None:
+            return None
+        names = selected_sources(request)
+        if not names or any(name not in self.sources for name in names):
+            return None
+
+        started = time.perf_counter()
+        limit = sum(get_source(name).budget(request) for name in names)
+        with span("index_lookup"):
+            rows = await asyncio.to_thread(
+                self.index.search, request.position, request.location, names, JOB_INDEX_MAX_AGE, limit
+            )
+        if len(rows) < min(max(JOB_INDEX_MIN_RESULTS, request.max_results or 0), limit):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        jobs = [
+            echo_request(job, request) if echo and get_source(name).echoes_request else job
+            for name, job in rows
+        ]
+        return jobs, SourceStatus(
+            source="index",
+            status="ok",
+            item_count=len(jobs),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+            cached=True,
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.index is not None,
+            "queries": len(self.queries),
+            "indexed_postings": self.index.count() if self.index is not None else 0,
+            "rounds": self.rounds,
+            "last_round_at": self.last_round_at,
+            "last_round_seconds": round(self.last_round_seconds, 2),
+            "last_round_new_postings": self.last_round_new,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+crawler = Crawler(job_index, CRAWLER_QUERIES, CRAWLER_SOURCES, CRAWLER_INTERVAL)
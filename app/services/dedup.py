@@ -0,0 +1,181 @@
+import hashlib
+import logging
+import re
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import numpy as np
+
+from app.config import DEDUP_SIMILARITY, MINHASH_BANDS, MINHASH_PERMUTATIONS
+from app.models.listing import Listing
+from app.services.cache import normalize_text
+from app.services.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that identify the posting itself and must survive URL cleaning
+IDENTITY_PARAMS = {"jl", "joblistingid", "jk", "vjk", "currentjobid"}
+_LINKEDIN_JOB_ID_RE = re.compile(r"/jobs/view/(?:[^/]*-)?(\d+)/?$")
+_NON_WORD_RE = re.compile(r"[^a-z0-9 ]+")
+
+
+def canonical_url(url: str) -> str:
+    """
+    Reduce an apply link to the part that identifies the posting.
+
+    Like LinkedInScraper._clean_job_url it drops tracking query strings, but it
+    keeps posting ids carried in the query (Glassdoor `jl`/`jobListingId`,
+    Indeed `jk`) and folds LinkedIn country subdomains and title slugs.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+
+    if host.endswith("linkedin.com"):
+        host = "linkedin.com"
+        match = _LINKEDIN_JOB_ID_RE.search(path)
+        if match:
+            path = f"/jobs/view/{match.group(1)}"
+
+    identity = sorted(
+        (key.lower(), value) for key, value in parse_qsl(parts.query) if key.lower() in IDENTITY_PARAMS
+    )
+    query = f"?{urlencode(identity)}" if identity else ""
+    return f"{host}{path}{query}"
+
+
+def _shingles(job: Listing) -> set:
+    """
+    Word unigrams and bigrams of the normalized (title, company, location).
+
+    Word-level shingles keep "Frontend Developer" and "Backend Developer" at
+    the same company apart, which character shingles would merge.
+    """
+    text = f"{job.job_title} {job.company} {job.location}"
+    words = _NON_WORD_RE.sub(" ", normalize_text(text)).split()
+    return set(words) | {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+
+class MinHasher:
+    """
+    MinHash signatures over word unigram and bigram shingles, with LSH banding
+    to find near-duplicate candidates without comparing every pair.
+    """
+
+    def __init__(self, permutations: int, bands: int, seed: int = 1):
+        if permutations % bands:
+            raise ValueError("MINHASH_BANDS must divide MINHASH_PERMUTATIONS")
+        rng = np.random.RandomState(seed)
+        # Multiply-shift hashing: random odd multipliers, arithmetic wraps mod 2**64
+        self.a = rng.randint(0, 1 << 63, size=permutations, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.randint(0, 1 << 63, size=permutations, dtype=np.uint64)
+        self.bands = bands
+        self.rows = permutations // bands
+
+    def signature(self, shingles: set) -> np.ndarray:
+        shingles = shingles or {""}
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+                for shingle in shingles
+            ),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # Keep the high 32 bits of (a * x + b) mod 2**64, one row per permutation
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1)
+
+    def band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            bytes([band]) + signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+
+_hasher = MinHasher(MINHASH_PERMUTATIONS, MINHASH_BANDS)
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def deduplicate_jobs(jobs: List[Listing], similarity: Optional[float] = None) -> List[Listing]:
+    """
+    Collapse listings that are the same posting, across and within sources.
+
+    Listings are merged when their canonical apply links match (hash index),
+    or when their normalized (title, company, location) shingle sets have an
+    estimated Jaccard similarity of at least `similarity` (MinHash + LSH, so
+    cost stays near-linear in the number of listings).
+
+    Args:
+        jobs: Merged listings from all sources, in priority order.
+        similarity: Fuzzy-match threshold; defaults to DEDUP_SIMILARITY.
+
+    Returns:
+        The first listing of every group, in input order, with `sources`
+        listing every source the group was found on.
+    """
+    threshold = DEDUP_SIMILARITY if similarity is None else similarity
+    with span("dedup", jobs=len(jobs)):
+        deduplicated = _deduplicate(jobs, threshold)
+    if len(deduplicated) < len(jobs):
+        logger.info("Deduplicated %d listings to %d", len(jobs), len(deduplicated))
+    return deduplicated
+
+
+def _deduplicate(jobs: List[Listing], threshold: float) -> List[Listing]:
+    parent = list(range(len(jobs)))
+
+    def union(i: int, j: int) -> None:
+        root_i, root_j = _find(parent, i), _find(parent, j)
+        if root_i != root_j:
+            # Keep the earliest listing as the group representative
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    by_url: Dict[str, int] = {}
+    for i, job in enumerate(jobs):
+        key = canonical_url(job.apply_link)
+        if not key:
+            # No link to match on; only similarity can group it
+            continue
+        if key in by_url:
+            union(by_url[key], i)
+        else:
+            by_url[key] = i
+
+    signatures = np.vstack([_hasher.signature(_shingles(job)) for job in jobs]) if jobs else None
+    buckets: Dict[bytes, List[int]] = {}
+    for i in range(len(jobs)):
+        # Listings sharing any LSH band are candidates; verify them all in one vectorized comparison
+        candidates = set()
+        for band_key in _hasher.band_keys(signatures[i]):
+            bucket = buckets.setdefault(band_key, [])
+            candidates.update(bucket)
+            bucket.append(i)
+        if not candidates:
+            continue
+        candidate_ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarities = (signatures[candidate_ids] == signatures[i]).mean(axis=1)
+        for j in candidate_ids[similarities >= threshold]:
+            union(i, int(j))
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(jobs)):
+        groups.setdefault(_find(parent, i), []).append(i)
+
+    deduplicated = []
+    for root in sorted(groups):
+        sources: List[str] = []
+        for i in groups[root]:
+            for source in jobs[i].sources or [jobs[i].source]:
+                if source not in sources:
+                    sources.append(source)
+        deduplicated.append(jobs[root].replace(sources=sources))
+    return deduplicated
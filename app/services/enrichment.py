@@ -0,0 +1,183 @@
+"""
+Optional enrichment of scraped listings from their detail pages.
+
+Result pages only carry title, company and location, so LinkedIn listings
+echo the searcher's own experience and salary and Glassdoor listings say
+"Not specified". With ENRICHMENT_ENABLED, each listing's posting page is
+fetched and the salary, experience and job nature it states replace those
+placeholders before the listings reach the relevance filter.
+
+Detail pages are fetched concurrently, at most ENRICHMENT_CONCURRENCY per
+host (on top of the host's rate limit), and the whole stage is capped at
+ENRICHMENT_TIME_BUDGET seconds per search: listings whose page has not
+arrived by then are returned unchanged. Details are cached per apply_link,
+so popular postings are enriched once.
+"""
+import asyncio
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote_plus, urlsplit
+
+import httpx
+
+from app.config import (
+    ENRICHMENT_CACHE_MAX_ENTRIES,
+    ENRICHMENT_CACHE_TTL,
+    ENRICHMENT_CONCURRENCY,
+    ENRICHMENT_MAX_JOBS,
+    ENRICHMENT_SOURCES,
+    ENRICHMENT_TIME_BUDGET,
+    LINKEDIN_JOB_POSTING_URL,
+    SCRAPERAPI_API_KEY,
+    SCRAPERAPI_URL,
+    USER_AGENT,
+)
+from app.models.listing import Listing
+from app.services.admission import admission
+from app.services.cache import TTLCache
+from app.services.extract import JobDetails
+from app.services.http_pool import get_client
+from app.services.parse_pool import parse_pool
+from app.services.rate_limit import host_key
+from app.services.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+DETAIL_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+}
+# Listing.source -> detail extractor name
+_SOURCE_NAMES = {"LinkedIn": "linkedin", "Glassdoor": "glassdoor"}
+_LINKEDIN_JOB_ID = re.compile(r"(\d+)/?$")
+
+
+def _detail_request(source: str, job: Listing) -> Optional[Tuple[httpx.AsyncClient, str]]:
+    """
+    Pooled client and URL of a listing's detail page, or None if it cannot be fetched.
+    """
+    if source == "linkedin":
+        job_id = _LINKEDIN_JOB_ID.search(job.apply_link)
+        if job_id is None:
+            return None
+        return get_client("linkedin", timeout=30.0), f"{LINKEDIN_JOB_POSTING_URL}/{job_id.group(1)}"
+    if source == "glassdoor" and SCRAPERAPI_API_KEY:
+        url = f"{SCRAPERAPI_URL}?api_key={SCRAPERAPI_API_KEY}&url={quote_plus(job.apply_link)}"
+        return get_client("scraperapi", timeout=45.0, http2=False), url
+    return None
+
+
+class Enricher:
+    """
+    Args:
+        sources: Extractor names whose listings are enriched.
+        time_budget: Seconds enrich() may take.
+        max_jobs: Listings enriched per call; the rest are returned as they are.
+        concurrency: Detail pages fetched at the same time per host.
+        cache_ttl: Seconds fetched details are reused.
+        cache_max_entries: Size of the per-apply_link details cache.
+    """
+
+    def __init__(
+        self,
+        sources: List[str],
+        time_budget: float,
+        max_jobs: int,
+        concurrency: int,
+        cache_ttl: float,
+        cache_max_entries: int,
+    ):
+        self.sources = set(sources)
+        self.time_budget = time_budget
+        self.max_jobs = max_jobs
+        self.concurrency = max(1, concurrency)
+        self.cache_ttl = cache_ttl
+        self.cache = TTLCache(cache_max_entries)
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.pages_fetched = 0
+        self.failures = 0
+        self.out_of_time = 0
+        self.enriched = 0
+
+    async def _details(self, source: str, job: Listing) -> JobDetails:
+        cached = self.cache.get(job.apply_link)
+        if cached is not None:
+            return cached
+        target = _detail_request(source, job)
+        if target is None:
+            return {}
+        client, url = target
+        host = host_key(urlsplit(url).hostname)
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(self.concurrency)
+        async with slots:
+            response = await client.get(url, headers=DETAIL_HEADERS)
+            response.raise_for_status()
+            self.pages_fetched += 1
+            details = await parse_pool.extract_details(source, response.content, response.encoding)
+        self.cache.set(job.apply_link, details, self.cache_ttl)
+        return details
+
+    async def enrich(self, jobs: List[Listing]) -> List[Listing]:
+        """
+        Replace placeholder salary/experience/jobNature with what each posting's page states.
+
+        Returns:
+            The listings in the same order; those not enriched in time (or
+            whose page says nothing) are unchanged.
+        """
+        targets: Dict[int, str] = {}
+        for i, job in enumerate(jobs):
+            source = _SOURCE_NAMES.get(job.source)
+            if source in self.sources and job.apply_link:
+                targets[i] = source
+                if len(targets) >= self.max_jobs:
+                    break
+        if not targets:
+            return jobs
+
+        # Waiting for an enrichment slot does not count against the time budget
+        with await admission.stage("enrich"):
+            with span("enrich", jobs=len(targets)):
+                tasks = {asyncio.ensure_future(self._details(source, jobs[i])): i for i, source in targets.items()}
+                done, pending = await asyncio.wait(tasks, timeout=self.time_budget)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        enriched = list(jobs)
+        count = 0
+        for task in done:
+            i = tasks[task]
+            if task.exception() is not None:
+                self.failures += 1
+                logger.debug("Enriching %s failed: %s", jobs[i].apply_link, task.exception())
+            elif task.result():
+                enriched[i] = jobs[i].replace(**task.result())
+                count += 1
+        self.enriched += count
+        self.out_of_time += len(pending)
+        logger.info("Enriched %d of %d listings (%d out of time)", count, len(targets), len(pending))
+        return enriched
+
+    def stats(self) -> dict:
+        return {
+            "enriched": self.enriched,
+            "pages_fetched": self.pages_fetched,
+            "failures": self.failures,
+            "out_of_time": self.out_of_time,
+            "cache": self.cache.stats(),
+        }
+
+
+enricher = Enricher(
+    ENRICHMENT_SOURCES,
+    ENRICHMENT_TIME_BUDGET,
+    ENRICHMENT_MAX_JOBS,
+    ENRICHMENT_CONCURRENCY,
+    ENRICHMENT_CACHE_TTL,
+    ENRICHMENT_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,232 @@
+"""
+Job-card extraction from scraped result pages.
+
+Each extractor turns raw page HTML into compact records (plain dicts with
+title/company/location/link) without building Listings, so it can be
+benchmarked on its own. Pages are parsed with lxml.html and cards are walked
+with pre-compiled XPath.
+
+Detail extractors (lxml only) read salary, experience and job nature from a
+single posting's page for the enrichment stage.
+"""
+import re
+from typing import Callable, Dict, List, Optional, Union
+
+from lxml import etree, html as lxml_html
+
+JobRecord = Dict[str, Optional[str]]
+# salary / experience / jobNature read from a posting's detail page; None when the page does not say
+JobDetails = Dict[str, Optional[str]]
+Page = Union[str, bytes]
+
+GLASSDOOR_BASE_URL = "https://www.glassdoor.com"
+
+
+def _has_class(name: str) -> str:
+    # Matches an element having `name` among its classes, like BeautifulSoup's class_=
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _first_text(elements: list) -> Optional[str]:
+    return elements[0].text_content().strip() if elements else None
+
+
+def clean_linkedin_url(url: str) -> str:
+    return url.split("?")[0] if "?" in url else url
+
+
+# --- LinkedIn -------------------------------------------------------------
+
+_LI_CARDS = etree.XPath(f"//div[{_has_class('base-card')}]")
+_LI_TITLE = etree.XPath(f".//h3[{_has_class('base-search-card__title')}]")
+_LI_COMPANY = etree.XPath(f".//h4[{_has_class('base-search-card__subtitle')}]")
+_LI_LOCATION = etree.XPath(f".//span[{_has_class('job-search-card__location')}]")
+_LI_LINK = etree.XPath(f".//a[{_has_class('base-card__full-link')}]/@href")
+
+
+def _linkedin_lxml(page: Page) -> List[JobRecord]:
+    if not page or not page.strip():
+        return []
+    records = []
+    for card in _LI_CARDS(lxml_html.fromstring(page)):
+        link = _LI_LINK(card)
+        record = {
+            "title": _first_text(_LI_TITLE(card)),
+            "company": _first_text(_LI_COMPANY(card)),
+            "location": _first_text(_LI_LOCATION(card)),
+            "link": clean_linkedin_url(str(link[0])) if link else None,
+        }
+        # LinkedIn cards without every field are skipped, as before
+        if all(record.values()):
+            records.append(record)
+    return records
+
+
+# --- Glassdoor ------------------------------------------------------------
+
+_GD_CARDS = etree.XPath('//li[@data-test="jobListing"] | //article[@data-test="jobListing"]')
+# Each field keeps the CSS fallback chain of the original scraper: primary selector, then fallback
+_GD_TITLE = (etree.XPath('.//a[@data-test="job-link"]'), etree.XPath('.//div[starts-with(@id, "job-title")]'))
+_GD_COMPANY = (
+    etree.XPath('.//div[@data-test="employer-name"]'),
+    etree.XPath('.//div[contains(@class, "employer")]//span'),
+)
+_GD_LOCATION = (etree.XPath('.//div[@data-test="location"]'), etree.XPath('.//div[contains(@class, "location")]'))
+
+
+def _select_first(card, selectors: tuple) -> list:
+    for selector in selectors:
+        found = selector(card)
+        if found:
+            return found[:1]
+    return []
+
+
+def _glassdoor_record(title: Optional[str], href: Optional[str], company: Optional[str], location: Optional[str]) -> Optional[JobRecord]:
+    href = href.strip() if href else None
+    if not href:
+        return None
+    return {
+        "title": title or "N/A",
+        "company": company or "N/A",
+        "location": location or "N/A",
+        # Glassdoor links are usually relative
+        "link": f"{GLASSDOOR_BASE_URL}{href}",
+    }
+
+
+def _glassdoor_lxml(page: Page) -> List[JobRecord]:
+    if not page or not page.strip():
+        return []
+    records = []
+    for card in _GD_CARDS(lxml_html.fromstring(page)):
+        title = _select_first(card, _GD_TITLE)
+        record = _glassdoor_record(
+            _first_text(title),
+            title[0].get("href") if title else None,
+            _first_text(_select_first(card, _GD_COMPANY)),
+            _first_text(_select_first(card, _GD_LOCATION)),
+        )
+        if record:
+            records.append(record)
+    return records
+
+
+EXTRACTORS: Dict[str, Callable[[Page], List[JobRecord]]] = {
+    "linkedin": _linkedin_lxml,
+    "glassdoor": _glassdoor_lxml,
+}
+
+
+def extract_jobs(source: str, page: Page) -> List[JobRecord]:
+    """
+    Extract job-card records from a result page.
+
+    Args:
+        source: "linkedin" or "glassdoor".
+        page: Raw page HTML (str or bytes).
+
+    Returns:
+        One record per usable job card, in page order.
+    """
+    return EXTRACTORS[source](page)
+
+
+# --- Detail pages ---------------------------------------------------------
+
+_HYBRID = re.compile(r"\bhybrid\b", re.IGNORECASE)
+_REMOTE = re.compile(r"\b(?:remote|work from home|wfh)\b", re.IGNORECASE)
+_ONSITE = re.compile(r"\b(?:on[\s-]?site|in[\s-]office)\b", re.IGNORECASE)
+# "3+ years", "2-4 years", "5 to 7 years", "3 plus years"
+_YEARS = re.compile(
+    r"\b(\d{1,2})\s*(?:(\+|plus)|\s*(?:-|\u2013|to)\s*(\d{1,2}))?\s*\+?\s*years?\b", re.IGNORECASE
+)
+
+
+def _job_nature(*texts: Optional[str]) -> Optional[str]:
+    text = " ".join(t for t in texts if t)
+    # Checked in this order: "hybrid" postings usually mention remote and onsite days too
+    if _HYBRID.search(text):
+        return "Hybrid"
+    if _REMOTE.search(text):
+        return "Remote"
+    if _ONSITE.search(text):
+        return "Onsite"
+    return None
+
+
+def _experience(description: Optional[str], seniority: Optional[str] = None) -> Optional[str]:
+    match = _YEARS.search(description or "")
+    if match:
+        low, plus, high = match.groups()
+        if high:
+            return f"{low}-{high} years"
+        if plus:
+            return f"{low}+ years"
+        return f"{low} year" if low == "1" else f"{low} years"
+    if seniority and seniority.lower() not in ("not applicable", "n/a"):
+        return seniority
+    return None
+
+
+def _normalized_text(elements: list) -> Optional[str]:
+    text = " ".join(elements[0].text_content().split()) if elements else ""
+    return text or None
+
+
+_LI_CRITERIA = etree.XPath(f"//li[{_has_class('description__job-criteria-item')}]")
+_LI_CRITERIA_NAME = etree.XPath(f".//h3[{_has_class('description__job-criteria-subheader')}]")
+_LI_CRITERIA_VALUE = etree.XPath(f".//span[{_has_class('description__job-criteria-text')}]")
+_LI_SALARY = etree.XPath(f"//div[{_has_class('compensation__salary')}]")
+_LI_DESCRIPTION = etree.XPath(f"//div[{_has_class('show-more-less-html__markup')}]")
+_LI_WORKPLACE = etree.XPath(f"//span[{_has_class('topcard__flavor--bullet')}]")
+
+
+def _linkedin_details(page: Page) -> JobDetails:
+    if not page or not page.strip():
+        return {}
+    root = lxml_html.fromstring(page)
+    criteria = {
+        (_first_text(_LI_CRITERIA_NAME(item)) or "").lower(): _first_text(_LI_CRITERIA_VALUE(item))
+        for item in _LI_CRITERIA(root)
+    }
+    description = _normalized_text(_LI_DESCRIPTION(root))
+    return {
+        "salary": _normalized_text(_LI_SALARY(root)),
+        "experience": _experience(description, criteria.get("seniority level")),
+        "jobNature": _job_nature(_normalized_text(_LI_WORKPLACE(root)), description),
+    }
+
+
+_GD_SALARY = etree.XPath('//div[@data-test="detailSalary"]')
+_GD_DETAIL_LOCATION = etree.XPath('//div[@data-test="location"]')
+_GD_DESCRIPTION = etree.XPath('//div[contains(@class, "JobDetails_jobDescription")]')
+
+
+def _glassdoor_details(page: Page) -> JobDetails:
+    if not page or not page.strip():
+        return {}
+    root = lxml_html.fromstring(page)
+    description = _normalized_text(_GD_DESCRIPTION(root))
+    return {
+        "salary": _normalized_text(_GD_SALARY(root)),
+        "experience": _experience(description),
+        "jobNature": _job_nature(_normalized_text(_GD_DETAIL_LOCATION(root)), description),
+    }
+
+
+DETAIL_EXTRACTORS: Dict[str, Callable[[Page], JobDetails]] = {
+    "linkedin": _linkedin_details,
+    "glassdoor": _glassdoor_details,
+}
+
+
+def extract_details(source: str, page: Page) -> JobDetails:
+    """
+    Read salary, experience and job nature from one posting's detail page.
+
+    Returns:
+        Only the fields the page actually states.
+    """
+    details = DETAIL_EXTRACTORS[source](page)
+    return {field: value for field, value in details.items() if value}
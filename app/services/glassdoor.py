@@ -1,12 +1,16 @@
 import httpx
-from bs4 import BeautifulSoup
-from typing import List
+import logging
+from typing import List, Optional
 from urllib.parse import quote_plus
 
 # Import your configuration and models
-from app.config import SCRAPERAPI_API_KEY
+from app.config import SCRAPERAPI_API_KEY, SCRAPERAPI_URL
+from app.services.budget import BudgetExhausted, SearchBudget, budget_satisfied
+from app.services.http_pool import get_client
+from app.services.parse_pool import parse_pool
 try:
-    from app.models.schemas import JobSearchRequest, JobListing
+    from app.models.listing import Listing
+    from app.models.schemas import JobSearchRequest
 except ModuleNotFoundError:
     # Allow running the script directly for testing
     import sys
@@ -15,11 +19,14 @@ except ModuleNotFoundError:
     project_root = os.path.abspath(os.path.join(current_dir, '..', '..'))
     if project_root not in sys.path:
         sys.path.insert(0, project_root)
-    from app.models.schemas import JobSearchRequest, JobListing
+    from app.models.listing import Listing
+    from app.models.schemas import JobSearchRequest
 
 
+logger = logging.getLogger(__name__)
+
 # Constants
-SCRAPERAPI_URL = "http://api.scraperapi.com"
+GLASSDOOR_PAGE_SIZE = 30
 # *** IMPORTANT: Glassdoor URL structure needs verification ***
 # This is a GUESS based on common patterns for glassdoor.com (adjust if needed)
 GLASSDOOR_SEARCH_URL_TEMPLATE = "https://www.glassdoor.com/Job/jobs.htm?sc.keyword={query}&locT=N&locId={location_query}&fromAge=-1&minSalary=0&includeNoSalaryJobs=true&radius=100"
@@ -29,144 +36,144 @@ HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
 }
 
-async def fetch_glassdoor_jobs(request: JobSearchRequest, max_jobs: int = 10) -> List[JobListing]:
+def _scrub(message: str) -> str:
+    # Error messages may quote the ScraperAPI URL, which carries the API key
+    return message.replace(SCRAPERAPI_API_KEY, "***") if SCRAPERAPI_API_KEY else message
+
+async def fetch_glassdoor_jobs(
+    request: JobSearchRequest,
+    max_jobs: int = 10,
+    max_pages: Optional[int] = None,
+    budget: Optional[SearchBudget] = None,
+) -> List[Listing]:
     """
     Fetches job listings from Glassdoor.com via ScraperAPI.
 
     Args:
         request: JobSearchRequest containing position, location, etc.
         max_jobs: The maximum number of job listings to return.
+        max_pages: Result pages to request at most (default: enough for max_jobs).
+        budget: Result budget shared with the other sources of the search; no
+            further pages are requested once it is full.
 
     Returns:
-        A list of JobListing objects.
+        A list of Listing records.
 
     Requires a valid SCRAPERAPI_API_KEY in config.
     NOTE: Glassdoor selectors are highly volatile and likely need frequent updates.
           The URL structure also needs verification.
     """
-    print(f"--- Starting Glassdoor scrape via ScraperAPI for: Position='{request.position}', Location='{request.location}' ---")
-    scraped_jobs: List[JobListing] = []
+    logger.info("Starting Glassdoor scrape via ScraperAPI for position=%r location=%r", request.position, request.location)
+    scraped_jobs: List[Listing] = []
 
     if not SCRAPERAPI_API_KEY:
-        print("Error: SCRAPERAPI_API_KEY is not set in config/environment variables.")
-        return []
+        raise RuntimeError("SCRAPERAPI_API_KEY is not set in config/environment variables")
 
     # --- Prepare Search Terms ---
     # Basic URL encoding for keywords
     query = quote_plus(request.position.strip())
     # Location might need specific formatting or IDs for Glassdoor (this is a simple guess)
     location_query = quote_plus(request.location.strip() if request.location else "")
-    print(f"(Using query: '{query}', location_query: '{location_query}')")
+    logger.debug("Using query=%r location_query=%r", query, location_query)
 
-    # Limit to 1-2 pages approx (Glassdoor shows up to 30 jobs/page)
-    max_pages = 2 # Adjust as needed
+    # Glassdoor shows up to 30 jobs/page; every page costs a ScraperAPI credit
+    if max_pages is None:
+        max_pages = -(-max_jobs // GLASSDOOR_PAGE_SIZE)
     jobs_found_count = 0
 
-    async with httpx.AsyncClient(headers=HEADERS, timeout=45.0, follow_redirects=True) as client:
-        for page in range(1, max_pages + 1):
-            if jobs_found_count >= max_jobs:
-                print(f"Reached max_jobs limit ({max_jobs}). Stopping pagination.")
-                break
-
-            print(f"\n--- Requesting Glassdoor Page {page} via ScraperAPI ---")
-            try:
-                # *** Construct the target Glassdoor URL (NEEDS VERIFICATION/ADJUSTMENT) ***
-                # Adding `&p={page}` is a common pattern, but verify with Glassdoor's actual URL
-                target_url = GLASSDOOR_SEARCH_URL_TEMPLATE.format(query=query, location_query=location_query) + f"&p={page}"
-                print(f"Target Glassdoor URL: {target_url}")
-
-                # Construct ScraperAPI request URL
-                scraper_api_request_url = f"{SCRAPERAPI_URL}?api_key={SCRAPERAPI_API_KEY}&url={quote_plus(target_url)}"
-                # Optional: Add parameters for JS rendering or premium proxies if needed
-                # scraper_api_request_url += "&render=true" # Example if JS rendering is needed
-
+    # Pooled client shared by every search, so ScraperAPI connections are kept alive
+    client = get_client("scraperapi", headers=HEADERS, timeout=45.0, http2=False)
+    for page in range(1, max_pages + 1):
+        if jobs_found_count >= max_jobs:
+            logger.debug("Reached max_jobs limit (%d). Stopping pagination.", max_jobs)
+            break
+        if budget_satisfied(budget):
+            logger.debug("Search already has enough listings from other sources. Stopping pagination.")
+            break
+
+        try:
+            # *** Construct the target Glassdoor URL (NEEDS VERIFICATION/ADJUSTMENT) ***
+            # Adding `&p={page}` is a common pattern, but verify with Glassdoor's actual URL
+            target_url = GLASSDOOR_SEARCH_URL_TEMPLATE.format(query=query, location_query=location_query) + f"&p={page}"
+            logger.debug("Requesting Glassdoor page %d via ScraperAPI: %s", page, target_url)
+
+            # Construct ScraperAPI request URL
+            scraper_api_request_url = f"{SCRAPERAPI_URL}?api_key={SCRAPERAPI_API_KEY}&url={quote_plus(target_url)}"
+            # Optional: Add parameters for JS rendering or premium proxies if needed
+            # scraper_api_request_url += "&render=true" # Example if JS rendering is needed
+
+            if budget is not None:
+                response = await budget.run(client.get(scraper_api_request_url))
+            else:
                 response = await client.get(scraper_api_request_url)
 
-                print(f"ScraperAPI response status: {response.status_code}")
-                response.raise_for_status() # Check for HTTP errors
-
-                soup = BeautifulSoup(response.text, 'lxml') # Use lxml
-
-                # *** SELECTORS NEED VERIFICATION - These are based on the user's script & common patterns ***
-                # Main job listing card selector
-                all_jobs_on_page = soup.select('li[data-test="jobListing"], article[data-test="jobListing"]') # Common tags
-                print(f"Found {len(all_jobs_on_page)} potential job cards on page {page}.")
-
-                if not all_jobs_on_page:
-                    print("No job listings found on this page (selectors might be wrong or page empty).")
-                    # Consider breaking if a page is empty, maybe after the first page
-                    if page > 1:
-                       break
-                    else:
-                       continue
-
-
-                for job_element in all_jobs_on_page:
-                    if jobs_found_count >= max_jobs:
-                        break
-
-                    try:
-                        # --- Extract data using selectors (NEEDS VERIFICATION) ---
-                        # Title often in a link within specific divs/headings
-                        title_element = job_element.select_one('a[data-test="job-link"]') or \
-                                        job_element.select_one('div[id^="job-title"]') # IDs often start with job-title
-
-                        # Company often in a div near the title
-                        company_element = job_element.select_one('div[data-test="employer-name"]') or \
-                                          job_element.select_one('div[class*="employer"] span') # Look for employer class
-
-                        # Location often in a div/span with class containing 'location'
-                        location_element = job_element.select_one('div[data-test="location"]') or \
-                                           job_element.select_one('div[class*="location"]')
-
-
-                        job_title = title_element.text.strip() if title_element else "N/A"
-                        apply_link_relative = title_element['href'].strip() if title_element and title_element.has_attr('href') else None
-                        company = company_element.text.strip() if company_element else "N/A"
-                        location = location_element.text.strip() if location_element else "N/A"
-
-                        if not apply_link_relative:
-                             print("  Skipping card - missing apply link.")
-                             continue
-
-                        # Make link absolute (Glassdoor links are usually relative)
-                        apply_link = f"https://www.glassdoor.com{apply_link_relative}"
-
-                        print(f"  Extracted: Title='{job_title}', Company='{company}', Location='{location}'")
-
-                        # Create JobListing object
-                        job_listing = JobListing(
-                            job_title=job_title,
-                            company=company,
-                            # Experience/Salary/JobNature usually require visiting the detail page
-                            # or might sometimes be in snippets on the search page (need specific selectors)
-                            experience="Not specified",
-                            jobNature=None,
-                            location=location,
-                            salary=None,
-                            apply_link=apply_link,
-                            source="Glassdoor"
-                        )
-                        scraped_jobs.append(job_listing)
-                        jobs_found_count += 1
-                        print(f"  ++ Added Job Listing ({jobs_found_count}/{max_jobs}) ++")
-
-                    except Exception as e:
-                        print(f"  Error parsing a Glassdoor job card: {e}")
-                        # *** DEBUG: Uncomment to see card HTML if parsing fails ***
-                        # print(job_element.prettify())
-
-            except httpx.RequestError as exc:
-                print(f"An error occurred while requesting via ScraperAPI {exc.request.url!r}: {exc}")
-                break # Stop if connection fails
-            except httpx.HTTPStatusError as exc:
-                print(f"ScraperAPI Error response {exc.response.status_code} while requesting {exc.request.url!r}. Check API key and target URL.")
-                # Optionally log response body for debugging API errors
-                # print(f"Response body: {exc.response.text[:500]}")
-                break # Stop if API returns error
-            except Exception as e:
-                print(f"An unexpected error occurred during Glassdoor scraping: {e}")
-                break # Stop on other errors
-
-    print(f"--- Finished Glassdoor scrape. Found {len(scraped_jobs)} jobs. ---")
+            response.raise_for_status() # Check for HTTP errors
+
+            # Card selectors (NEED VERIFICATION) live in app/services/extract.py
+            # Parsed in the shared process pool so the event loop keeps serving other requests
+            all_jobs_on_page = await parse_pool.extract("glassdoor", response.content, response.encoding)
+            logger.debug("Found %d job cards with an apply link on page %d.", len(all_jobs_on_page), page)
+
+            if not all_jobs_on_page:
+                logger.warning("No job listings found on Glassdoor page %d (selectors might be wrong or page empty).", page)
+                # Consider breaking if a page is empty, maybe after the first page
+                if page > 1:
+                   break
+                else:
+                   continue
+
+
+            found_before_page = jobs_found_count
+            for job_element in all_jobs_on_page:
+                if jobs_found_count >= max_jobs:
+                    break
+
+                try:
+                    job_listing = Listing(
+                        job_title=job_element["title"],
+                        company=job_element["company"],
+                        # Experience/Salary/JobNature usually require visiting the detail page
+                        # or might sometimes be in snippets on the search page (need specific selectors)
+                        experience="Not specified",
+                        jobNature=None,
+                        location=job_element["location"],
+                        salary=None,
+                        apply_link=job_element["link"],
+                        source="Glassdoor"
+                    )
+                    scraped_jobs.append(job_listing)
+                    jobs_found_count += 1
+
+                except Exception as e:
+                    logger.warning("Error parsing a Glassdoor job card: %s", e)
+            if budget is not None:
+                budget.add(jobs_found_count - found_before_page)
+
+        except BudgetExhausted:
+            logger.debug("Search budget filled up while this page was in flight. Stopping pagination.")
+            break
+
+        # An error before any job was scraped is raised so the source is reported as errored;
+        # after that the jobs scraped so far are returned.
+        # Report the Glassdoor URL, not the ScraperAPI one: that carries the API key
+        except httpx.RequestError as exc:
+            if not scraped_jobs:
+                raise RuntimeError(f"Request to ScraperAPI for {target_url} failed: {_scrub(str(exc))}") from None
+            logger.warning("An error occurred while requesting %s via ScraperAPI: %s", target_url, _scrub(str(exc)))
+            break # Stop if connection fails
+        except httpx.HTTPStatusError as exc:
+            logger.debug("Response body: %s", exc.response.text[:500])
+            if not scraped_jobs:
+                raise RuntimeError(
+                    f"ScraperAPI error response {exc.response.status_code} while requesting {target_url}"
+                ) from None
+            logger.warning("ScraperAPI error response %d while requesting %s. Check API key and target URL.", exc.response.status_code, target_url)
+            break # Stop if API returns error
+        except Exception as e:
+            if not scraped_jobs:
+                raise
+            logger.exception("An unexpected error occurred during Glassdoor scraping: %s", e)
+            break # Stop on other errors
+
+    logger.info("Finished Glassdoor scrape. Found %d jobs.", len(scraped_jobs))
     return scraped_jobs
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Hedged requests for upstream tail latency.
+
+With HEDGING_ENABLED, a GET to a host in HEDGE_HOSTS that has not answered
+within that host's recent HEDGE_PERCENTILE latency is sent a second time.
+Whichever copy answers first is used and the other is cancelled, so a single
+stuck ScraperAPI or LinkedIn response no longer sets the search's latency.
+Each host may hedge at most HEDGE_BUDGET_RATIO of its requests, which bounds
+the extra upstream load and ScraperAPI credits.
+
+Hedging lives in the async transport of http_pool; the threaded requests
+session is not hedged.
+"""
+import asyncio
+import math
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from app.config import (
+    HEDGE_BUDGET_RATIO,
+    HEDGE_HOSTS,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    HEDGE_WINDOW,
+    HEDGING_ENABLED,
+)
+from app.services.telemetry import HEDGED_REQUESTS
+
+T = TypeVar("T")
+
+# Hedges a host can bank while its traffic is below the point where it needs any
+BUDGET_BURST = 5.0
+
+
+class LatencyTracker:
+    """
+    Response latencies of a host's last `window` requests.
+    """
+
+    def __init__(self, window: int, min_samples: int):
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Nearest-rank q-th percentile, or None until min_samples latencies are known.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < max(1, self.min_samples):
+            return None
+        return samples[max(0, math.ceil(len(samples) * q / 100) - 1)]
+
+
+class HedgeBudget:
+    """
+    Earns `ratio` of a hedge per request (up to `burst` banked); each hedge spends one.
+    """
+
+    def __init__(self, ratio: float, burst: float = BUDGET_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = 0.0
+        self._lock = threading.Lock()
+
+    def on_request(self) -> None:
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+
+class HostHedger:
+    def __init__(self, host: str):
+        self.host = host
+        self.latency = LatencyTracker(HEDGE_WINDOW, HEDGE_MIN_SAMPLES)
+        self.budget = HedgeBudget(HEDGE_BUDGET_RATIO)
+        self.requests = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.hedges_denied = 0
+
+    def delay(self) -> Optional[float]:
+        """
+        How long the first copy may take before a hedge is sent (None: not enough data yet).
+        """
+        threshold = self.latency.percentile(HEDGE_PERCENTILE)
+        return None if threshold is None else max(HEDGE_MIN_DELAY, threshold)
+
+    async def send(
+        self,
+        attempt: Callable[[bool], Awaitable[T]],
+        discard: Callable[[T], Awaitable[None]],
+    ) -> T:
+        """
+        Run `attempt(False)`, plus `attempt(True)` if the first is slow and the budget allows.
+
+        Args:
+            attempt: Sends one copy of the request; the flag marks the hedge.
+            discard: Releases the result of a copy that finished but lost the race.
+
+        Returns:
+            The first successful result. Fails only if every copy failed, with
+            the first error.
+        """
+        self.requests += 1
+        self.budget.on_request()
+        delay = self.delay()
+        if delay is None:
+            return await attempt(False)
+
+        tasks = [asyncio.ensure_future(attempt(False))]
+        winner: Optional[asyncio.Future] = None
+        errors: List[BaseException] = []
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                if self.budget.try_spend():
+                    self.hedges_sent += 1
+                    HEDGED_REQUESTS.inc(self.host, "sent")
+                    tasks.append(asyncio.ensure_future(attempt(True)))
+                    pending = set(tasks)
+                else:
+                    self.hedges_denied += 1
+                    HEDGED_REQUESTS.inc(self.host, "denied")
+            while True:
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is not None:
+                        errors.append(task.exception())
+                    elif winner is None:
+                        winner = task
+                if winner is not None or not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            if winner is None:
+                raise errors[0] if errors else asyncio.CancelledError()
+            if winner is not tasks[0]:
+                self.hedges_won += 1
+                HEDGED_REQUESTS.inc(self.host, "won")
+            return winner.result()
+        finally:
+            losers = [task for task in tasks if task is not winner]
+            for task in losers:
+                task.cancel()
+            await asyncio.gather(*losers, return_exceptions=True)
+            for task in losers:
+                # A copy can finish in the same tick the other one wins
+                if not task.cancelled() and task.exception() is None:
+                    await discard(task.result())
+
+    def stats(self) -> dict:
+        delay = self.delay()
+        return {
+            "requests": self.requests,
+            "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "hedges_denied": self.hedges_denied,
+            "hedge_ratio": round(self.hedges_sent / self.requests, 3) if self.requests else 0.0,
+        }
+
+
+_hedgers: Dict[str, HostHedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(host: str) -> Optional[HostHedger]:
+    """
+    Hedger for a host key from rate_limit.host_key, or None if the host is not hedged.
+    """
+    if not HEDGING_ENABLED or host not in HEDGE_HOSTS:
+        return None
+    with _hedgers_lock:
+        hedger = _hedgers.get(host)
+        if hedger is None:
+            hedger = _hedgers[host] = HostHedger(host)
+        return hedger
+
+
+def get_stats() -> dict:
+    return {"enabled": HEDGING_ENABLED, "hosts": {host: hedger.stats() for host, hedger in _hedgers.items()}}
@@ -0,0 +1,283 @@
+"""
+Process-wide pooled HTTP clients shared by all scrapers.
+
+One client is kept per upstream (linkedin, scraperapi, ...) so keep-alive and
+HTTP/2 connections are reused across searches instead of paying a new TCP/TLS
+handshake on every call. Clients are created on first use and closed by the
+FastAPI lifespan through aclose().
+
+Every request, sync or async, first passes the per-host rate limiter and
+circuit breaker from rate_limit, and reports its outcome back to it. Async
+GETs to hedged hosts go through hedging, which may send a second copy.
+"""
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from app.config import (
+    APIFY_API_TOKEN,
+    APIFY_API_URL,
+    HTTP2_ENABLED,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_POOL_TIMEOUT,
+)
+from app.services.hedging import HostHedger, get_hedger
+from app.services.rate_limit import HostGuard, get_guard, host_key
+from app.services.telemetry import span
+
+if TYPE_CHECKING:
+    from apify_client import ApifyClientAsync
+
+
+class PoolStats:
+    """
+    Connection reuse and pool wait counters for one upstream.
+
+    A request "reuses" a connection when it is sent without opening a new one;
+    pool wait is the time between handing the request to the transport and
+    getting a connection to send it on.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.pool_wait_total = 0.0
+        self.pool_wait_max = 0.0
+        self.pool_timeouts = 0
+
+    def record_wait(self, seconds: float) -> None:
+        self.pool_wait_total += seconds
+        self.pool_wait_max = max(self.pool_wait_max, seconds)
+
+    def as_dict(self) -> dict:
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "pool_wait_avg_ms": round(self.pool_wait_total / self.requests * 1000, 2) if self.requests else 0.0,
+            "pool_wait_max_ms": round(self.pool_wait_max * 1000, 2),
+            "pool_timeouts": self.pool_timeouts,
+        }
+
+
+class _InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """
+    AsyncHTTPTransport that paces requests per host and feeds httpcore trace
+    events into PoolStats.
+    """
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = host_key(request.url.host)
+        # Only idempotent requests can safely be sent twice
+        hedger = get_hedger(host) if request.method in ("GET", "HEAD") else None
+        # Paced before the hedge timer starts, so time queued behind the limiter never counts as a slow response
+        guard = await _pace(host)
+        if hedger is None:
+            return await self._send(request, guard, host)
+
+        async def attempt(is_hedge: bool) -> httpx.Response:
+            if not is_hedge:
+                return await self._send(request, guard, host, hedger)
+            # The extra copy is a request of its own to the limiter and breaker
+            return await self._send(_copy_request(request), await _pace(host), host, hedger)
+
+        try:
+            return await hedger.send(attempt, _discard_response)
+        except asyncio.CancelledError:
+            # Covers a first copy cancelled before it started
+            guard.abandon()
+            raise
+
+    async def _send(
+        self, request: httpx.Request, guard: HostGuard, host: str, hedger: Optional[HostHedger] = None
+    ) -> httpx.Response:
+        stats = self.stats
+        started = time.perf_counter()
+        acquired = False
+
+        async def trace(event_name: str, info: dict) -> None:
+            nonlocal acquired
+            # The first connection-level event fires once the pool has handed us a connection
+            if not acquired and event_name.endswith(".started"):
+                acquired = True
+                stats.record_wait(time.perf_counter() - started)
+            if event_name == "connection.connect_tcp.started":
+                stats.new_connections += 1
+
+        request.extensions["trace"] = trace
+        stats.requests += 1
+        try:
+            with span("http_request", host):
+                response = await super().handle_async_request(request)
+        except httpx.PoolTimeout:
+            # Our own pool is saturated; says nothing about the upstream's health
+            stats.pool_timeouts += 1
+            guard.abandon()
+            raise
+        except httpx.TransportError:
+            guard.record(None)
+            raise
+        except BaseException:
+            # Cancelled (e.g. the losing copy of a hedged request)
+            guard.abandon()
+            raise
+        guard.record(response.status_code, response.headers.get("Retry-After"))
+        if hedger is not None and response.status_code < 500:
+            hedger.latency.observe(time.perf_counter() - started)
+        return response
+
+
+async def _pace(host: str) -> HostGuard:
+    guard = get_guard(host)
+    with span("rate_limit_wait", host):
+        await guard.acquire()
+    return guard
+
+
+def _copy_request(request: httpx.Request) -> httpx.Request:
+    # Each copy gets its own extensions, since _send installs a per-attempt trace hook
+    return httpx.Request(
+        request.method, request.url, headers=request.headers, extensions=dict(request.extensions)
+    )
+
+
+async def _discard_response(response: httpx.Response) -> None:
+    await response.aclose()
+
+
+class _GuardedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that applies the same per-host limiter and breaker to the sync session.
+    """
+
+    def send(self, request, **kwargs):
+        host = host_key(urlsplit(request.url).hostname)
+        guard = get_guard(host)
+        with span("rate_limit_wait", host):
+            guard.acquire_blocking()
+        try:
+            with span("http_request", host):
+                response = super().send(request, **kwargs)
+        except requests.RequestException:
+            guard.record(None)
+            raise
+        except BaseException:
+            guard.abandon()
+            raise
+        guard.record(response.status_code, response.headers.get("Retry-After"))
+        return response
+
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_stats: Dict[str, PoolStats] = {}
+_session: Optional[requests.Session] = None
+_apify_client: Optional["ApifyClientAsync"] = None
+_sync_lock = threading.Lock()
+
+
+def get_client(
+    name: str, headers: Optional[dict] = None, timeout: float = 30.0, http2: bool = True
+) -> httpx.AsyncClient:
+    """
+    Return the shared async client for an upstream, creating it on first use.
+
+    Args:
+        name: Upstream name used for pooling and metrics (e.g. "linkedin").
+        headers: Default headers, only applied when the client is first created.
+        timeout: Read/connect timeout in seconds, only applied on creation.
+        http2: Whether to negotiate HTTP/2 (also gated by HTTP2_ENABLED).
+
+    Returns:
+        A pooled httpx.AsyncClient that must not be closed by the caller.
+    """
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        stats = _stats.setdefault(name, PoolStats())
+        limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+        transport = _InstrumentedTransport(
+            stats, http2=http2 and HTTP2_ENABLED, limits=limits, retries=0
+        )
+        client = httpx.AsyncClient(
+            transport=transport,
+            headers=headers,
+            timeout=httpx.Timeout(timeout, pool=HTTP_POOL_TIMEOUT),
+            follow_redirects=True,
+        )
+        _clients[name] = client
+    return client
+
+
+def get_session() -> requests.Session:
+    """
+    Return the shared requests.Session used by the threaded (sync) scrapers.
+    """
+    global _session
+    with _sync_lock:
+        if _session is None:
+            _session = requests.Session()
+            # 429s are left to the adaptive limiter rather than retried blindly here
+            retries = Retry(
+                total=5, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504]
+            )
+            adapter = _GuardedAdapter(
+                max_retries=retries,
+                pool_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                pool_maxsize=HTTP_MAX_CONNECTIONS,
+            )
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def get_apify_client() -> "ApifyClientAsync":
+    """
+    Return the shared async Apify client so actor and dataset calls reuse its connections.
+
+    apify_client is only imported here, so workers that never run Indeed never load it.
+    """
+    global _apify_client
+    with _sync_lock:
+        if _apify_client is None:
+            from apify_client import ApifyClientAsync
+
+            _apify_client = ApifyClientAsync(APIFY_API_TOKEN, api_url=APIFY_API_URL)
+        return _apify_client
+
+
+def get_stats() -> Dict[str, dict]:
+    return {name: stats.as_dict() for name, stats in _stats.items()}
+
+
+async def aclose() -> None:
+    """
+    Close every pooled client. Called on application shutdown.
+    """
+    global _session, _apify_client
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
+    with _sync_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+        # Its connections belong to this event loop; a later loop gets a fresh client
+        _apify_client = None
@@ -1,8 +1,24 @@
-from apify_client import ApifyClient
-from typing import List, Optional
-import asyncio
-from app.models.schemas import JobSearchRequest, JobListing
-from app.config import APIFY_API_TOKEN
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, TypeVar
+import json
+import logging
+from urllib.parse import urlparse
+from app.config import APIFY_API_URL, INDEED_DATASET_PAGE_SIZE, INDEED_RUN_REUSE_TTL
+from app.models.listing import Listing
+from app.models.schemas import JobSearchRequest
+from app.services.budget import BudgetExhausted, SearchBudget, budget_satisfied
+from app.services.cache import TTLCache
+from app.services.http_pool import get_apify_client
+from app.services.rate_limit import get_guard
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+APIFY_HOST = urlparse(APIFY_API_URL).hostname
+INDEED_ACTOR_ID = "hMvNSpz3JnHgl5jkh"
+
+# Run input (as sorted JSON) -> dataset id of the last successful actor run for it
+_recent_datasets = TTLCache(256)
 
 # Add country name to code mapping
 COUNTRY_TO_CODE = {
@@ -15,63 +31,152 @@ COUNTRY_TO_CODE = {
     # Add more mappings as needed
 }
 
-async def fetch_jobs(request: JobSearchRequest) -> List[JobListing]:
+async def fetch_jobs(
+    request: JobSearchRequest,
+    max_jobs: int = 5,
+    max_pages: Optional[int] = None,
+    budget: Optional[SearchBudget] = None,
+) -> List[Listing]:
     """
     Fetch job listings from Indeed using Apify API
+
+    Collects the pages of iter_job_pages; see there for how max_pages and the
+    search budget limit the run and the dataset reads. Errors are raised when
+    no page arrived; after that the pages read so far are returned.
     """
-    loop = asyncio.get_event_loop()
-    jobs = await loop.run_in_executor(None, lambda: _fetch_from_apify(request))
+    jobs: List[Listing] = []
+    try:
+        async for page in iter_job_pages(request, max_jobs, max_pages, budget):
+            jobs.extend(page)
+    except Exception as e:
+        if not jobs:
+            raise
+        logger.warning("Error fetching jobs from Apify after %d jobs: %s", len(jobs), e)
+    logger.info("Fetched %d jobs from Indeed via Apify", len(jobs))
     return jobs
 
-def _fetch_from_apify(request: JobSearchRequest) -> List[JobListing]:
+async def iter_job_pages(
+    request: JobSearchRequest,
+    max_jobs: int = 5,
+    max_pages: Optional[int] = None,
+    budget: Optional[SearchBudget] = None,
+) -> AsyncIterator[List[Listing]]:
     """
-    Helper function to fetch job listings from Apify
+    Run the Indeed actor and yield its dataset as Listings, one page of
+    INDEED_DATASET_PAGE_SIZE items at a time.
+
+    Each page is converted as soon as it is read, so nothing waits for (or
+    holds) the whole dataset. The dataset of an earlier successful run with the
+    same input is reused for INDEED_RUN_REUSE_TTL seconds instead of starting
+    (and paying for) a new run. The budget is checked before the run and before
+    every page; pages are added to it as they arrive.
+    """
+    if budget_satisfied(budget):
+        return
+    client = get_apify_client()
+    run_input = _build_run_input(request, max_jobs)
+    dataset_id = await _dataset_for(client, run_input)
+
+    dataset = client.dataset(dataset_id)
+    offset = 0
+    collected = 0
+    pages_left = max_pages if max_pages is not None else -(-max_jobs // INDEED_DATASET_PAGE_SIZE)
+    while collected < max_jobs and pages_left > 0:
+        limit = min(INDEED_DATASET_PAGE_SIZE, max_jobs - collected)
+        read_page = _call_apify(lambda: dataset.list_items(offset=offset, limit=limit, clean=True))
+        try:
+            page = await (budget.run(read_page) if budget is not None else read_page)
+        except BudgetExhausted:
+            return
+        jobs = [job for job in (_convert_to_job_listing(item, request) for item in page.items) if job]
+        if budget is not None:
+            budget.add(len(jobs))
+        if jobs:
+            yield jobs
+        offset += page.count
+        collected += len(jobs)
+        pages_left -= 1
+        if not page.count or offset >= page.total or budget_satisfied(budget):
+            return
+
+async def _call_apify(call: Callable[[], Awaitable[T]]) -> T:
+    """
+    Await one Apify client call under the Apify host's limiter and breaker.
     """
-    jobs = []
-    
+    guard = get_guard(APIFY_HOST)
+    await guard.acquire()
     try:
-        client = ApifyClient(APIFY_API_TOKEN)
-        
-        # Extract location components and convert country to code
-        location_parts = request.location.split(',')
-        country_name = location_parts[-1].strip().lower() if len(location_parts) > 1 else location_parts[0].strip().lower()
-        city = location_parts[0].strip() if len(location_parts) > 1 else ""
-        
-        # Get country code, default to US if not found
-        country_code = COUNTRY_TO_CODE.get(country_name, "US")
-        
-        run_input = {
-            "position": request.position,
-            "country": country_code,  # Use the country code
-            "location": city if city else country_name,
-            "maxItems": 5,
-            "parseCompanyDetails": False,
-            "saveOnlyUniqueItems": True,
-            "followApplyRedirects": False,
-        }
-        
-        print(f"Searching with parameters: {run_input}")  # Debug print
-        
-        run = client.actor("hMvNSpz3JnHgl5jkh").call(run_input=run_input)
-        
-        dataset_id = run["defaultDatasetId"]
-        items = list(client.dataset(dataset_id).iterate_items())
-        
-        for item in items:
-            job = _convert_to_job_listing(item, request)
-            if job:
-                jobs.append(job)
-                
-        print(f"Successfully fetched {len(jobs)} jobs from Indeed via Apify")
-        
+        result = await call()
     except Exception as e:
-        print(f"Error fetching jobs from Apify: {e}")
-    
-    return jobs
+        # ApifyApiError carries the HTTP status; anything else never got a response
+        guard.record(getattr(e, "status_code", None))
+        raise
+    except BaseException:
+        # Cancelled; no outcome to report
+        guard.abandon()
+        raise
+    guard.record(200)
+    return result
 
-def _convert_to_job_listing(item: dict, request: JobSearchRequest) -> Optional[JobListing]:
+def _run_info(run) -> Tuple[str, Optional[str], Optional[str]]:
     """
-    Convert an Apify job item to a JobListing object
+    (id, status, default dataset id) of a run; apify-client 1.x returns runs
+    as dicts, 2.x+ as models.
+    """
+    if isinstance(run, dict):
+        return run["id"], run.get("status"), run.get("defaultDatasetId")
+    return run.id, getattr(run.status, "value", run.status), run.default_dataset_id
+
+async def _dataset_for(client, run_input: dict) -> str:
+    """
+    Dataset id holding the actor's results for run_input, starting a run only
+    when no recent successful run had the same input.
+
+    Raises:
+        RuntimeError: The actor run did not succeed.
+    """
+    reuse_key = json.dumps(run_input, sort_keys=True)
+    if INDEED_RUN_REUSE_TTL > 0:
+        dataset_id = _recent_datasets.get(reuse_key)
+        if dataset_id is not None:
+            logger.debug("Reusing dataset %s of an earlier Indeed run with the same input", dataset_id)
+            return dataset_id
+
+    logger.debug("Searching Indeed with parameters: %s", run_input)
+    started = await _call_apify(lambda: client.actor(INDEED_ACTOR_ID).start(run_input=run_input))
+    run_id, _, _ = _run_info(started)
+    finished = await _call_apify(lambda: client.run(run_id).wait_for_finish())
+    if finished is None:
+        raise RuntimeError(f"Indeed actor run {run_id} disappeared before finishing")
+    _, status, dataset_id = _run_info(finished)
+    if status != "SUCCEEDED":
+        raise RuntimeError(f"Indeed actor run {run_id} ended with status {status}")
+    if INDEED_RUN_REUSE_TTL > 0:
+        _recent_datasets.set(reuse_key, dataset_id, INDEED_RUN_REUSE_TTL)
+    return dataset_id
+
+def _build_run_input(request: JobSearchRequest, max_jobs: int) -> dict:
+    # Extract location components and convert country to code
+    location_parts = (request.location or "").split(',')
+    country_name = location_parts[-1].strip().lower() if len(location_parts) > 1 else location_parts[0].strip().lower()
+    city = location_parts[0].strip() if len(location_parts) > 1 else ""
+
+    # Get country code, default to US if not found
+    country_code = COUNTRY_TO_CODE.get(country_name, "US")
+
+    return {
+        "position": request.position,
+        "country": country_code,  # Use the country code
+        "location": city if city else country_name,
+        "maxItems": max_jobs,
+        "parseCompanyDetails": False,
+        "saveOnlyUniqueItems": True,
+        "followApplyRedirects": False,
+    }
+
+def _convert_to_job_listing(item: dict, request: JobSearchRequest) -> Optional[Listing]:
+    """
+    Convert an Apify job item to a Listing
     """
     try:
         # Extract job nature from jobType if available
@@ -86,24 +191,13 @@ def _convert_to_job_listing(item: dict, request: JobSearchRequest) -> Optional[J
                 job_nature = "Onsite"
             else:
                 job_nature = job_types[0]  # Use the first job type if none of the above
-        
+
         # Use the requested job nature if not found in the data
         if job_nature == "Not specified" and request.jobNature:
             job_nature = request.jobNature
-        
-        
-        # print few jobs for debugging purposes
-        print("--------Indeed job----------")
-        print(f"Job Title: {item.get('positionName', 'Not specified')}")
-        print(f"Company: {item.get('company', 'Not specified')}")
-        print(f"Location: {item.get('location', 'Not specified')}")
-        print(f"Experience: {request.experience}")
-        print(f"Salary: {item.get('salary', request.salary or 'Not specified')}")
-        print(f"Apply Link: {item.get('url', '')}")
-        print("-" * 50)
 
         # Map fields to JobListing schema
-        return JobListing(
+        listing = Listing(
             job_title=item.get("positionName", "Not specified"),
             company=item.get("company", "Not specified"),
             experience=request.experience,  # Use the requested experience
@@ -113,7 +207,12 @@ def _convert_to_job_listing(item: dict, request: JobSearchRequest) -> Optional[J
             apply_link=item.get("url", ""),
             source="Indeed (via Apify)"
         )
-    
+        # Listings are not validated; Apify items are untyped JSON, so check what JobListing would
+        required = (listing.job_title, listing.company, listing.location, listing.apply_link, listing.jobNature)
+        if not all(isinstance(value, str) for value in required) or not isinstance(listing.salary, (str, type(None))):
+            raise ValueError(f"Non-string field in item {item.get('id')!r}")
+        return listing
+
     except Exception as e:
-        print(f"Error converting job item: {e}")
+        logger.warning("Error converting Indeed job item: %s", e)
         return None
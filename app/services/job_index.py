@@ -0,0 +1,155 @@
+"""
+Local SQLite index of crawled job listings with FTS5 over title, company and location.
+
+Rows are keyed on apply_link. A posting keeps the first_seen timestamp of the
+crawl that found it; later crawls only bump last_seen, so they add new
+postings without rewriting the full-text index. Calls are synchronous and
+meant to be run through asyncio.to_thread.
+"""
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from app.config import CRAWLER_ENABLED, JOB_INDEX_PATH
+from app.models.listing import Listing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    apply_link TEXT PRIMARY KEY,
+    source_name TEXT NOT NULL,
+    source TEXT NOT NULL,
+    job_title TEXT NOT NULL,
+    company TEXT NOT NULL,
+    location TEXT NOT NULL,
+    experience TEXT NOT NULL,
+    jobNature TEXT,
+    salary TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs (last_seen);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    job_title, company, location, content='jobs', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts (rowid, job_title, company, location)
+    VALUES (new.rowid, new.job_title, new.company, new.location);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, job_title, company, location)
+    VALUES ('delete', old.rowid, old.job_title, old.company, old.location);
+END;
+"""
+
+# Column weights for bm25(): title matches matter most
+FTS_WEIGHTS = (2.0, 1.0, 0.5)
+
+
+def _terms(text: Optional[str]) -> List[str]:
+    # Quoted prefix terms, so FTS5 operators or punctuation in user input are never parsed as syntax
+    return [f'"{term}"*' for term in re.findall(r"\w+", (text or "").lower())]
+
+
+def match_expression(position: str, location: Optional[str]) -> Optional[str]:
+    """
+    FTS5 query requiring every position word in the title and, when a location
+    is given, every word of its first part (the city) in the location.
+    """
+    title_terms = _terms(position)
+    if not title_terms:
+        return None
+    expression = f"job_title : ({' AND '.join(title_terms)})"
+    location_terms = _terms((location or "").split(",")[0])
+    if location_terms:
+        expression += f" AND location : ({' AND '.join(location_terms)})"
+    return expression
+
+
+class JobIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def add(self, source_name: str, jobs: List[Listing], seen_at: Optional[float] = None) -> int:
+        """
+        Record one crawl's listings for a source.
+
+        Returns:
+            How many of them were new postings.
+        """
+        seen_at = seen_at if seen_at is not None else time.time()
+        rows = [
+            (
+                job.apply_link, source_name, job.source, job.job_title, job.company, job.location,
+                job.experience, job.jobNature, job.salary, seen_at, seen_at,
+            )
+            for job in jobs
+            if job.apply_link
+        ]
+        with self._lock:
+            # rowcount (unlike total_changes) leaves out the rows the FTS triggers write
+            added = self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (apply_link, source_name, source, job_title, company, location,"
+                " experience, jobNature, salary, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            ).rowcount
+            self._conn.executemany(
+                "UPDATE jobs SET last_seen = ? WHERE apply_link = ?", [(seen_at, row[0]) for row in rows]
+            )
+            self._conn.commit()
+        return added
+
+    def search(
+        self, position: str, location: Optional[str], sources: List[str], max_age: float, limit: int
+    ) -> List[Tuple[str, Listing]]:
+        """
+        Best-matching listings seen within max_age seconds, as (source name, listing) pairs.
+        """
+        expression = match_expression(position, location)
+        if expression is None or not sources:
+            return []
+        placeholders = ", ".join("?" * len(sources))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT j.source_name, j.job_title, j.company, j.experience, j.jobNature, j.location,"
+                " j.salary, j.apply_link, j.source"
+                " FROM jobs_fts JOIN jobs j ON j.rowid = jobs_fts.rowid"
+                f" WHERE jobs_fts MATCH ? AND j.last_seen >= ? AND j.source_name IN ({placeholders})"
+                f" ORDER BY bm25(jobs_fts, {', '.join(map(str, FTS_WEIGHTS))}), j.last_seen DESC LIMIT ?",
+                (expression, time.time() - max_age, *sources, limit),
+            ).fetchall()
+        return [
+            (
+                row[0],
+                Listing(
+                    job_title=row[1], company=row[2], experience=row[3], jobNature=row[4],
+                    location=row[5], salary=row[6], apply_link=row[7], source=row[8],
+                ),
+            )
+            for row in rows
+        ]
+
+    def prune(self, max_age: float) -> int:
+        """
+        Drop postings no crawl has seen for max_age seconds.
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE last_seen < ?", (time.time() - max_age,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+job_index = JobIndex(JOB_INDEX_PATH) if CRAWLER_ENABLED else None
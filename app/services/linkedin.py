@@ -1,21 +1,25 @@
 from typing import List, Optional
-from app.models.schemas import JobListing, JobSearchRequest
-from bs4 import BeautifulSoup
+from app.config import LINKEDIN_ASYNC, LINKEDIN_GUEST_API_URL, LINKEDIN_PAGE_CONCURRENCY
+from app.models.listing import Listing
+from app.models.schemas import JobSearchRequest
+from app.services.budget import BudgetExhausted, SearchBudget, budget_satisfied
+from app.services.extract import JobRecord, clean_linkedin_url
+from app.services.http_pool import get_client, get_session
+from app.services.parse_pool import parse_pool
+import httpx
+import logging
+import math
 import requests
-import time
-import random
 from urllib.parse import quote
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
 import asyncio
 
+logger = logging.getLogger(__name__)
+
 class LinkedInScraper:
     def __init__(self):
         self.session = self._setup_session()
-        self.BASE_URL = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+        self.BASE_URL = LINKEDIN_GUEST_API_URL
         self.JOBS_PER_PAGE = 25
-        self.MIN_DELAY = 2
-        self.MAX_DELAY = 5
         self.HEADERS = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -25,14 +29,14 @@ class LinkedInScraper:
             "DNT": "1",
             "Cache-Control": "no-cache",
         }
+        # httpx negotiates compression and connection reuse itself (and HTTP/2 forbids Connection)
+        self.ASYNC_HEADERS = {
+            k: v for k, v in self.HEADERS.items() if k not in ("Accept-Encoding", "Connection")
+        }
 
     def _setup_session(self) -> requests.Session:
-        session = requests.Session()
-        retries = Retry(
-            total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]
-        )
-        session.mount("https://", HTTPAdapter(max_retries=retries))
-        return session
+        # Process-wide session, so keep-alive connections survive across searches
+        return get_session()
 
     def _build_search_url(self, position: str, location: str, start: int = 0) -> str:
         params = {
@@ -43,71 +47,179 @@ class LinkedInScraper:
         return f"{self.BASE_URL}?{'&'.join(f'{k}={quote(str(v))}' for k, v in params.items())}"
 
     def _clean_job_url(self, url: str) -> str:
-        return url.split("?")[0] if "?" in url else url
+        return clean_linkedin_url(url)
 
-    def _extract_job_data(self, job_card: BeautifulSoup, request: JobSearchRequest) -> Optional[JobListing]:
+    def _extract_job_data(self, job_card: JobRecord, request: JobSearchRequest) -> Optional[Listing]:
         try:
-            title = job_card.find("h3", class_="base-search-card__title").text.strip()
-            company = job_card.find("h4", class_="base-search-card__subtitle").text.strip()
-            location = job_card.find("span", class_="job-search-card__location").text.strip()
-            job_link = self._clean_job_url(
-                job_card.find("a", class_="base-card__full-link")["href"]
-            )
-            
-            return JobListing(
-                job_title=title,
-                company=company,
+            return Listing(
+                job_title=job_card["title"],
+                company=job_card["company"],
                 experience=request.experience,  # Using requested experience
                 jobNature=request.jobNature or "Not specified",
-                location=location,
+                location=job_card["location"],
                 salary=request.salary or "Not specified",
-                apply_link=job_link,
+                apply_link=job_card["link"],
                 source="LinkedIn"
             )
         except Exception as e:
-            print(f"Failed to extract job data: {str(e)}")
+            logger.warning("Failed to extract job data: %s", e)
             return None
 
-    def _fetch_job_page(self, url: str) -> BeautifulSoup:
+    def _fetch_job_page(self, url: str) -> List[JobRecord]:
         try:
             response = self.session.get(url, headers=self.HEADERS)
             response.raise_for_status()
-            return BeautifulSoup(response.text, "html.parser")
+            # requests assumes ISO-8859-1 for text/html without a charset; let the parser default to utf-8
+            encoding = response.encoding if "charset" in response.headers.get("Content-Type", "") else None
+            return parse_pool.extract_blocking("linkedin", response.content, encoding)
         except requests.RequestException as e:
             raise RuntimeError(f"Request failed: {str(e)}")
 
-    def _scrape_jobs_sync(self, request: JobSearchRequest) -> List[JobListing]:
+    def _scrape_jobs_sync(
+        self,
+        request: JobSearchRequest,
+        max_jobs: int = 10,
+        max_pages: Optional[int] = None,
+        budget: Optional[SearchBudget] = None,
+    ) -> List[Listing]:
         all_jobs = []
         start = 0
-        max_jobs = 10  # Default limit
+        pages_left = max_pages if max_pages is not None else math.ceil(max_jobs / self.JOBS_PER_PAGE)
 
-        while len(all_jobs) < max_jobs:
+        while len(all_jobs) < max_jobs and pages_left > 0 and not budget_satisfied(budget):
+            pages_left -= 1
             try:
                 url = self._build_search_url(request.position, request.location or "", start)
-                soup = self._fetch_job_page(url)
-                job_cards = soup.find_all("div", class_="base-card")
+                job_cards = self._fetch_job_page(url)
 
                 if not job_cards:
                     break
 
+                collected = len(all_jobs)
                 for card in job_cards:
                     job_data = self._extract_job_data(card, request)
                     if job_data:
                         all_jobs.append(job_data)
                         if len(all_jobs) >= max_jobs:
                             break
+                if budget is not None:
+                    budget.add(len(all_jobs) - collected)
 
-                print(f"Scraped {len(all_jobs)} jobs from LinkedIn...")
+                logger.debug("Scraped %d jobs from LinkedIn...", len(all_jobs))
+                # Pacing between pages is done by the shared per-host limiter in the session
                 start += self.JOBS_PER_PAGE
-                time.sleep(random.uniform(self.MIN_DELAY, self.MAX_DELAY))
                 
             except Exception as e:
-                print(f"LinkedIn scraping error: {str(e)}")
+                # Nothing scraped yet: let the orchestrator report the source as errored
+                if not all_jobs:
+                    raise
+                logger.warning("LinkedIn scraping error after %d jobs: %s", len(all_jobs), e)
+                break
+
+        return all_jobs[:max_jobs]
+
+    async def _fetch_job_page_async(self, client: httpx.AsyncClient, url: str) -> List[JobRecord]:
+        try:
+            response = await client.get(url, headers=self.ASYNC_HEADERS)
+            response.raise_for_status()
+            return await parse_pool.extract("linkedin", response.content, response.encoding)
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Request failed: {str(e)}")
+
+    async def _scrape_jobs_async(
+        self,
+        request: JobSearchRequest,
+        max_jobs: int = 10,
+        max_pages: Optional[int] = None,
+        budget: Optional[SearchBudget] = None,
+    ) -> List[Listing]:
+        """
+        Event-loop native version of _scrape_jobs_sync.
+
+        Fetches up to LINKEDIN_PAGE_CONCURRENCY result pages (consecutive `start`
+        offsets) at once over the shared HTTP/2 client, paced by the per-host
+        rate limiter in the transport instead of sleeping between pages. Page
+        fetches still in flight when the search budget fills up are cancelled.
+        """
+        client = _get_async_client()
+        all_jobs = []
+        start = 0
+        pages_left = max_pages if max_pages is not None else math.ceil(max_jobs / self.JOBS_PER_PAGE)
+
+        while len(all_jobs) < max_jobs and pages_left > 0 and not budget_satisfied(budget):
+            pages_needed = min(math.ceil((max_jobs - len(all_jobs)) / self.JOBS_PER_PAGE), pages_left)
+            offsets = [
+                start + i * self.JOBS_PER_PAGE
+                for i in range(max(1, min(LINKEDIN_PAGE_CONCURRENCY, pages_needed)))
+            ]
+            urls = [self._build_search_url(request.position, request.location or "", offset) for offset in offsets]
+            fetches = [self._fetch_job_page_async(client, url) for url in urls]
+            if budget is not None:
+                # Count each page as soon as it lands (up to what this source still wants),
+                # so a full budget cancels the rest of the window
+                claimable = [max_jobs - len(all_jobs)]
+
+                def claim(cards: List[JobRecord]) -> int:
+                    taken = min(len(cards), claimable[0])
+                    claimable[0] -= taken
+                    return taken
+
+                fetches = [budget.run(fetch, measure=claim) for fetch in fetches]
+            pages = await asyncio.gather(*fetches, return_exceptions=True)
+
+            exhausted = False
+            for job_cards in pages:
+                if isinstance(job_cards, BudgetExhausted):
+                    # Later pages in the window may have landed before the budget filled
+                    exhausted = True
+                    continue
+
+                if isinstance(job_cards, asyncio.CancelledError):
+                    raise job_cards
+
+                if isinstance(job_cards, BaseException):
+                    if not all_jobs:
+                        raise job_cards
+                    logger.warning("LinkedIn scraping error after %d jobs: %s", len(all_jobs), job_cards)
+                    exhausted = True
+                    break
+
+                if not job_cards:
+                    exhausted = True
+                    break
+
+                for card in job_cards:
+                    job_data = self._extract_job_data(card, request)
+                    if job_data:
+                        all_jobs.append(job_data)
+                        if len(all_jobs) >= max_jobs:
+                            break
+                if len(all_jobs) >= max_jobs:
+                    break
+
+            logger.debug("Scraped %d jobs from LinkedIn...", len(all_jobs))
+            if exhausted:
                 break
+            start += len(offsets) * self.JOBS_PER_PAGE
+            pages_left -= len(offsets)
 
         return all_jobs[:max_jobs]
 
-async def fetch_linkedin_jobs(request: JobSearchRequest) -> List[JobListing]:
-    scraper = LinkedInScraper()
+
+_scraper = LinkedInScraper()
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    return get_client("linkedin", timeout=30.0)
+
+
+async def fetch_linkedin_jobs(
+    request: JobSearchRequest,
+    max_jobs: int = 10,
+    max_pages: Optional[int] = None,
+    budget: Optional[SearchBudget] = None,
+) -> List[Listing]:
+    if LINKEDIN_ASYNC:
+        return await _scraper._scrape_jobs_async(request, max_jobs, max_pages, budget)
     loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, scraper._scrape_jobs_sync, request)
\ No newline at end of file
+    return await loop.run_in_executor(None, _scraper._scrape_jobs_sync, request, max_jobs, max_pages, budget)
\ No newline at end of file
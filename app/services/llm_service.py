@@ -1,164 +1,493 @@
-import google.generativeai as genai
 import asyncio
+import hashlib
 import json
-from typing import List
-from app.models.schemas import JobSearchRequest, JobListing
-from app.config import GEMINI_API_KEY
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.models.listing import Listing
+from app.models.schemas import JobSearchRequest
+from app.config import (
+    GEMINI_API_KEY,
+    LLM_BATCH_PROFILES,
+    LLM_CHUNK_SIZE,
+    LLM_MAX_CONCURRENCY,
+    RELEVANCE_CACHE_ENABLED,
+    RELEVANCE_CACHE_MAX_ENTRIES,
+    RELEVANCE_CACHE_TTL,
+    RANKER_MODE,
+    RANKER_TOP_K,
+)
+from app.services.admission import admission
+from app.services.cache import TTLCache, normalize_text
+from app.services.ranking import BM25Index, local_relevance_filter, rank_jobs
+from app.services.telemetry import span
 
-# Configure Gemini
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel("gemini-1.5-flash")
+logger = logging.getLogger(__name__)
 
+# Gemini model, created by _get_model() on first use
+model = None
+_model_lock = threading.Lock()
 
-async def filter_relevant_jobs(
-    request: JobSearchRequest, jobs: List[JobListing]
-) -> List[JobListing]:
-    print("\n=== STARTING LLM FILTERING ===")
-    print(f"Received {len(jobs)} jobs to filter")
+# Fewest jobs the LLM is asked to select when it sees a candidate's whole job set
+MIN_SELECTED_JOBS = 3
+_MATCHING_RULES = (
+    "Match position titles and skills",
+    "Consider experience level",
+    "Location match gets priority",
+    "Include partial matches",
+)
 
-    if not jobs:
-        print("No jobs to filter!")
+# (profile hash, job key from _relevance_key) -> whether the LLM judged the job relevant
+relevance_cache = TTLCache(RELEVANCE_CACHE_MAX_ENTRIES)
+
+
+def _get_model():
+    """
+    Return the Gemini model, importing and configuring the SDK on first use.
+
+    google.generativeai takes most of a second to import, so it is kept off
+    the import path of app.main; the lifespan loads it in the background via
+    warm_up().
+    """
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                import google.generativeai as genai
+
+                genai.configure(api_key=GEMINI_API_KEY)
+                model = genai.GenerativeModel("gemini-1.5-flash")
+    return model
+
+
+def warm_up() -> None:
+    """
+    Load the Gemini SDK and model now (blocking) instead of on the first search.
+    """
+    _get_model()
+
+
+def _build_candidate_profile(request: JobSearchRequest) -> dict:
+    return {
+        "position": request.position,
+        "experience": request.experience,
+        "skills": request.skills,
+        "preferences": {
+            "job_nature": request.jobNature or "Any",
+            "location": request.location or "Any",
+            "salary": request.salary or "Flexible",
+        },
+    }
+
+
+def _profile_hash(candidate_profile: dict) -> str:
+    normalized = {
+        key: normalize_text(value) if isinstance(value, str) else value
+        for key, value in candidate_profile.items()
+    }
+    normalized["preferences"] = {
+        key: normalize_text(value) for key, value in candidate_profile["preferences"].items()
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+def _relevance_key(profile_hash: str, job: Listing) -> str:
+    # Listings without a link would all share one key; tell them apart by what they show instead
+    if job.apply_link:
+        return f"{profile_hash}|{job.apply_link}"
+    shown = "|".join(normalize_text(value) for value in (job.job_title, job.company, job.location))
+    return f"{profile_hash}||{shown}"
+
+
+def _listings_json(jobs: List[Listing]) -> str:
+    # Same JSON as dumping a list of dicts, but each listing's fields are serialized once and reused
+    return "[" + ",".join(
+        f'{{"job_number":{idx},{job.prompt_fields()}}}' for idx, job in enumerate(jobs, 1)
+    ) + "]"
+
+
+async def _generate(prompt: str, job_count: int) -> str:
+    # Slicing/formatting a large prompt is not free, so only do it when DEBUG is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Prompt sent to LLM (%d chars): %s", len(prompt), prompt[:2000])
+
+    # Each call holds an executor thread until Gemini answers, so their number is capped across searches
+    with await admission.stage("llm"):
+        with span("llm_call", jobs=job_count):
+            # The first call may still have to load the SDK, so that happens off the loop too
+            response = await asyncio.to_thread(lambda: _get_model().generate_content(prompt))
+    response_text = response.text.strip()
+    logger.debug("Raw LLM response: %s", response_text)
+    return response_text
+
+
+def _rules(*rules: str) -> str:
+    # The numbered [RULES] lines, indented like the rest of the prompt
+    return "\n        ".join(f"{number}. {rule}" for number, rule in enumerate(rules, 1))
+
+
+def _valid_indices(relevant_indices: Any, job_count: int) -> List[int]:
+    """
+    Convert the LLM's 1-based job numbers to 0-based indices, dropping invalid ones.
+    An empty array is a valid answer (no job in the prompt is relevant).
+    """
+    if not isinstance(relevant_indices, list):
+        raise ValueError("Invalid response format")
+    if not relevant_indices:
         return []
 
-    if len(jobs) <= 3:
-        print(f"Few jobs ({len(jobs)}), skipping LLM filter")
-        return jobs
+    valid_indices = []
+    for idx in relevant_indices:
+        if isinstance(idx, int) and 1 <= idx <= job_count:
+            valid_indices.append(idx - 1)
+        else:
+            logger.debug("Invalid index skipped: %r", idx)
 
-    try:
-        # Build candidate profile
-        candidate_profile = {
-            "position": request.position,
-            "experience": request.experience,
-            "skills": request.skills,
-            "preferences": {
-                "job_nature": request.jobNature or "Any",
-                "location": request.location or "Any",
-                "salary": request.salary or "Flexible",
-            },
-        }
-
-        # Prepare job listings
-        job_listings = []
-        for idx, job in enumerate(jobs, 1):
-            job_listings.append(
-                {
-                    "job_number": idx,
-                    "title": job.job_title,
-                    "company": job.company,
-                    "experience": job.experience,
-                    "location": job.location,
-                    "job_nature": job.jobNature or "Not specified",
-                }
-            )
+    if not valid_indices:
+        raise ValueError("No valid indices")
 
-        # Create prompt
-        prompt = f"""
+    return valid_indices
+
+
+async def _llm_select(candidate_profile: dict, jobs: List[Listing], minimum: int = 0) -> List[int]:
+    """
+    Ask Gemini which of `jobs` are relevant to the candidate.
+
+    Args:
+        minimum: Jobs the LLM must select at least; only meaningful when `jobs`
+            is everything the candidate is judged on, not one chunk of it.
+
+    Returns:
+        0-based indices into `jobs`. Raises ValueError when the response
+        cannot be parsed or selects nothing valid.
+    """
+    # Create prompt
+    prompt = f"""
         [SYSTEM PROMPT]
         You are a job matching expert. Analyze this candidate profile and job listings.
         Return ONLY a JSON array of relevant job numbers like [1,3,5].
 
         [CANDIDATE PROFILE]
-        {json.dumps(candidate_profile, indent=2)}
+        {json.dumps(candidate_profile, separators=(",", ":"))}
 
         [JOB LISTINGS]
-        {json.dumps(job_listings, indent=2)}
+        {_listings_json(jobs)}
 
         [RULES]
-        1. Match position titles and skills
-        2. Consider experience level
-        3. Location match gets priority
-        4. Include partial matches
-        5. Select at least 3 jobs
-        6. Return ONLY the array
+        {_rules(*_MATCHING_RULES, *([f"Select at least {minimum} jobs"] if minimum else []), "Return ONLY the array")}
         """
+    response_text = await _generate(prompt, len(jobs))
+
+    # Parse response
+    start_idx = response_text.find("[")
+    end_idx = response_text.find("]")
 
-        print("\n=== PROMPT SENT TO LLM ===")
-        print(prompt[:2000] + "\n... [truncated]")  # Print first 2000 chars
+    if start_idx == -1 or end_idx == -1:
+        raise ValueError("No array found")
 
-        # Get LLM response
-        print("\nAwaiting LLM response...")
-        response = await asyncio.to_thread(model.generate_content, prompt)
-        response_text = response.text.strip()
+    json_text = response_text[start_idx : end_idx + 1]
+    return _valid_indices(json.loads(json_text), len(jobs))
 
-        print("\n=== RAW LLM RESPONSE ===")
-        print(response_text)
 
-        # Parse response
+async def _llm_select_many(
+    candidate_profiles: List[dict], jobs: List[Listing], minimum: int = 0
+) -> List[Optional[List[int]]]:
+    """
+    _llm_select for several candidates in one prompt.
+
+    Returns:
+        Per candidate, 0-based indices into `jobs`, or None when the response
+        has no valid selection for that candidate. Raises ValueError when the
+        response cannot be parsed at all.
+    """
+    if len(candidate_profiles) == 1:
         try:
-            print("\nAttempting to parse response...")
-            start_idx = response_text.find("[")
-            end_idx = response_text.find("]")
+            return [await _llm_select(candidate_profiles[0], jobs, minimum)]
+        except ValueError:
+            return [None]
 
-            if start_idx == -1 or end_idx == -1:
-                print("❗ No array found in response")
-                raise ValueError("No array found")
+    numbered_profiles = [
+        {"candidate_number": number, **profile} for number, profile in enumerate(candidate_profiles, 1)
+    ]
+    prompt = f"""
+        [SYSTEM PROMPT]
+        You are a job matching expert. Analyze these candidate profiles and job listings.
+        Return ONLY a JSON object mapping each candidate number to an array of its relevant job numbers like {{"1":[1,3,5],"2":[2,4,6]}}.
 
-            json_text = response_text[start_idx : end_idx + 1]
-            print(f"Extracted JSON text: {json_text}")
+        [CANDIDATE PROFILES]
+        {json.dumps(numbered_profiles, separators=(",", ":"))}
 
-            relevant_indices = json.loads(json_text)
-            print(f"Parsed indices: {relevant_indices}")
+        [JOB LISTINGS]
+        {_listings_json(jobs)}
 
-            if not isinstance(relevant_indices, list):
-                print("❗ Response is not a list")
-                raise ValueError("Invalid response format")
+        [RULES]
+        {_rules(
+            *_MATCHING_RULES,
+            *([f"Select at least {minimum} jobs per candidate"] if minimum else []),
+            "Include every candidate number",
+            "Return ONLY the object",
+        )}
+        """
+    response_text = await _generate(prompt, len(jobs))
 
-            # Convert to 0-based indices
-            valid_indices = []
-            for idx in relevant_indices:
-                if isinstance(idx, int) and 1 <= idx <= len(jobs):
-                    valid_indices.append(idx - 1)
-                else:
-                    print(f"⚠️ Invalid index skipped: {idx}")
+    start_idx = response_text.find("{")
+    end_idx = response_text.rfind("}")
+    if start_idx == -1 or end_idx == -1:
+        raise ValueError("No object found")
+    selections = json.loads(response_text[start_idx : end_idx + 1])
+    if not isinstance(selections, dict):
+        raise ValueError("Invalid response format")
+
+    results: List[Optional[List[int]]] = []
+    for number in range(1, len(candidate_profiles) + 1):
+        try:
+            results.append(_valid_indices(selections.get(str(number)), len(jobs)))
+        except ValueError as e:
+            logger.debug("No usable selection for candidate %d: %s", number, e)
+            results.append(None)
+    return results
+
+
+async def _select_in_chunks(
+    request: JobSearchRequest, candidate_profile: dict, jobs: List[Listing], whole: bool = True
+) -> Tuple[List[bool], List[bool]]:
+    """
+    Score `jobs` in LLM_CHUNK_SIZE prompts, at most LLM_MAX_CONCURRENCY at a time.
+
+    Each chunk is numbered from 1 in its own prompt and mapped back to its
+    position in `jobs`. A chunk whose LLM call fails falls back to keyword
+    matching on that chunk alone. The LLM is only held to MIN_SELECTED_JOBS
+    when one prompt holds every job (`whole`: `jobs` is everything the
+    candidate is judged on); otherwise weak chunks would each pad the result.
 
-            print(f"Valid indices after conversion: {valid_indices}")
+    Returns:
+        Per-job relevance verdicts and, per job, whether the verdict came from the LLM.
+    """
+    chunk_size = max(1, LLM_CHUNK_SIZE)
+    chunks = [jobs[offset : offset + chunk_size] for offset in range(0, len(jobs), chunk_size)]
+    semaphore = asyncio.Semaphore(max(1, LLM_MAX_CONCURRENCY))
+    minimum = MIN_SELECTED_JOBS if whole and len(chunks) == 1 else 0
 
-            if not valid_indices:
-                print("⚠️ No valid indices, using fallback")
-                return keyword_matching_fallback(request, jobs)
+    async def score_chunk(number: int, chunk: List[Listing]) -> Tuple[List[bool], bool]:
+        async with semaphore:
+            try:
+                selected = set(await _llm_select(candidate_profile, chunk, minimum))
+                return [i in selected for i in range(len(chunk))], True
+            except Exception as e:
+                logger.warning("LLM chunk %d failed (%s), using keyword fallback for it", number, e)
+                kept = {id(job) for job in keyword_matching_fallback(request, chunk)}
+                return [id(job) in kept for job in chunk], False
 
-            filtered_jobs = [jobs[i] for i in valid_indices if i < len(jobs)]
-            print(f"\n=== FINAL FILTERED JOBS ({len(filtered_jobs)}) ===")
-            for job in filtered_jobs:
-                print(f"- {job.job_title} | {job.company}")
+    if len(chunks) > 1:
+        logger.debug("Scoring %d jobs in %d chunks of up to %d", len(jobs), len(chunks), chunk_size)
+    results = await asyncio.gather(*(score_chunk(n, chunk) for n, chunk in enumerate(chunks, 1)))
 
-            return filtered_jobs
+    verdicts: List[bool] = []
+    from_llm: List[bool] = []
+    for chunk_verdicts, chunk_from_llm in results:
+        verdicts.extend(chunk_verdicts)
+        from_llm.extend([chunk_from_llm] * len(chunk_verdicts))
+    return verdicts, from_llm
 
-        except Exception as parse_error:
-            print(f"\n❗ PARSING ERROR: {str(parse_error)}")
-            print("Attempting keyword fallback...")
+
+async def filter_relevant_jobs(
+    request: JobSearchRequest, jobs: List[Listing]
+) -> List[Listing]:
+    logger.debug("Filtering %d jobs for relevance", len(jobs))
+
+    if not jobs:
+        return []
+
+    if len(jobs) <= 3:
+        logger.debug("Few jobs (%d), skipping LLM filter", len(jobs))
+        return jobs
+
+    if RANKER_MODE == "replace":
+        with span("rank", jobs=len(jobs)):
+            return local_relevance_filter(request, jobs)
+
+    if RANKER_MODE == "prefilter" and len(jobs) > RANKER_TOP_K:
+        logger.debug("Pre-filtering %d jobs to the top %d by BM25 score", len(jobs), RANKER_TOP_K)
+        with span("rank", jobs=len(jobs)):
+            jobs = rank_jobs(request, jobs, top_k=RANKER_TOP_K)
+
+    try:
+        # Build candidate profile
+        candidate_profile = _build_candidate_profile(request)
+        profile_hash = _profile_hash(candidate_profile)
+
+        # Reuse verdicts already given for this profile; only unseen jobs go to the LLM
+        verdicts: Dict[int, bool] = {}
+        unseen: List[int] = []
+        for i, job in enumerate(jobs):
+            cached = relevance_cache.get(_relevance_key(profile_hash, job)) if RELEVANCE_CACHE_ENABLED else None
+            if cached is None:
+                unseen.append(i)
+            else:
+                verdicts[i] = cached
+        logger.debug("Relevance cache: %d cached verdicts, %d jobs sent to LLM", len(verdicts), len(unseen))
+
+        if unseen:
+            unseen_jobs = [jobs[i] for i in unseen]
+            new_verdicts, from_llm = await _select_in_chunks(
+                request, candidate_profile, unseen_jobs, whole=len(unseen) == len(jobs)
+            )
+            for i, job, verdict, is_llm_verdict in zip(unseen, unseen_jobs, new_verdicts, from_llm):
+                verdicts[i] = verdict
+                # Keyword-fallback guesses are not cached, so the LLM gets another chance next time
+                if RELEVANCE_CACHE_ENABLED and is_llm_verdict:
+                    relevance_cache.set(_relevance_key(profile_hash, job), verdict, RELEVANCE_CACHE_TTL)
+
+        filtered_jobs = [job for i, job in enumerate(jobs) if verdicts[i]]
+        if not filtered_jobs:
+            logger.info("LLM judged no job relevant, using keyword fallback")
             return keyword_matching_fallback(request, jobs)
 
+        logger.info("Kept %d of %d jobs as relevant", len(filtered_jobs), len(jobs))
+        return filtered_jobs
+
     except Exception as e:
-        print(f"\n❗ GENERAL ERROR: {str(e)}")
+        logger.warning("LLM filtering failed (%s), using keyword fallback", e)
         return keyword_matching_fallback(request, jobs)
 
 
+async def filter_relevant_jobs_batch(
+    requests: List[JobSearchRequest], jobs: List[Listing]
+) -> List[List[Listing]]:
+    """
+    filter_relevant_jobs for several candidates judged against one shared pool of jobs.
+
+    Each prompt scores up to LLM_BATCH_PROFILES candidates against one
+    LLM_CHUNK_SIZE chunk of jobs, so a pool costs about
+    ceil(candidates / LLM_BATCH_PROFILES) * ceil(jobs / LLM_CHUNK_SIZE) calls
+    instead of one set of chunks per candidate. With RANKER_MODE=prefilter each
+    candidate is still only judged on its own top RANKER_TOP_K jobs. Cached
+    verdicts are reused and only (candidate, job) pairs without one are asked.
+
+    Returns:
+        The relevant jobs of each candidate, in the order of `requests`.
+    """
+    if not jobs:
+        return [[] for _ in requests]
+
+    if len(jobs) <= 3:
+        return [list(jobs) for _ in requests]
+
+    if RANKER_MODE == "replace":
+        with span("rank", jobs=len(jobs)):
+            return [local_relevance_filter(request, jobs) for request in requests]
+
+    # Jobs (as indices into `jobs`) each candidate is judged on
+    candidates = [list(range(len(jobs))) for _ in requests]
+    if RANKER_MODE == "prefilter" and len(jobs) > RANKER_TOP_K:
+        position = {id(job): i for i, job in enumerate(jobs)}
+        with span("rank", jobs=len(jobs)):
+            index = BM25Index(jobs)
+            candidates = [
+                [position[id(job)] for job in rank_jobs(request, jobs, top_k=RANKER_TOP_K, index=index)]
+                for request in requests
+            ]
+
+    try:
+        profiles = [_build_candidate_profile(request) for request in requests]
+        profile_hashes = [_profile_hash(profile) for profile in profiles]
+
+        verdicts: List[Dict[int, bool]] = [{} for _ in requests]
+        # Job index -> candidates still needing a verdict on it
+        unseen: Dict[int, Set[int]] = {}
+        for c, indices in enumerate(candidates):
+            for i in indices:
+                key = _relevance_key(profile_hashes[c], jobs[i])
+                cached = relevance_cache.get(key) if RELEVANCE_CACHE_ENABLED else None
+                if cached is None:
+                    unseen.setdefault(i, set()).add(c)
+                else:
+                    verdicts[c][i] = cached
+
+        chunk_size = max(1, LLM_CHUNK_SIZE)
+        group_size = max(1, LLM_BATCH_PROFILES)
+        unseen_jobs = sorted(unseen)
+        calls: List[Tuple[List[int], List[int]]] = []
+        for offset in range(0, len(unseen_jobs), chunk_size):
+            chunk = unseen_jobs[offset : offset + chunk_size]
+            asking = sorted(set().union(*(unseen[i] for i in chunk)))
+            calls.extend((chunk, asking[start : start + group_size]) for start in range(0, len(asking), group_size))
+        logger.debug(
+            "Scoring %d candidates on %d jobs: %d cached verdicts, %d LLM calls",
+            len(requests), len(jobs), sum(len(v) for v in verdicts), len(calls),
+        )
+
+        semaphore = asyncio.Semaphore(max(1, LLM_MAX_CONCURRENCY))
+        # Only a single prompt holding all of a group's jobs may ask for a minimum (see _select_in_chunks)
+        single_chunk = len(unseen_jobs) <= chunk_size
+        partly_cached = {c for c in range(len(requests)) if verdicts[c]}
+
+        async def score(chunk: List[int], group: List[int]) -> None:
+            chunk_jobs = [jobs[i] for i in chunk]
+            whole = single_chunk and not partly_cached.intersection(group)
+            async with semaphore:
+                try:
+                    selections = await _llm_select_many(
+                        [profiles[c] for c in group], chunk_jobs, MIN_SELECTED_JOBS if whole else 0
+                    )
+                except Exception as e:
+                    logger.warning("LLM batch call failed (%s), using keyword fallback for it", e)
+                    selections = [None] * len(group)
+            for c, selected in zip(group, selections):
+                needed = [i for i in chunk if c in unseen[i]]
+                if selected is None:
+                    # Keyword-fallback guesses are not cached, so the LLM gets another chance next time
+                    kept = {id(job) for job in keyword_matching_fallback(requests[c], [jobs[i] for i in needed])}
+                    for i in needed:
+                        verdicts[c][i] = id(jobs[i]) in kept
+                    continue
+                chosen = {chunk[k] for k in selected}
+                for i in needed:
+                    verdicts[c][i] = i in chosen
+                    if RELEVANCE_CACHE_ENABLED:
+                        relevance_cache.set(_relevance_key(profile_hashes[c], jobs[i]), i in chosen, RELEVANCE_CACHE_TTL)
+
+        await asyncio.gather(*(score(chunk, group) for chunk, group in calls))
+
+        results = []
+        for c, request in enumerate(requests):
+            kept = [jobs[i] for i in candidates[c] if verdicts[c].get(i)]
+            if not kept:
+                logger.info("LLM judged no job relevant for candidate %d, using keyword fallback", c + 1)
+                kept = keyword_matching_fallback(request, [jobs[i] for i in candidates[c]])
+            results.append(kept)
+        return results
+
+    except Exception as e:
+        logger.warning("LLM batch filtering failed (%s), using keyword fallback", e)
+        return [keyword_matching_fallback(request, [jobs[i] for i in indices]) for request, indices in zip(requests, candidates)]
+
+
 def keyword_matching_fallback(
-    request: JobSearchRequest, jobs: List[JobListing]
-) -> List[JobListing]:
-    print("\n=== KEYWORD FALLBACK ACTIVATED ===")
+    request: JobSearchRequest, jobs: List[Listing]
+) -> List[Listing]:
     if not jobs:
         return []
-    
-    # Extract keywords
-    keywords = set()
-    keywords.update(request.position.lower().split())
-    keywords.update(kw.strip().lower() for kw in request.skills.split(','))
-    
-    # Score jobs
-    scored = []
-    for job in jobs:
-        job_text = f"{job.job_title} {job.company} {job.location}".lower()
-        score = sum(1 for kw in keywords if kw in job_text)
-        
-        # Bonus for location match
-        if request.location and request.location.lower() in job.location.lower():
-            score += 2
-            
-        scored.append((score, job))
-    
-    # Sort and return top 50% or min 3 jobs
-    scored.sort(reverse=True, key=lambda x: x[0])
-    keep = max(3, len(scored) // 2)
-    return [job for (score, job) in scored[:keep]]
\ No newline at end of file
+
+    with span("keyword_fallback", jobs=len(jobs)):
+        # Extract keywords
+        keywords = set()
+        keywords.update(request.position.lower().split())
+        keywords.update(kw.strip().lower() for kw in request.skills.split(','))
+
+        # Score jobs
+        scored = []
+        for job in jobs:
+            job_text = f"{job.job_title} {job.company} {job.location}".lower()
+            score = sum(1 for kw in keywords if kw in job_text)
+
+            # Bonus for location match
+            if request.location and request.location.lower() in job.location.lower():
+                score += 2
+
+            scored.append((score, job))
+
+        # Sort and return top 50% or min 3 jobs
+        scored.sort(reverse=True, key=lambda x: x[0])
+        keep = max(3, len(scored) // 2)
+        return [job for (score, job) in scored[:keep]]
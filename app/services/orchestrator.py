@@ -0,0 +1,428 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import (
+    DEFAULT_SOURCE_CACHE_TTL,
+    DEFAULT_SOURCE_TIMEOUT,
+    ENABLED_SOURCES,
+    SOURCE_CACHE_ENABLED,
+    SOURCE_CACHE_TTLS,
+    SEARCH_TARGET_RESULTS,
+    SOURCE_TIMEOUTS,
+)
+from app.models.listing import Listing
+from app.models.schemas import JobSearchRequest, SourceStatus
+from app.services.admission import admission
+from app.services.budget import SearchBudget, budget_satisfied
+from app.services.cache import make_key, source_cache
+from app.services.sources import PLACEHOLDER, REGISTRY, SourcePlugin, echo_request, get_source
+from app.services.telemetry import SOURCE_ITEMS, SOURCE_RESULTS, span
+
+logger = logging.getLogger(__name__)
+
+# SourceStatus.status of a page stream_sources yields before its source has finished
+RUNNING = "running"
+
+
+def _cache_key(plugin: SourcePlugin, request: JobSearchRequest, max_jobs: int) -> str:
+    # Built from exactly the request fields the source's results depend on, plus its item budget
+    return make_key(plugin.name, *(getattr(request, field) for field in plugin.cache_fields), str(max_jobs))
+
+
+async def fetch_upstream(
+    plugin: SourcePlugin, request: JobSearchRequest, max_jobs: int, budget: Optional[SearchBudget] = None
+) -> List[Listing]:
+    """
+    Fetch from the source itself, bypassing the cache, under the "sources" admission stage.
+    """
+    # Only real upstream fetches take a slot; cache hits and coalesced waiters do not
+    with await admission.stage("sources"):
+        return await plugin.fetch(request, max_jobs, budget)
+
+
+async def _fetch_source(
+    plugin: SourcePlugin, request: JobSearchRequest, budget: Optional[SearchBudget] = None
+) -> Tuple[List[Listing], bool]:
+    max_jobs = plugin.budget(request)
+    if not SOURCE_CACHE_ENABLED:
+        return await fetch_upstream(plugin, request, max_jobs, budget), False
+    # Request-echoing sources are fetched and cached profile-free, then echoed for this search
+    query = _profile_free(plugin, request, max_jobs) if plugin.echoes_request else request
+    key = _cache_key(plugin, query, max_jobs)
+    ttl = SOURCE_CACHE_TTLS.get(plugin.name, DEFAULT_SOURCE_CACHE_TTL)
+    jobs, cached, joined = await source_cache.get_or_fetch(
+        key,
+        ttl,
+        lambda: fetch_upstream(plugin, query, max_jobs, budget),
+        # A source cut short by this search's budget has fewer items than its key promises
+        cacheable=lambda jobs: len(jobs) >= max_jobs or not budget_satisfied(budget),
+        # ...so no other search may wait on it either
+        shared=budget is None,
+    )
+    # Listings this search did not fetch itself never passed through its budget
+    if (cached or joined) and budget is not None:
+        budget.add(len(jobs))
+    if plugin.echoes_request:
+        jobs = [echo_request(job, request) for job in jobs]
+    return jobs, cached
+
+
+def _profile_free(plugin: SourcePlugin, request: JobSearchRequest, max_jobs: int) -> JobSearchRequest:
+    """
+    A request running the same upstream query as `request` for `max_jobs`
+    items, with the fields request-echoing sources copy left at PLACEHOLDER,
+    so its listings can be shared by every search with the same query.
+    """
+    return JobSearchRequest(
+        position=request.position,
+        location=request.location,
+        experience=PLACEHOLDER,
+        skills="",
+        source_budgets={plugin.name: max_jobs},
+    )
+
+
+async def _run_source(
+    name: str,
+    request: JobSearchRequest,
+    timeout: Optional[float],
+    budget: Optional[SearchBudget] = None,
+) -> Tuple[List[Listing], SourceStatus]:
+    """
+    Run a single source under its own deadline and never raise.
+    """
+    started = time.perf_counter()
+    jobs: List[Listing] = []
+    cached = False
+    error = None
+    plugin = get_source(name)
+    timeout = _timeout_for(name, timeout)
+    try:
+        if plugin is None:
+            raise ValueError(f"Unknown source {name!r}")
+        with span("source_fetch", name):
+            jobs, cached = await asyncio.wait_for(_fetch_source(plugin, request, budget), timeout=timeout)
+        status = "ok"
+    except asyncio.TimeoutError:
+        status = "timed_out"
+        error = f"No response within {timeout:g}s"
+    except Exception as e:
+        status = "errored"
+        error = str(e)
+    return jobs, _finished(name, status, len(jobs), started, cached, error)
+
+
+def _finished(
+    name: str, status: str, item_count: int, started: float, cached: bool = False, error: Optional[str] = None
+) -> SourceStatus:
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    SOURCE_RESULTS.inc(name, status)
+    SOURCE_ITEMS.inc(name, amount=item_count)
+    logger.info(
+        "Source %s finished: %s, %d jobs in %.0f ms (cached=%s)", name, status, item_count, elapsed_ms, cached
+    )
+    return SourceStatus(
+        source=name,
+        status=status,
+        item_count=item_count,
+        elapsed_ms=round(elapsed_ms, 1),
+        cached=cached,
+        error=error,
+    )
+
+
+async def _stream_source(
+    name: str,
+    request: JobSearchRequest,
+    timeout: Optional[float],
+    budget: Optional[SearchBudget] = None,
+) -> AsyncIterator[Tuple[List[Listing], SourceStatus]]:
+    """
+    _run_source for stream_sources: a paging source yields each page with a
+    RUNNING status as soon as it is read, then a final status whose jobs are
+    only those not yielded yet. Other sources, cache hits and queries another
+    search is already fetching yield just the final result. Never raises.
+    """
+    plugin = get_source(name)
+    if plugin is None or not plugin.pages:
+        yield await _run_source(name, request, timeout, budget)
+        return
+    max_jobs = plugin.budget(request)
+    query = _profile_free(plugin, request, max_jobs) if plugin.echoes_request else request
+    key = _cache_key(plugin, query, max_jobs)
+    if SOURCE_CACHE_ENABLED and source_cache.fetching(key):
+        yield await _run_source(name, request, timeout, budget)
+        return
+
+    started = time.perf_counter()
+    timeout = _timeout_for(name, timeout)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    fetched: List[Listing] = []
+    rest: List[Listing] = []
+    cached = False
+    error = None
+    try:
+        hit = await source_cache.lookup(key) if SOURCE_CACHE_ENABLED else None
+        if hit is not None:
+            fetched, cached = hit, True
+            if budget is not None:
+                budget.add(len(hit))
+        else:
+            with await asyncio.wait_for(admission.stage("sources"), timeout=deadline - loop.time()):
+                pages = plugin.iter_pages(query, max_jobs, budget)
+                try:
+                    while True:
+                        with span("source_page", name):
+                            page = await asyncio.wait_for(_next_page(pages), timeout=deadline - loop.time())
+                        if page is None:
+                            break
+                        fetched.extend(page)
+                        if plugin.echoes_request:
+                            page = [echo_request(job, request) for job in page]
+                        yield page, SourceStatus(
+                            source=name,
+                            status=RUNNING,
+                            item_count=len(fetched),
+                            elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+                        )
+                finally:
+                    await pages.aclose()
+            if SOURCE_CACHE_ENABLED:
+                await source_cache.store(
+                    key,
+                    SOURCE_CACHE_TTLS.get(name, DEFAULT_SOURCE_CACHE_TTL),
+                    fetched,
+                    cacheable=lambda jobs: len(jobs) >= max_jobs or not budget_satisfied(budget),
+                )
+        status = "ok"
+    except asyncio.TimeoutError:
+        status = "timed_out"
+        error = f"No response within {timeout:g}s"
+    except Exception as e:
+        # Like the source's own fetch, a failure after some pages keeps the pages already read
+        status = "ok" if fetched else "errored"
+        error = str(e)
+
+    if cached:
+        rest = [echo_request(job, request) for job in fetched] if plugin.echoes_request else fetched
+    yield rest, _finished(name, status, len(fetched), started, cached, error)
+
+
+async def _next_page(pages: AsyncIterator[List[Listing]]) -> Optional[List[Listing]]:
+    try:
+        return await pages.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def _queue_source(
+    events: "asyncio.Queue[Tuple[List[Listing], SourceStatus]]",
+    name: str,
+    request: JobSearchRequest,
+    timeout: Optional[float],
+    budget: Optional[SearchBudget],
+) -> None:
+    async for event in _stream_source(name, request, timeout, budget):
+        events.put_nowait(event)
+
+
+def _skipped(name: str) -> Tuple[List[Listing], SourceStatus]:
+    return [], SourceStatus(
+        source=name,
+        status="skipped",
+        elapsed_ms=0.0,
+        error="Cheaper sources already filled the search's result budget",
+    )
+
+
+def enabled_sources(names: Optional[List[str]] = None) -> List[str]:
+    return [name for name in (ENABLED_SOURCES if names is None else names) if name in REGISTRY]
+
+
+def selected_sources(request: JobSearchRequest, default: Optional[List[str]] = None) -> List[str]:
+    """
+    Sources a search runs: the request's own choice (unknown names are kept so
+    they can be reported), otherwise `default` or ENABLED_SOURCES.
+    """
+    if request.sources:
+        return list(dict.fromkeys(request.sources))
+    return enabled_sources(default)
+
+
+def _cost_tiers(names: List[str]) -> List[List[str]]:
+    """
+    Group sources by cost class, cheapest first. Unknown names go in the first
+    tier so they are reported straight away.
+    """
+    tiers: Dict[int, List[str]] = {}
+    for name in names:
+        plugin = get_source(name)
+        tiers.setdefault(plugin.cost_rank if plugin else -1, []).append(name)
+    return [tiers[rank] for rank in sorted(tiers)]
+
+
+def _make_budget(request: JobSearchRequest) -> Optional[SearchBudget]:
+    target = request.max_results or SEARCH_TARGET_RESULTS
+    return SearchBudget(target) if target else None
+
+
+def _plan(
+    request: JobSearchRequest, sources: Optional[List[str]], budget: Optional[SearchBudget]
+) -> List[List[str]]:
+    names = selected_sources(request, sources)
+    if budget is None:
+        return [names] if names else []
+    return _cost_tiers(names)
+
+
+def _timeout_for(name: str, timeout: Optional[float]) -> float:
+    return timeout if timeout is not None else SOURCE_TIMEOUTS.get(name, DEFAULT_SOURCE_TIMEOUT)
+
+
+async def stream_sources(
+    request: JobSearchRequest,
+    sources: Optional[List[str]] = None,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[Tuple[List[Listing], SourceStatus]]:
+    """
+    Like fetch_all_sources, but yields each source's jobs and status as soon as it finishes.
+
+    Paging sources (SourcePlugin.pages) are not waited on as a whole: each page
+    they read is yielded at once with a RUNNING status counting the source's
+    listings so far, and their final status then comes with no further jobs.
+    Every source ends with exactly one status that is not RUNNING.
+
+    Sources still running when the consumer stops iterating (e.g. the client
+    disconnected) are cancelled.
+    """
+    budget = _make_budget(request)
+    for tier in _plan(request, sources, budget):
+        if budget_satisfied(budget):
+            for name in tier:
+                yield _skipped(name)
+            continue
+        events: "asyncio.Queue[Tuple[List[Listing], SourceStatus]]" = asyncio.Queue()
+        tasks = [
+            asyncio.ensure_future(_queue_source(events, name, request, timeout, budget)) for name in tier
+        ]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                jobs, status = await events.get()
+                if status.status != RUNNING:
+                    remaining -= 1
+                yield jobs, status
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def fetch_all_sources(
+    request: JobSearchRequest,
+    sources: Optional[List[str]] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[List[Listing], List[SourceStatus]]:
+    """
+    Launch the selected sources concurrently and merge whatever arrives in time.
+
+    Each source gets its own latency budget from SOURCE_TIMEOUTS, so a slow source
+    only costs its own deadline instead of adding to the others. Sources that miss
+    the deadline or fail contribute no jobs but are still reported.
+
+    With a result target (the request's max_results, else SEARCH_TARGET_RESULTS)
+    the search gets a shared SearchBudget: sources stop paginating and in-flight
+    page fetches are cancelled once it is full, and sources run in cost tiers
+    (free, metered, paid) so a dearer tier is skipped when the cheaper ones
+    already filled it. Without a target every selected source starts at once.
+
+    Args:
+        request: JobSearchRequest forwarded to every source.
+        sources: Default source names when the request does not pick its own.
+        timeout: Deadline applied to every source instead of SOURCE_TIMEOUTS.
+
+    Returns:
+        The combined job listings (in source order) and one status per source.
+    """
+    budget = _make_budget(request)
+    results: List[Tuple[List[Listing], SourceStatus]] = []
+    for tier in _plan(request, sources, budget):
+        if budget_satisfied(budget):
+            results.extend(_skipped(name) for name in tier)
+            continue
+        results.extend(
+            await asyncio.gather(*(_run_source(name, request, timeout, budget) for name in tier))
+        )
+
+    all_jobs = [job for source_jobs, _ in results for job in source_jobs]
+    statuses = [status for _, status in results]
+    return all_jobs, statuses
+
+
+
+def _shared_query(name: str, request: JobSearchRequest) -> Tuple[str, JobSearchRequest]:
+    """
+    Key of the upstream query a source runs for a search, and a profile-free
+    request (see _profile_free) that runs the same query for the search's item
+    budget. The key is the one the source cache stores the query's listings under.
+    """
+    plugin = get_source(name)
+    if plugin is None:
+        return make_key("unknown", name), request
+    max_jobs = plugin.budget(request)
+    shared = _profile_free(plugin, request, max_jobs)
+    return _cache_key(plugin, shared, max_jobs), shared
+
+
+async def fetch_sources_batch(
+    requests: List[JobSearchRequest],
+    sources: Optional[List[str]] = None,
+    timeout: Optional[float] = None,
+) -> List[Tuple[List[Listing], List[SourceStatus]]]:
+    """
+    fetch_all_sources for many searches, running each distinct upstream query once.
+
+    Searches that ask a source for the same position, location and item budget
+    share one fetch. Listings of request-echoing sources keep PLACEHOLDER in
+    the echoed fields; fill them per search with sources.echo_request. Each
+    search still runs its sources in cost tiers against its own result target,
+    but a shared fetch is not cut short by any one search's budget.
+
+    Returns:
+        Per search, in order, its listings and one status per source.
+    """
+    budgets = [_make_budget(request) for request in requests]
+    plans = [_plan(request, sources, budget) for request, budget in zip(requests, budgets)]
+    results: List[List[Tuple[List[Listing], SourceStatus]]] = [[] for _ in requests]
+
+    for tier in range(max((len(plan) for plan in plans), default=0)):
+        queries: Dict[str, Tuple[str, JobSearchRequest]] = {}
+        # Per search, the keys of its queries in this tier, in source order
+        wanted: Dict[int, List[str]] = {}
+        for i, plan in enumerate(plans):
+            if tier >= len(plan):
+                continue
+            if budget_satisfied(budgets[i]):
+                results[i].extend(_skipped(name) for name in plan[tier])
+                continue
+            for name in plan[tier]:
+                key, shared = _shared_query(name, requests[i])
+                queries.setdefault(key, (name, shared))
+                wanted.setdefault(i, []).append(key)
+
+        logger.info("Batch tier %d: %d source queries for %d searches", tier, len(queries), len(wanted))
+        keys = list(queries)
+        fetched = dict(zip(keys, await asyncio.gather(*(_run_source(*queries[key], timeout) for key in keys))))
+        for i, search_keys in wanted.items():
+            for key in search_keys:
+                jobs, status = fetched[key]
+                if budgets[i] is not None:
+                    budgets[i].add(len(jobs))
+                results[i].append((jobs, status))
+
+    return [
+        ([job for source_jobs, _ in result for job in source_jobs], [status for _, status in result])
+        for result in results
+    ]
@@ -0,0 +1,140 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from app.config import PARSE_WORKERS
+from app.services.extract import JobDetails, JobRecord, extract_details, extract_jobs
+from app.services.telemetry import span
+
+_WARMUP_PAGE = b'<div class="base-card"><h3 class="base-search-card__title">warmup</h3></div>'
+
+
+def _parse(source: str, page: bytes, encoding: Optional[str]) -> Tuple[List[JobRecord], float]:
+    # Runs in a worker process: decode + parse + extract, return only the compact records
+    started = time.perf_counter()
+    records = extract_jobs(source, page.decode(encoding or "utf-8", errors="replace"))
+    return records, time.perf_counter() - started
+
+
+def _parse_details(source: str, page: bytes, encoding: Optional[str]) -> Tuple[JobDetails, float]:
+    started = time.perf_counter()
+    details = extract_details(source, page.decode(encoding or "utf-8", errors="replace"))
+    return details, time.perf_counter() - started
+
+
+class ParsePool:
+    """
+    Bounded process pool that keeps HTML parsing off the event loop.
+
+    Scrapers hand over raw page bytes and get back the compact records from
+    app/services/extract.py, so a large page no longer stalls every other
+    request on the worker. With PARSE_WORKERS=0 (or before start()) pages
+    are parsed inline.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.parsed_pages = 0
+        self.parse_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_parse_seconds = 0.0
+
+    async def start(self) -> None:
+        """
+        Create the worker processes and warm them up, so the first searches do
+        not pay for process start-up and parser imports.
+        """
+        if self.workers <= 0 or self._executor is not None:
+            return
+        # spawn, not fork: forking a process that already runs an event loop and threads is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self._executor, _parse, "linkedin", _WARMUP_PAGE, "utf-8")
+                for _ in range(self.workers)
+            )
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _record(self, parse_seconds: float, total_seconds: float) -> None:
+        self.parsed_pages += 1
+        self.parse_seconds += parse_seconds
+        self.wait_seconds += max(total_seconds - parse_seconds, 0.0)
+        self.max_parse_seconds = max(self.max_parse_seconds, parse_seconds)
+
+    async def extract(self, source: str, page: bytes, encoding: Optional[str] = None) -> List[JobRecord]:
+        """
+        Args:
+            source: Extractor name ("linkedin" or "glassdoor").
+            page: Raw response body.
+            encoding: Response charset; utf-8 when unknown.
+
+        Returns:
+            The extracted job-card records.
+        """
+        return await self._run(_parse, source, source, page, encoding)
+
+    async def extract_details(self, source: str, page: bytes, encoding: Optional[str] = None) -> JobDetails:
+        """
+        extract() for a single posting's detail page (see extract.extract_details).
+        """
+        return await self._run(_parse_details, f"{source}_detail", source, page, encoding)
+
+    async def _run(
+        self, parse: Callable[..., Tuple[Any, float]], label: str, source: str, page: bytes, encoding: Optional[str]
+    ) -> Any:
+        started = time.perf_counter()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            with span("parse", label):
+                if self._executor is None:
+                    result, parse_seconds = parse(source, page, encoding)
+                else:
+                    loop = asyncio.get_running_loop()
+                    result, parse_seconds = await loop.run_in_executor(
+                        self._executor, parse, source, page, encoding
+                    )
+        finally:
+            self.queue_depth -= 1
+        self._record(parse_seconds, time.perf_counter() - started)
+        return result
+
+    def extract_blocking(self, source: str, page: bytes, encoding: Optional[str] = None) -> List[JobRecord]:
+        """
+        extract() for code already running on a worker thread (the threaded LinkedIn scraper).
+        """
+        started = time.perf_counter()
+        with span("parse", source):
+            if self._executor is None:
+                records, parse_seconds = _parse(source, page, encoding)
+            else:
+                records, parse_seconds = self._executor.submit(_parse, source, page, encoding).result()
+        self._record(parse_seconds, time.perf_counter() - started)
+        return records
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "parsed_pages": self.parsed_pages,
+            "parse_ms_avg": round(self.parse_seconds / self.parsed_pages * 1000, 2) if self.parsed_pages else 0.0,
+            "parse_ms_max": round(self.max_parse_seconds * 1000, 2),
+            "queue_wait_ms_avg": round(self.wait_seconds / self.parsed_pages * 1000, 2) if self.parsed_pages else 0.0,
+        }
+
+
+parse_pool = ParsePool(PARSE_WORKERS)
@@ -0,0 +1,147 @@
+import itertools
+import re
+from collections import defaultdict
+from functools import lru_cache
+from operator import attrgetter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.models.listing import Listing
+from app.models.schemas import JobSearchRequest
+
+# Keeps tokens like "c++", "c#" and "node.js" intact, but not sentence dots
+_TOKEN_RE = re.compile(r"[a-z0-9](?:[a-z0-9+#]|\.(?=[a-z0-9]))*")
+
+# Title terms say more about a job than company or location terms
+FIELD_WEIGHTS = {"job_title": 2.0, "company": 1.0, "location": 1.0}
+LOCATION_QUERY_WEIGHT = 0.5
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+# Listings come back from the source cache search after search, so their field values are too
+@lru_cache(maxsize=65536)
+def _value_tokens(value: str) -> Tuple[str, ...]:
+    return tuple(tokenize(value))
+
+
+class BM25Index:
+    """
+    BM25 index over job title/company/location held as a SciPy CSR matrix.
+
+    Scoring a query is a single sparse matrix-vector product, so ranking all
+    jobs costs one vectorized pass regardless of how many query terms there are.
+    Field values repeat a lot across listings (a few dozen titles, companies
+    and locations per search), so each distinct value is tokenized once and
+    every listing takes its value's row; build an index once per job set and
+    score every query of that set against it.
+    """
+
+    def __init__(self, jobs: List[Listing], k1: float = 1.5, b: float = 0.75):
+        # Unseen tokens get the next free column id on first lookup
+        vocabulary: Dict[str, int] = defaultdict(itertools.count().__next__)
+        n_docs = len(jobs)
+        docs = np.arange(n_docs)
+        rows: List[np.ndarray] = []
+        cols: List[np.ndarray] = []
+        data: List[np.ndarray] = []
+        for field, weight in FIELD_WEIGHTS.items():
+            values = [value or "" for value in map(attrgetter(field), jobs)]
+            # Listing -> index of its field value among the distinct values
+            distinct = {value: i for i, value in enumerate(dict.fromkeys(values))}
+            value_of = np.fromiter(map(distinct.__getitem__, values), dtype=np.int64, count=n_docs)
+            value_terms = [[vocabulary[token] for token in _value_tokens(value)] for value in distinct]
+            value_len = np.array([len(terms) for terms in value_terms], dtype=np.int64)
+            value_start = np.cumsum(value_len) - value_len
+            terms = np.fromiter(itertools.chain.from_iterable(value_terms), dtype=np.int64, count=value_len.sum())
+            # Each listing copies its value's run of term ids out of `terms`
+            doc_len = value_len[value_of]
+            doc_start = np.cumsum(doc_len) - doc_len
+            positions = np.arange(doc_len.sum()) + np.repeat(value_start[value_of] - doc_start, doc_len)
+            rows.append(np.repeat(docs, doc_len))
+            cols.append(terms[positions])
+            data.append(np.full(len(positions), weight))
+        self.vocabulary = dict(vocabulary)
+
+        # Duplicate (row, col) pairs are summed into weighted term frequencies
+        tf = sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n_docs, len(self.vocabulary)),
+        )
+        tf.sum_duplicates()
+
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() if n_docs else 0.0
+        df = np.bincount(tf.indices, minlength=len(self.vocabulary))
+        self.idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+
+        norm = k1 * (1 - b + b * doc_len / avg_len) if avg_len else np.full(n_docs, k1)
+        row_of = np.repeat(np.arange(n_docs), np.diff(tf.indptr))
+        weights = tf.data * (k1 + 1) / (tf.data + norm[row_of]) * self.idf[tf.indices]
+        self.matrix = sparse.csr_matrix((weights, tf.indices, tf.indptr), shape=tf.shape)
+
+    def query_vector(self, weighted_terms: Dict[str, float]) -> np.ndarray:
+        vector = np.zeros(len(self.vocabulary))
+        for term, weight in weighted_terms.items():
+            col = self.vocabulary.get(term)
+            if col is not None:
+                vector[col] += weight
+        return vector
+
+    def score(self, weighted_terms: Dict[str, float]) -> np.ndarray:
+        return self.matrix @ self.query_vector(weighted_terms)
+
+
+def build_query(request: JobSearchRequest) -> Dict[str, float]:
+    """
+    Turn the request's position, skills and location into weighted query terms.
+    """
+    terms: Dict[str, float] = {}
+    for token in tokenize(request.position) + tokenize(request.skills.replace(",", " ")):
+        terms[token] = terms.get(token, 0.0) + 1.0
+    for token in tokenize(request.location):
+        terms[token] = terms.get(token, 0.0) + LOCATION_QUERY_WEIGHT
+    return terms
+
+
+def score_jobs(request: JobSearchRequest, jobs: List[Listing]) -> np.ndarray:
+    if not jobs:
+        return np.zeros(0)
+    return BM25Index(jobs).score(build_query(request))
+
+
+def rank_jobs(
+    request: JobSearchRequest,
+    jobs: List[Listing],
+    top_k: Optional[int] = None,
+    index: Optional[BM25Index] = None,
+) -> List[Listing]:
+    """
+    Order jobs by BM25 score against the request, best first.
+
+    Args:
+        request: JobSearchRequest whose position, skills and location form the query.
+        jobs: Candidate job listings.
+        top_k: Keep only this many jobs (all when None).
+        index: BM25Index already built over `jobs`, to rank several requests against one set.
+
+    Returns:
+        The jobs sorted by descending score; ties keep their original order.
+    """
+    scores = index.score(build_query(request)) if index is not None and jobs else score_jobs(request, jobs)
+    order = np.argsort(-scores, kind="stable")
+    if top_k is not None:
+        order = order[:top_k]
+    return [jobs[i] for i in order]
+
+
+def local_relevance_filter(request: JobSearchRequest, jobs: List[Listing]) -> List[Listing]:
+    """
+    LLM-free relevance filter: the best-ranked half of the jobs (at least 3).
+    """
+    keep = max(3, len(jobs) // 2)
+    return rank_jobs(request, jobs, top_k=keep)
@@ -0,0 +1,260 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from app.config import (
+    CIRCUIT_COOLDOWN,
+    CIRCUIT_FAILURE_THRESHOLD,
+    HOST_REQUESTS_PER_SECOND,
+    RATE_LIMIT_MAX_MULTIPLIER,
+    RATE_LIMIT_MIN_MULTIPLIER,
+    SCRAPING_DELAY,
+)
+
+MAX_RETRY_AFTER = 300.0  # seconds; ignore absurd Retry-After values
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class AdaptiveTokenBucket:
+    """
+    Token bucket whose refill rate adapts to the upstream's answers (AIMD).
+
+    Every success nudges the rate up towards max_rate; a 429 halves it
+    (down to min_rate) and, with Retry-After, pauses the host entirely until
+    the given time. Callers reserve a token and then wait outside the lock,
+    so it works for both event-loop (acquire) and worker-thread
+    (acquire_blocking) callers sharing one budget.
+    """
+
+    def __init__(self, rate: float, min_rate: float, max_rate: float, jitter: float = 0.0):
+        self.base_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.jitter = jitter
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.waits = 0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            wait = max(wait, self.paused_until - now)
+            if self.jitter:
+                wait += random.uniform(0, self.jitter)
+            if wait > 0:
+                self.waits += 1
+            return wait
+
+    async def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_throttled(self, retry_after: Optional[float]) -> None:
+        with self._lock:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.capacity = max(1.0, self.rate)
+            self.tokens = min(self.tokens, 0.0)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.base_rate * 0.05)
+            self.capacity = max(1.0, self.rate)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "rate_per_second": round(self.rate, 3),
+            "base_rate_per_second": self.base_rate,
+            "tokens": round(min(self.capacity, self.tokens + (now - self._updated) * self.rate), 2),
+            "paused_for_seconds": round(max(self.paused_until - now, 0.0), 2),
+            "throttled_responses": self.throttled,
+            "delayed_requests": self.waits,
+        }
+
+
+class CircuitBreaker:
+    """
+    Fails fast for `cooldown` seconds after `failure_threshold` consecutive
+    failures, then lets a single trial request through (half-open) to decide
+    whether to close again.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def check(self, host: str) -> None:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "open" or (self.state == "half_open" and self._trial_in_flight):
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit open for {host} after {self.consecutive_failures} failures")
+            if self.state == "half_open":
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """
+        Let another request be the half-open trial, after one ended without an
+        outcome (cancelled, or failed on our side).
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        remaining = self.cooldown - (time.monotonic() - self.opened_at) if self.state == "open" else 0.0
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "cooldown_remaining_seconds": round(max(remaining, 0.0), 2),
+            "rejected_requests": self.rejected,
+        }
+
+
+class HostGuard:
+    """
+    Rate limiter + circuit breaker for one upstream host.
+    """
+
+    def __init__(self, host: str, rate: float):
+        self.host = host
+        self.limiter = AdaptiveTokenBucket(
+            rate,
+            min_rate=rate * RATE_LIMIT_MIN_MULTIPLIER,
+            max_rate=rate * RATE_LIMIT_MAX_MULTIPLIER,
+            # A little randomness keeps scraping traffic from looking machine-timed
+            jitter=min(0.5, 0.25 / rate),
+        )
+        self.breaker = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN)
+
+    async def acquire(self) -> None:
+        self.breaker.check(self.host)
+        try:
+            await self.limiter.acquire()
+        except BaseException:
+            self.abandon()
+            raise
+
+    def acquire_blocking(self) -> None:
+        self.breaker.check(self.host)
+        try:
+            self.limiter.acquire_blocking()
+        except BaseException:
+            self.abandon()
+            raise
+
+    def abandon(self) -> None:
+        """
+        Report a request that ended without an outcome, e.g. cancelled mid-flight;
+        must be called so a half-open trial does not block the host for good.
+        """
+        self.breaker.release_trial()
+
+    def record(self, status_code: Optional[int], retry_after: Optional[str] = None) -> None:
+        """
+        Args:
+            status_code: Response status, or None when the request failed without a response.
+            retry_after: The response's Retry-After header, if any.
+        """
+        if status_code == 429 or (status_code == 503 and retry_after):
+            self.limiter.on_throttled(parse_retry_after(retry_after))
+            self.breaker.record_failure()
+        elif status_code is None or status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.limiter.on_success()
+            self.breaker.record_success()
+
+    def stats(self) -> dict:
+        return {"limiter": self.limiter.stats(), "circuit": self.breaker.stats()}
+
+
+_guards: Dict[str, HostGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def host_key(host: Optional[str]) -> str:
+    """
+    Group hosts by registrable domain (www.linkedin.com and pk.linkedin.com share a budget).
+    """
+    host = (host or "").lower()
+    labels = host.split(".")
+    if len(labels) <= 2 or host.replace(".", "").isdigit():
+        return host
+    return ".".join(labels[-2:])
+
+
+def get_guard(host: Optional[str]) -> HostGuard:
+    key = host_key(host)
+    with _guards_lock:
+        guard = _guards.get(key)
+        if guard is None:
+            rate = HOST_REQUESTS_PER_SECOND.get(key, 1.0 / SCRAPING_DELAY if SCRAPING_DELAY > 0 else 10.0)
+            guard = _guards[key] = HostGuard(key, rate)
+        return guard
+
+
+def get_stats() -> Dict[str, dict]:
+    return {key: guard.stats() for key, guard in _guards.items()}
@@ -0,0 +1,146 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.config import (
+    DEDUP_ENABLED,
+    ENRICHMENT_ENABLED,
+    SEARCH_QUEUE_MAX_PENDING,
+    SEARCH_QUEUE_SOURCE_TIMEOUT,
+    SEARCH_QUEUE_SOURCES,
+    SEARCH_RESULT_TTL,
+    SEARCH_WORKERS,
+)
+from app.models.schemas import JobSearchRequest, SearchProgress
+from app.services.dedup import deduplicate_jobs
+from app.services.enrichment import enricher
+from app.services.llm_service import filter_relevant_jobs
+from app.services.orchestrator import RUNNING, selected_sources, stream_sources
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SearchQueue:
+    """
+    In-memory queue of searches processed by a fixed pool of asyncio workers.
+
+    Submitting returns immediately with a search id; workers run the source
+    fetches (with the long SEARCH_QUEUE_SOURCE_TIMEOUT, so slow sources like
+    Apify can finish) and the LLM filter, updating the progress record that
+    GET /searches/{id} returns. The number of workers bounds scraping work
+    independently of how many HTTP requests are in flight.
+    """
+
+    def __init__(self, workers: int, max_pending: int, result_ttl: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._queue: Optional["asyncio.Queue[Tuple[str, JobSearchRequest]]"] = None
+        self._tasks: List[asyncio.Task] = []
+        self._records: Dict[str, SearchProgress] = {}
+        self._finished_at: Dict[str, float] = {}
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, request: JobSearchRequest) -> SearchProgress:
+        if self._queue is None:
+            raise RuntimeError("Search queue is not running")
+        self._evict_expired()
+        search_id = uuid.uuid4().hex
+        now = _now()
+        record = SearchProgress(
+            search_id=search_id,
+            status="queued",
+            created_at=now,
+            updated_at=now,
+            pending_sources=selected_sources(request, SEARCH_QUEUE_SOURCES),
+        )
+        try:
+            self._queue.put_nowait((search_id, request))
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Search queue is full ({self.max_pending} pending searches)")
+        self._records[search_id] = record
+        return record
+
+    def get(self, search_id: str) -> Optional[SearchProgress]:
+        self._evict_expired()
+        return self._records.get(search_id)
+
+    def stats(self) -> dict:
+        statuses: Dict[str, int] = {}
+        for record in self._records.values():
+            statuses[record.status] = statuses.get(record.status, 0) + 1
+        return {
+            "workers": len(self._tasks),
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "searches": statuses,
+        }
+
+    def _evict_expired(self) -> None:
+        cutoff = time.monotonic() - self.result_ttl
+        for search_id, finished_at in list(self._finished_at.items()):
+            if finished_at < cutoff:
+                del self._finished_at[search_id]
+                self._records.pop(search_id, None)
+
+    async def _worker(self) -> None:
+        while True:
+            search_id, request = await self._queue.get()
+            try:
+                await self._run(self._records[search_id], request)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, record: SearchProgress, request: JobSearchRequest) -> None:
+        record.status = "running"
+        record.updated_at = _now()
+        try:
+            all_jobs = []
+            async for jobs, status in stream_sources(
+                request, sources=SEARCH_QUEUE_SOURCES, timeout=SEARCH_QUEUE_SOURCE_TIMEOUT
+            ):
+                all_jobs.extend(jobs)
+                # A source read page by page reports a running status (with its listings so far)
+                # until it finishes; the finished status takes its place
+                record.sources = [
+                    known for known in record.sources
+                    if not (known.source == status.source and known.status == RUNNING)
+                ]
+                record.sources.append(status)
+                if status.status != RUNNING:
+                    record.pending_sources.remove(status.source)
+                record.updated_at = _now()
+
+            if DEDUP_ENABLED:
+                all_jobs = deduplicate_jobs(all_jobs)
+            if ENRICHMENT_ENABLED:
+                all_jobs = await enricher.enrich(all_jobs)
+            relevant_jobs = await filter_relevant_jobs(request, all_jobs)
+            record.relevant_jobs = [job.to_public() for job in relevant_jobs]
+            record.status = "completed"
+        except Exception as e:
+            record.status = "failed"
+            record.error = f"Error searching jobs: {str(e)}"
+        record.updated_at = _now()
+        self._finished_at[record.search_id] = time.monotonic()
+
+
+search_queue = SearchQueue(SEARCH_WORKERS, SEARCH_QUEUE_MAX_PENDING, SEARCH_RESULT_TTL)
@@ -0,0 +1,214 @@
+"""
+Registry of job sources and their declarative metadata.
+
+Each source registers once with what it can do and what it costs; the
+orchestrator decides from this metadata which sources to run, how many items
+to ask each one for, and which expensive sources can be skipped. Source
+modules are imported by path on first use, so a source that never runs is
+never imported.
+"""
+import importlib
+from typing import AsyncIterator, Awaitable, Callable, Dict, FrozenSet, List, Optional
+
+from app.config import INDEED_DATASET_PAGE_SIZE
+from app.models.listing import Listing
+from app.models.schemas import JobSearchRequest
+from app.services.budget import SearchBudget
+
+SourceFetcher = Callable[..., Awaitable[List[Listing]]]
+SourcePager = Callable[..., AsyncIterator[List[Listing]]]
+
+# Cost classes, cheapest first; sources of a dearer class only run when the cheaper ones fall short
+COST_CLASSES = ("free", "metered", "paid")
+LATENCY_CLASSES = ("fast", "medium", "slow")
+
+
+class SourcePlugin:
+    """
+    One job source.
+
+    The fetch function is looked up as `module:function` and must accept
+    `(request, max_jobs=..., max_pages=..., budget=...)`, where budget is the
+    search's shared SearchBudget (or None).
+
+    Args:
+        name: Name used in ENABLED_SOURCES, request `sources` and statuses.
+        module: Dotted path of the module implementing the source.
+        function: Name of the async fetch function in that module.
+        capabilities: Listing fields the source fills from the posting itself
+            (the rest are echoed from the request or left unspecified).
+        cost: One of COST_CLASSES.
+        latency: One of LATENCY_CLASSES.
+        page_size: Listings per upstream result page.
+        default_items: Items requested when the search sets neither a budget
+            for the source nor max_results.
+        max_items: Hard cap on a per-search budget.
+        cache_fields: JobSearchRequest fields the source's results depend on.
+        echoes_request: Whether listings copy experience/jobNature/salary from
+            the request instead of reading them from the posting.
+        label: Listing.source of the source's listings.
+        pages: Name of an async generator in the module, taking the fetch
+            function's arguments, that yields the listings a page at a time.
+            Streamed searches then forward each page as soon as it is read.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        module: str,
+        function: str,
+        capabilities: FrozenSet[str],
+        cost: str,
+        latency: str,
+        page_size: int,
+        default_items: int,
+        max_items: int,
+        cache_fields: List[str],
+        echoes_request: bool = False,
+        label: str = "",
+        pages: str = "",
+    ):
+        if cost not in COST_CLASSES or latency not in LATENCY_CLASSES:
+            raise ValueError(f"Unknown cost/latency class for source {name!r}")
+        self.name = name
+        self.module = module
+        self.function = function
+        self.capabilities = capabilities
+        self.cost = cost
+        self.latency = latency
+        self.page_size = page_size
+        self.default_items = default_items
+        self.max_items = max_items
+        self.cache_fields = cache_fields
+        self.echoes_request = echoes_request
+        self.label = label or name
+        self.pages = pages
+        self._fetch: Optional[SourceFetcher] = None
+
+    @property
+    def cost_rank(self) -> int:
+        return COST_CLASSES.index(self.cost)
+
+    def fetcher(self) -> SourceFetcher:
+        if self._fetch is None:
+            self._fetch = getattr(importlib.import_module(self.module), self.function)
+        return self._fetch
+
+    def budget(self, request: JobSearchRequest) -> int:
+        # An explicit per-source budget wins, then the overall max_results, then the source default
+        requested = (request.source_budgets or {}).get(self.name) or request.max_results
+        return max(1, min(requested or self.default_items, self.max_items))
+
+    def max_pages(self, max_jobs: int) -> int:
+        return -(-max_jobs // self.page_size)
+
+    async def fetch(
+        self, request: JobSearchRequest, max_jobs: int, budget: Optional[SearchBudget] = None
+    ) -> List[Listing]:
+        return await self.fetcher()(
+            request, max_jobs=max_jobs, max_pages=self.max_pages(max_jobs), budget=budget
+        )
+
+    def iter_pages(
+        self, request: JobSearchRequest, max_jobs: int, budget: Optional[SearchBudget] = None
+    ) -> AsyncIterator[List[Listing]]:
+        pager: SourcePager = getattr(importlib.import_module(self.module), self.pages)
+        return pager(request, max_jobs=max_jobs, max_pages=self.max_pages(max_jobs), budget=budget)
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "capabilities": sorted(self.capabilities),
+            "cost": self.cost,
+            "latency": self.latency,
+            "page_size": self.page_size,
+            "default_items": self.default_items,
+            "max_items": self.max_items,
+        }
+
+
+REGISTRY: Dict[str, SourcePlugin] = {}
+
+
+def register(plugin: SourcePlugin) -> SourcePlugin:
+    REGISTRY[plugin.name] = plugin
+    return plugin
+
+
+def get_source(name: str) -> Optional[SourcePlugin]:
+    return REGISTRY.get(name)
+
+
+def source_of(job: Listing) -> Optional[SourcePlugin]:
+    """
+    Source a listing came from, by its Listing.source label.
+    """
+    for plugin in REGISTRY.values():
+        if plugin.label == job.source:
+            return plugin
+    return None
+
+
+# What request-echoing sources store for fields they do not know, e.g. when fetched for a crawl or a batch
+PLACEHOLDER = "Not specified"
+
+
+def echo_request(job: Listing, request: JobSearchRequest) -> Listing:
+    """
+    Fill the fields LinkedIn/Indeed copy from the searcher's request, as a live scrape would.
+    Fields already known (e.g. read from the detail page by enrichment) are kept.
+    """
+    return job.replace(
+        experience=_echoed(job.experience, request.experience),
+        jobNature=_echoed(job.jobNature, request.jobNature),
+        salary=_echoed(job.salary, request.salary),
+    )
+
+
+def _echoed(current: Optional[str], requested: Optional[str]) -> Optional[str]:
+    return requested if current in (None, PLACEHOLDER) and requested else current
+
+
+register(SourcePlugin(
+    name="linkedin",
+    module="app.services.linkedin",
+    function="fetch_linkedin_jobs",
+    capabilities=frozenset({"title", "company", "location"}),
+    cost="free",
+    latency="medium",
+    page_size=25,
+    default_items=10,
+    max_items=100,
+    # Experience, job nature and salary are only echoed into listings, so they are not in the key
+    cache_fields=["position", "location"],
+    echoes_request=True,
+    label="LinkedIn",
+))
+register(SourcePlugin(
+    name="glassdoor",
+    module="app.services.glassdoor",
+    function="fetch_glassdoor_jobs",
+    capabilities=frozenset({"title", "company", "location"}),
+    cost="metered",  # every page is a ScraperAPI credit
+    latency="medium",
+    page_size=30,
+    default_items=10,
+    max_items=60,
+    cache_fields=["position", "location"],
+    label="Glassdoor",
+))
+register(SourcePlugin(
+    name="indeed",
+    module="app.services.indeed",
+    function="fetch_jobs",
+    capabilities=frozenset({"title", "company", "location", "salary", "jobNature"}),
+    cost="paid",  # Apify actor run billed per item
+    latency="slow",
+    page_size=INDEED_DATASET_PAGE_SIZE,
+    default_items=5,
+    max_items=50,
+    cache_fields=["position", "location"],
+    echoes_request=True,
+    label="Indeed (via Apify)",
+    pages="iter_job_pages",
+))
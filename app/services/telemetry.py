@@ -0,0 +1,234 @@
+"""
+Tracing spans, Prometheus metrics and logging setup for the search pipeline.
+
+Every pipeline stage (source fetch, HTTP request, rate-limit wait, parse,
+dedup, ranking, LLM call, fallback) runs inside span(). A span records its
+duration in the jobfinder_stage_duration_seconds histogram, counts failures,
+and logs at DEBUG with the trace id of the search it belongs to. Metrics are
+rendered in the Prometheus text format by GET /metrics.
+"""
+import contextvars
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans range from sub-millisecond parses to minute-long Apify runs
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, values)} {total:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = STAGE_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets) + (math.inf,)
+        # Per label set: non-cumulative bucket counts, sum, count
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = ([0] * len(self.buckets), [0.0, 0.0])
+            counts, totals = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            totals[0] += value
+            totals[1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for values, (counts, totals) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else f"{bound:g}"
+                    labels = _labels(self.label_names, values, 'le="' + le + '"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, values)} {totals[0]:.6f}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, values)} {int(totals[1])}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "jobfinder_stage_duration_seconds", "Duration of search pipeline stages.", ("stage", "source")
+)
+STAGE_ERRORS = Counter(
+    "jobfinder_stage_errors_total", "Pipeline stages that ended with an exception.", ("stage", "source")
+)
+SOURCE_RESULTS = Counter(
+    "jobfinder_source_results_total", "Source fetches by outcome.", ("source", "status")
+)
+SOURCE_ITEMS = Counter(
+    "jobfinder_source_items_total", "Listings returned by each source.", ("source",)
+)
+HEDGED_REQUESTS = Counter(
+    "jobfinder_hedged_requests_total", "Duplicate upstream requests sent to cut tail latency, by outcome.", ("host", "outcome")
+)
+ADMISSION_WAIT = Histogram(
+    "jobfinder_admission_wait_seconds", "Time searches and pipeline stages waited for a slot.", ("gate", "priority")
+)
+ADMISSION_REJECTIONS = Counter(
+    "jobfinder_admission_rejections_total", "Searches turned away by admission control.", ("priority", "reason")
+)
+METRICS = [
+    STAGE_SECONDS, STAGE_ERRORS, SOURCE_RESULTS, SOURCE_ITEMS, HEDGED_REQUESTS, ADMISSION_WAIT, ADMISSION_REJECTIONS
+]
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+_trace_id: contextvars.ContextVar = contextvars.ContextVar("trace_id", default=None)
+_span_name: contextvars.ContextVar = contextvars.ContextVar("span_name", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+
+@contextmanager
+def span(stage: str, source: str = "", **fields) -> Iterator[None]:
+    """
+    Time a pipeline stage.
+
+    The first span in a context starts a new trace; spans opened inside it
+    (including in tasks it creates) share its trace id and name it as parent.
+    Only use it around code that stays in one task (not across async-generator yields).
+
+    Args:
+        stage: Stage name, the `stage` label of the metrics.
+        source: Source or upstream host the stage works for, if any.
+        **fields: Extra structured fields for the DEBUG log line.
+    """
+    trace_token = None
+    if _trace_id.get() is None:
+        trace_token = _trace_id.set(uuid.uuid4().hex[:16])
+    parent = _span_name.get()
+    span_token = _span_name.set(stage)
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        STAGE_ERRORS.inc(stage, source)
+        raise
+    except BaseException:
+        outcome = "cancelled"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage, source)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "span %s%s finished in %.1f ms (%s)",
+                stage,
+                f"[{source}]" if source else "",
+                elapsed * 1000,
+                outcome,
+                extra={
+                    "stage": stage,
+                    "source": source,
+                    "parent": parent,
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "outcome": outcome,
+                    **fields,
+                },
+            )
+        _span_name.reset(span_token)
+        if trace_token is not None:
+            _trace_id.reset(trace_token)
+
+
+class _TraceFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = _trace_id.get() or "-"
+        return True
+
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "trace_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "trace_id": getattr(record, "trace_id", "-"),
+            "message": record.getMessage(),
+        }
+        payload.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS})
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def configure_logging(level: str, fmt: str) -> None:
+    """
+    Send the app's loggers to stderr at `level`, as text or one JSON object per line.
+    """
+    handler = logging.StreamHandler()
+    handler.addFilter(_TraceFilter())
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(trace_id)s] %(message)s"))
+    app_logger = logging.getLogger("app")
+    app_logger.handlers = [handler]
+    app_logger.setLevel(level.upper())
+    app_logger.propagate = False
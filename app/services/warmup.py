@@ -0,0 +1,74 @@
+"""
+Background loading of the dependencies app.main does not import.
+
+Source modules (and through them apify_client, requests sessions, ...) are
+imported by the source registry on first use, and the Gemini SDK by
+llm_service on the first LLM call, so a worker can serve requests as soon as
+app.main is imported. With STARTUP_WARMUP the lifespan loads the enabled
+ones in a thread right after startup, so the first searches do not pay for
+the imports either. Sources that are not enabled anywhere are never imported.
+"""
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from app.config import STARTUP_WARMUP
+from app.services import llm_service
+from app.services.sources import get_source
+
+logger = logging.getLogger(__name__)
+
+
+class WarmUp:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.loaded: List[str] = []
+        self.done = False
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Future] = None
+
+    def start(self, sources: List[str]) -> None:
+        """
+        Load `sources` (names; duplicates and unknown names are skipped) and the LLM client in the background.
+        """
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.ensure_future(asyncio.to_thread(self._load, list(dict.fromkeys(sources))))
+
+    async def stop(self) -> None:
+        # An import cannot be interrupted; only stop waiting for it
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _load(self, sources: List[str]) -> None:
+        started = time.perf_counter()
+        try:
+            for name in sources:
+                plugin = get_source(name)
+                if plugin is not None:
+                    plugin.fetcher()
+                    self.loaded.append(name)
+            llm_service.warm_up()
+            self.loaded.append("llm")
+        except Exception as e:
+            self.error = str(e)
+            logger.warning("Warm-up failed, the rest loads on first use: %s", e)
+        self.seconds = time.perf_counter() - started
+        self.done = True
+        logger.info("Warm-up loaded %s in %.0f ms", ", ".join(self.loaded) or "nothing", self.seconds * 1000)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "done": self.done,
+            "loaded": list(self.loaded),
+            "seconds": round(self.seconds, 3) if self.seconds is not None else None,
+            "error": self.error,
+        }
+
+
+warmup = WarmUp(STARTUP_WARMUP)
@@ -0,0 +1,304 @@
+"""
+End-to-end load test of POST /search-jobs against local stand-in upstreams.
+
+Starts benchmarks.stub_upstreams and the API (with the deterministic fake
+Gemini model from benchmarks.fake_gemini) in child processes, drives the API
+with concurrent searches and reports throughput and p50/p95/p99 latency.
+Runs fully offline:
+
+    python -m benchmarks.bench_load [--requests 200] [--concurrency 16] [--queries 8]
+        [--latency-ms 150] [--error-rate 0.02] [--llm-latency-ms 400] [--cache]
+        [--tail-rate 0.02 --tail-ms 10000] [--hedging] [--enrich]
+        [--profiles 8 --batch-size 8] [--env ADMISSION_MAX_SEARCHES=4]
+
+Upstream latency and errors take the same forms as in stub_upstreams
+(e.g. --latency-ms glassdoor=900). Result caches are off unless --cache is
+given, so every search reaches the stand-ins. --tail-rate makes some upstream
+responses very slow; compare runs with and without --hedging to see what
+hedged requests do for p95/p99. --enrich turns on detail-page enrichment,
+which fetches every listing's posting page from the stand-ins. --profiles N
+gives every query N candidate profiles (different experience and skills);
+--batch-size N sends them N at a time to /search-jobs/batch instead of one
+by one, to compare upstream requests and LLM calls per search. --env sets
+an environment variable for the API (repeatable), e.g. tighter admission
+limits to see searches shed with 429/503 under overload. Pass --target URL
+to load an API that is already running instead.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+POSITIONS = [
+    "Frontend Developer", "Machine Learning Engineer", "Java Developer", "Data Scientist",
+    "DevOps Engineer", "Full Stack Developer", "Backend Engineer", "QA Automation Engineer",
+]
+LOCATIONS = ["Lahore, Pakistan", "Karachi, Pakistan", "Islamabad, Pakistan"]
+SKILLS = [
+    "Python, JavaScript, SQL, Docker", "React, TypeScript, CSS", "PyTorch, TensorFlow, MLOps",
+    "Java, Spring Boot, Kafka", "Kubernetes, Terraform, AWS",
+]
+LLM_CALLS_METRIC = 'jobfinder_stage_duration_seconds_count{stage="llm_call"'
+
+
+def make_requests(count: int, profiles: int = 1) -> List[dict]:
+    # Query-major, so consecutive bodies are the profiles of one query
+    return [
+        {
+            "position": POSITIONS[i % len(POSITIONS)],
+            "experience": f"{1 + (i + p) % 5} years",
+            "salary": "",
+            "jobNature": "onsite" if (i + p) % 2 else "remote",
+            "location": LOCATIONS[i % len(LOCATIONS)],
+            "skills": SKILLS[p % len(SKILLS)],
+        }
+        for i in range(count)
+        for p in range(profiles)
+    ]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def app_env(args: argparse.Namespace) -> Dict[str, str]:
+    stub = f"http://127.0.0.1:{args.stub_port}"
+    env = dict(os.environ)
+    env.update({
+        "LINKEDIN_GUEST_API_URL": f"{stub}/linkedin",
+        "LINKEDIN_JOB_POSTING_URL": f"{stub}/linkedin-posting",
+        "SCRAPERAPI_URL": f"{stub}/scraperapi",
+        "APIFY_API_URL": f"{stub}/apify",
+        "SCRAPERAPI_API_KEY": "bench",
+        "APIFY_API_TOKEN": "bench",
+        "GEMINI_API_KEY": "bench",
+        # The stand-ins are not rate limited; keep the limiter from becoming the bottleneck
+        "HOST_RATE_LIMITS": "127.0.0.1=100000",
+        "ENABLED_SOURCES": args.sources,
+        "SOURCE_CACHE_ENABLED": "true" if args.cache else "false",
+        "RELEVANCE_CACHE_ENABLED": "true" if args.cache else "false",
+        "CRAWLER_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+        "HEDGING_ENABLED": "true" if args.hedging else "false",
+        "HEDGE_HOSTS": "127.0.0.1",
+        "ENRICHMENT_ENABLED": "true" if args.enrich else "false",
+    })
+    for override in args.env:
+        name, _, value = override.partition("=")
+        env[name] = value
+    return env
+
+
+def serve(args: argparse.Namespace) -> None:
+    """
+    Run the API with the fake Gemini model (the child process of a load test).
+    """
+    import uvicorn
+
+    from benchmarks.fake_gemini import FakeGeminiModel, install
+
+    install(FakeGeminiModel(
+        latency=args.llm_latency_ms / 1000,
+        latency_per_job=args.llm_latency_per_job_ms / 1000,
+        error_rate=args.llm_error_rate,
+    ))
+    uvicorn.run("app.main:app", host="127.0.0.1", port=args.app_port, log_level="warning")
+
+
+async def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+                await asyncio.sleep(0.2)
+
+
+async def llm_calls(target: str) -> Optional[int]:
+    try:
+        async with httpx.AsyncClient() as client:
+            text = (await client.get(f"{target}/metrics")).text
+    except httpx.HTTPError:
+        return None
+    return sum(int(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(LLM_CALLS_METRIC))
+
+
+async def run_load(
+    target: str, bodies: List[dict], total: int, concurrency: int, warmup: int, batch_size: int = 1
+) -> dict:
+    latencies: List[float] = []
+    rejected: List[float] = []
+    statuses: Dict[str, int] = {}
+    issued = 0
+    shed = 0
+
+    async with httpx.AsyncClient(base_url=target, timeout=120.0) as client:
+        for body in bodies[:warmup]:
+            await client.post("/search-jobs", json=body)
+        calls_before = await llm_calls(target)
+
+        async def worker() -> None:
+            nonlocal issued, shed
+            while issued < total:
+                size = min(batch_size, total - issued)
+                batch = [bodies[(issued + k) % len(bodies)] for k in range(size)]
+                issued += size
+                started = time.perf_counter()
+                try:
+                    if batch_size > 1:
+                        response = await client.post("/search-jobs/batch", json={"searches": batch})
+                    else:
+                        response = await client.post("/search-jobs", json=batch[0])
+                    outcome = str(response.status_code)
+                except httpx.HTTPError as e:
+                    outcome = type(e).__name__
+                # Searches shed by admission control are counted apart, they should come back fast
+                if outcome in ("429", "503"):
+                    rejected.append(time.perf_counter() - started)
+                    shed += size
+                else:
+                    latencies.append(time.perf_counter() - started)
+                statuses[outcome] = statuses.get(outcome, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+        calls_after = await llm_calls(target)
+
+    latencies.sort()
+    rejected.sort()
+    return {
+        "requests": len(latencies) + len(rejected),
+        "searches": issued,
+        "llm_calls": calls_after - calls_before if calls_before is not None and calls_after is not None else None,
+        "wall": wall,
+        "statuses": statuses,
+        "throughput": (issued - shed) / wall if wall else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": latencies[-1] if latencies else 0.0,
+        "rejected": len(rejected),
+        "rejected_p50": percentile(rejected, 50),
+        "rejected_p99": percentile(rejected, 99),
+    }
+
+
+async def upstream_counts(stub_port: int) -> Optional[dict]:
+    try:
+        async with httpx.AsyncClient() as client:
+            return (await client.get(f"http://127.0.0.1:{stub_port}/__stats")).json()
+    except httpx.HTTPError:
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=8, help="Distinct position/location queries cycled through")
+    parser.add_argument("--profiles", type=int, default=1, help="Candidate profiles per query")
+    parser.add_argument("--batch-size", type=int, default=1, help="Searches per /search-jobs/batch request (1: /search-jobs)")
+    parser.add_argument("--warmup", type=int, default=4)
+    parser.add_argument("--sources", default="linkedin,glassdoor")
+    parser.add_argument("--cache", action="store_true", help="Keep the source and relevance caches on")
+    parser.add_argument("--target", help="Load an API that is already running at this URL")
+    parser.add_argument("--app-port", type=int, default=8791)
+    parser.add_argument("--stub-port", type=int, default=8790)
+    parser.add_argument("--latency-ms", action="append", default=[])
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", action="append", default=[])
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="Share of upstream responses made slow")
+    parser.add_argument("--tail-ms", type=float, default=10000.0)
+    parser.add_argument("--hedging", action="store_true", help="Run the API with HEDGING_ENABLED")
+    parser.add_argument("--enrich", action="store_true", help="Run the API with ENRICHMENT_ENABLED")
+    parser.add_argument("--llm-latency-ms", type=float, default=400.0)
+    parser.add_argument("--llm-latency-per-job-ms", type=float, default=5.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--env", action="append", default=[], help="NAME=value for the API (repeatable)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    children: List[subprocess.Popen] = []
+    target = args.target
+    try:
+        if target is None:
+            stub_cmd = [
+                sys.executable, "-m", "benchmarks.stub_upstreams", "--port", str(args.stub_port),
+                "--jitter-ms", str(args.jitter_ms), "--error-status", str(args.error_status),
+                "--pages", str(args.pages), "--tail-rate", str(args.tail_rate), "--tail-ms", str(args.tail_ms),
+            ]
+            stub_cmd += [f"--latency-ms={value}" for value in args.latency_ms]
+            stub_cmd += [f"--error-rate={value}" for value in args.error_rate]
+            children.append(subprocess.Popen(stub_cmd))
+            app_cmd = [sys.executable, "-m", "benchmarks.bench_load", *sys.argv[1:], "--serve"]
+            children.append(subprocess.Popen(app_cmd, env=app_env(args)))
+            target = f"http://127.0.0.1:{args.app_port}"
+            asyncio.run(wait_until_up(f"http://127.0.0.1:{args.stub_port}/__stats"))
+        asyncio.run(wait_until_up(f"{target}/stats"))
+
+        bodies = make_requests(max(1, args.queries), max(1, args.profiles))
+        result = asyncio.run(
+            run_load(target, bodies, args.requests, args.concurrency, args.warmup, max(1, args.batch_size))
+        )
+        upstream = asyncio.run(upstream_counts(args.stub_port)) if args.target is None else None
+    finally:
+        # SIGINT lets uvicorn run the app's shutdown (parse pool, clients) before exiting
+        for child in children:
+            child.send_signal(signal.SIGINT)
+        for child in children:
+            try:
+                child.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                child.kill()
+
+    searches = result["searches"]
+    print(f"{searches} searches, concurrency {args.concurrency}, {args.queries} distinct queries"
+          f" x {args.profiles} profiles{', caches on' if args.cache else ''}"
+          f"{f', batches of {args.batch_size}' if args.batch_size > 1 else ''}")
+    print(f"  statuses:   {', '.join(f'{k}: {v}' for k, v in sorted(result['statuses'].items()))}")
+    print(f"  throughput: {result['throughput']:.2f} searches/s over {result['wall']:.1f}s")
+    print(
+        f"  latency:    p50 {result['p50'] * 1000:.0f} ms  p95 {result['p95'] * 1000:.0f} ms"
+        f"  p99 {result['p99'] * 1000:.0f} ms  max {result['max'] * 1000:.0f} ms"
+        f"{' (per batch request)' if args.batch_size > 1 else ''}"
+    )
+    if result["rejected"]:
+        print(
+            f"  rejected:   {result['rejected']} with 429/503, p50 {result['rejected_p50'] * 1000:.0f} ms"
+            f"  p99 {result['rejected_p99'] * 1000:.0f} ms"
+        )
+    if result["llm_calls"] is not None:
+        print(f"  llm calls:  {result['llm_calls']} ({result['llm_calls'] / searches:.2f} per search)")
+    if upstream:
+        # The stand-ins also counted the warmup searches
+        total_requests = sum(counts["requests"] for counts in upstream.values())
+        served = searches + min(args.warmup, len(bodies))
+        print("  upstream:   " + ", ".join(
+            f"{name} {counts['requests']} requests ({counts['errors']} injected errors)"
+            for name, counts in upstream.items()
+        ) + f"; {total_requests / served:.2f} per search")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Parser microbenchmark on saved LinkedIn/Glassdoor result pages.
+
+Compares the original full-tree BeautifulSoup parsing with the lxml
+extractors in app/services/extract.py:
+
+    python -m benchmarks.bench_parsing [--repeat 20]
+"""
+import argparse
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from app.services.extract import EXTRACTORS
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PAGES = {
+    "linkedin": FIXTURES / "linkedin_search.html",
+    "glassdoor": FIXTURES / "glassdoor_search.html",
+}
+
+
+def linkedin_baseline(page: str) -> list:
+    # The pre-extraction-layer scraper: full html.parser tree, then find() walks per card
+    soup = BeautifulSoup(page, "html.parser")
+    records = []
+    for card in soup.find_all("div", class_="base-card"):
+        records.append(
+            {
+                "title": card.find("h3", class_="base-search-card__title").text.strip(),
+                "company": card.find("h4", class_="base-search-card__subtitle").text.strip(),
+                "location": card.find("span", class_="job-search-card__location").text.strip(),
+                "link": card.find("a", class_="base-card__full-link")["href"].split("?")[0],
+            }
+        )
+    return records
+
+
+def glassdoor_baseline(page: str) -> list:
+    # The pre-extraction-layer scraper: full lxml-backed soup, then CSS select_one fallbacks per card
+    soup = BeautifulSoup(page, "lxml")
+    records = []
+    for card in soup.select('li[data-test="jobListing"], article[data-test="jobListing"]'):
+        title = card.select_one('a[data-test="job-link"]') or card.select_one('div[id^="job-title"]')
+        company = card.select_one('div[data-test="employer-name"]') or card.select_one('div[class*="employer"] span')
+        location = card.select_one('div[data-test="location"]') or card.select_one('div[class*="location"]')
+        if not (title and title.has_attr("href")):
+            continue
+        records.append(
+            {
+                "title": title.text.strip(),
+                "company": company.text.strip() if company else "N/A",
+                "location": location.text.strip() if location else "N/A",
+                "link": f"https://www.glassdoor.com{title['href'].strip()}",
+            }
+        )
+    return records
+
+
+BASELINES = {"linkedin": linkedin_baseline, "glassdoor": glassdoor_baseline}
+
+
+def best_of(func, page: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(page)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'source':<10} {'parser':<10} {'records':>8} {'best ms':>9} {'speedup':>8}")
+    for source, path in PAGES.items():
+        page = path.read_text(encoding="utf-8")
+        expected = BASELINES[source](page)
+        baseline_ms = best_of(BASELINES[source], page, args.repeat)
+        print(f"{source:<10} {'baseline':<10} {len(expected):>8} {baseline_ms:>9.2f} {1:>7.1f}x")
+        records = EXTRACTORS[source](page)
+        if records != expected:
+            raise SystemExit(f"{source}/lxml extracted different records than the baseline")
+        lxml_ms = best_of(EXTRACTORS[source], page, args.repeat)
+        print(f"{source:<10} {'lxml':<10} {len(records):>8} {lxml_ms:>9.2f} {baseline_ms / lxml_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare the BM25 ranker against keyword_matching_fallback on synthetic jobs.
+
+Runs fully offline:
+
+    python -m benchmarks.bench_ranking [--sizes 100,1000,10000] [--repeat 5]
+"""
+import argparse
+import random
+import time
+
+from app.models.listing import Listing
+from app.models.schemas import JobSearchRequest
+from app.services.llm_service import keyword_matching_fallback
+from app.services.ranking import local_relevance_filter
+
+TITLES = [
+    "Frontend Developer", "Senior React Engineer", "Backend Engineer (Python)", "Data Scientist",
+    "DevOps Engineer", "Full Stack Developer", "Mobile Developer (Flutter)", "QA Automation Engineer",
+    "Machine Learning Engineer", "UI/UX Designer", "Java Developer", "Node.js Developer",
+]
+COMPANIES = ["Systems Ltd", "Arbisoft", "10Pearls", "Netsol", "Techlogix", "Careem", "Motive", "Tkxel"]
+LOCATIONS = ["Lahore, Pakistan", "Karachi, Pakistan", "Islamabad, Pakistan", "Remote", "Dubai, UAE"]
+
+REQUEST = JobSearchRequest(
+    position="Frontend Developer",
+    experience="2 years",
+    location="Lahore, Pakistan",
+    skills="ReactJS, HTML, CSS, JavaScript",
+)
+# Keyword scan cost grows with the number of skills, BM25 scoring does not
+BROAD_REQUEST = REQUEST.model_copy(
+    update={
+        "skills": ", ".join(
+            "ReactJS HTML CSS JavaScript TypeScript Redux Next.js Vue Angular Sass Tailwind Webpack Vite Jest "
+            "Cypress GraphQL REST Node.js Express Python Django Flask Docker Kubernetes AWS GCP Azure SQL "
+            "PostgreSQL MongoDB".split()
+        )
+    }
+)
+
+
+def make_jobs(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        Listing(
+            job_title=f"{rng.choice(TITLES)} {rng.choice(['', 'I', 'II', '- React', '- HTML/CSS'])}".strip(),
+            company=rng.choice(COMPANIES),
+            experience="Not specified",
+            location=rng.choice(LOCATIONS),
+            apply_link=f"https://example.com/jobs/{i}",
+            source="Benchmark",
+        )
+        for i in range(count)
+    ]
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sizes = [int(value) for value in args.sizes.split(",")]
+    for label, request in (("4 skills", REQUEST), ("30 skills", BROAD_REQUEST)):
+        print(f"\n[{label}]")
+        print(f"{'jobs':>8} {'keyword ms':>12} {'bm25 ms':>10} {'top-10 overlap':>15}")
+        for size in sizes:
+            jobs = make_jobs(size)
+            keyword_ms = best_of(lambda: keyword_matching_fallback(request, jobs), args.repeat)
+            bm25_ms = best_of(lambda: local_relevance_filter(request, jobs), args.repeat)
+            keyword_top = {job.apply_link for job in keyword_matching_fallback(request, jobs)[:10]}
+            bm25_top = {job.apply_link for job in local_relevance_filter(request, jobs)[:10]}
+            overlap = len(keyword_top & bm25_top)
+            print(f"{size:>8} {keyword_ms:>12.2f} {bm25_ms:>10.2f} {overlap:>12}/10")
+
+
+if __name__ == "__main__":
+    main()
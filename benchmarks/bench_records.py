@@ -0,0 +1,120 @@
+"""
+Cost of carrying listings through a search as pydantic JobListings vs. slotted Listings.
+
+For each size, builds that many listings from parsed result-page cards, writes
+the LLM prompt's job list for them and encodes them as a /search-jobs response,
+once the way the API used to (validated JobListing, a dict per listing for the
+prompt, the response model re-validated and dumped by pydantic) and once the
+way it does now (Listing, cached prompt fields, plain data encoded by orjson).
+Also reports the memory the built listings take. Runs fully offline:
+
+    python -m benchmarks.bench_records [--sizes 100,1000,10000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+import orjson
+
+from app.models.listing import Listing
+from app.models.schemas import JobListing, JobSearchResponse
+from app.services.llm_service import _listings_json
+
+TITLES = [
+    "Frontend Developer", "Senior React Engineer", "Backend Engineer (Python)", "Data Scientist",
+    "DevOps Engineer", "Full Stack Developer", "Mobile Developer (Flutter)", "QA Automation Engineer",
+]
+COMPANIES = ["Systems Ltd", "Arbisoft", "10Pearls", "Netsol", "Techlogix", "Careem", "Motive", "Tkxel"]
+LOCATIONS = ["Lahore, Pakistan", "Karachi, Pakistan", "Islamabad, Pakistan", "Remote", "Dubai, UAE"]
+
+
+def make_cards(count: int, seed: int = 7):
+    # Strings come out of the parser as fresh objects per card, as they do from lxml
+    rng = random.Random(seed)
+    return [
+        {
+            "title": "".join(rng.choice(TITLES)),
+            "company": "".join(rng.choice(COMPANIES)),
+            "location": "".join(rng.choice(LOCATIONS)),
+            "link": f"https://www.linkedin.com/jobs/view/{i}",
+        }
+        for i in range(count)
+    ]
+
+
+def build(cls, cards):
+    return [
+        cls(
+            job_title=card["title"], company=card["company"], experience="Not specified", jobNature="Not specified",
+            location=card["location"], salary="Not specified", apply_link=card["link"], source="".join("LinkedIn"),
+        )
+        for card in cards
+    ]
+
+
+def old_prompt(jobs):
+    payload = [
+        {
+            "job_number": idx, "title": job.job_title, "company": job.company, "experience": job.experience,
+            "location": job.location, "job_nature": job.jobNature or "Not specified",
+        }
+        for idx, job in enumerate(jobs, 1)
+    ]
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def old_response(jobs):
+    # FastAPI validated the returned model against response_model again before dumping it
+    response = JobSearchResponse(relevant_jobs=jobs, sources=[])
+    return JobSearchResponse.model_validate(response.model_dump()).model_dump_json()
+
+
+def new_response(jobs):
+    return orjson.dumps({"relevant_jobs": [job.to_dict() for job in jobs], "sources": []})
+
+
+def best_of(func, repeat: int, setup=None) -> float:
+    timings = []
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def built_bytes(cls, cards) -> int:
+    tracemalloc.start()
+    jobs = build(cls, cards)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del jobs
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'jobs':>8} {'record':>10} {'build ms':>10} {'prompt ms':>10} {'response ms':>12} {'bytes/job':>10}")
+    for size in [int(value) for value in args.sizes.split(",")]:
+        cards = make_cards(size)
+        for label, cls, prompt, respond in (
+            ("JobListing", JobListing, old_prompt, old_response),
+            ("Listing", Listing, _listings_json, new_response),
+        ):
+            jobs = build(cls, cards)
+            build_ms = best_of(lambda: build(cls, cards), args.repeat)
+            # Listings cache their prompt fields, so every run gets fresh ones
+            prompt_ms = best_of(prompt, args.repeat, setup=lambda: build(cls, cards))
+            response_ms = best_of(lambda: respond(jobs), args.repeat)
+            per_job = built_bytes(cls, cards) / size
+            print(f"{size:>8} {label:>10} {build_ms:>10.2f} {prompt_ms:>10.2f} {response_ms:>12.2f} {per_job:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
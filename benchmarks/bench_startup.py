@@ -0,0 +1,110 @@
+"""
+Startup time of the API: how long a fresh worker takes before it serves traffic.
+
+Starts `uvicorn app.main:app` in a child process --runs times and measures,
+from process start, when GET / first answers (time to first request) and,
+when the app reports it in /stats, when its background warm-up has finished.
+Also times a bare `import app.main` in a fresh interpreter. Runs offline:
+
+    python -m benchmarks.bench_startup [--runs 5] [--port 8792] [--env PARSE_WORKERS=0]
+
+--env sets an environment variable for the app and can be repeated.
+"""
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+
+def app_env(overrides: List[str]) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({"CRAWLER_ENABLED": "false", "LOG_LEVEL": "WARNING"})
+    for override in overrides:
+        name, _, value = override.partition("=")
+        env[name] = value
+    return env
+
+
+def import_seconds(env: Dict[str, str]) -> float:
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", IMPORT_SNIPPET], env=env, capture_output=True, text=True, check=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(port: int, env: Dict[str, str], timeout: float = 60.0) -> Dict[str, Optional[float]]:
+    """
+    Seconds from spawning the server to its first answered request and to the end of its warm-up.
+    """
+    url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, "-W", "ignore", "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    ready = warm = None
+    try:
+        with httpx.Client(timeout=5.0) as client:
+            while ready is None:
+                if time.perf_counter() - started > timeout or child.poll() is not None:
+                    raise RuntimeError("The API did not come up")
+                try:
+                    client.get(f"{url}/")
+                    ready = time.perf_counter() - started
+                except httpx.TransportError:
+                    time.sleep(0.005)
+            while warm is None and time.perf_counter() - started < timeout:
+                warmup = client.get(f"{url}/stats").json().get("warmup")
+                if warmup is None:
+                    break
+                if warmup.get("done"):
+                    warm = time.perf_counter() - started
+                else:
+                    time.sleep(0.01)
+    finally:
+        # SIGINT lets uvicorn run the app's shutdown before exiting
+        child.send_signal(signal.SIGINT)
+        try:
+            child.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            child.kill()
+    return {"ready": ready, "warm": warm}
+
+
+def describe(values: List[float]) -> str:
+    return (
+        f"median {statistics.median(values) * 1000:.0f} ms"
+        f"  min {min(values) * 1000:.0f} ms  max {max(values) * 1000:.0f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8792)
+    parser.add_argument("--env", action="append", default=[], help="NAME=value for the app (repeatable)")
+    args = parser.parse_args()
+
+    env = app_env(args.env)
+    imports = [import_seconds(env) for _ in range(args.runs)]
+    runs = [measure_startup(args.port, env) for _ in range(args.runs)]
+
+    print(f"{args.runs} cold starts of app.main")
+    print(f"  import app.main:     {describe(imports)}")
+    print(f"  first request:       {describe([run['ready'] for run in runs])}")
+    warm = [run["warm"] for run in runs if run["warm"] is not None]
+    if warm:
+        print(f"  warm-up finished:    {describe(warm)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Deterministic stand-in for the Gemini model used by llm_service.
+
+Answers the relevance prompt the way the real model is asked to, a JSON
+array of job numbers (or, for the multi-candidate batch prompt, an object of
+such arrays per candidate number), by matching the words of the candidate's position and
+skills against each job title. The same prompt always gets the same answer.
+An optional latency (fixed plus per listed job) and error rate mimic the real
+API's cost and flakiness.
+"""
+import json
+import random
+import re
+import threading
+import time
+from typing import List
+
+_WORD = re.compile(r"[a-z0-9+#.]{2,}")
+_MINIMUM = re.compile(r"Select at least (\d+) jobs")
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """
+    Args:
+        latency: Seconds every call takes.
+        latency_per_job: Extra seconds per job in the prompt.
+        error_rate: Share of calls that raise, exercising the keyword fallback.
+        seed: Seed of the error random stream.
+    """
+
+    def __init__(self, latency: float = 0.0, latency_per_job: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.latency_per_job = latency_per_job
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _section(prompt: str, name: str):
+        # Each section is a header line followed by one line of compact JSON
+        lines = prompt[prompt.index(f"[{name}]"):].splitlines()
+        return json.loads(lines[1].strip())
+
+    @staticmethod
+    def select(profile: dict, listings: List[dict], minimum: int = 0) -> List[int]:
+        wanted = set(_WORD.findall(f"{profile.get('position', '')} {profile.get('skills', '')}".lower()))
+        selected = [
+            listing["job_number"]
+            for listing in listings
+            if wanted & set(_WORD.findall(str(listing.get("title", "")).lower()))
+        ]
+        # Pad to the minimum when the prompt asks for one
+        return selected or [listing["job_number"] for listing in listings[:minimum]]
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        listings = self._section(prompt, "JOB LISTINGS")
+        with self._lock:
+            self.calls += 1
+            failed = self._rng.random() < self.error_rate
+        time.sleep(self.latency + self.latency_per_job * len(listings))
+        if failed:
+            raise RuntimeError("Injected Gemini error")
+        asked = _MINIMUM.search(prompt)
+        minimum = int(asked.group(1)) if asked else 0
+        if "[CANDIDATE PROFILES]" in prompt:
+            return FakeResponse(json.dumps({
+                str(profile["candidate_number"]): self.select(profile, listings, minimum)
+                for profile in self._section(prompt, "CANDIDATE PROFILES")
+            }))
+        return FakeResponse(json.dumps(self.select(self._section(prompt, "CANDIDATE PROFILE"), listings, minimum)))
+
+
+def install(model: FakeGeminiModel) -> None:
+    """
+    Make llm_service send its prompts to `model` instead of Gemini.
+    """
+    from app.services import llm_service
+
+    llm_service.model = model
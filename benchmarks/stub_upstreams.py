@@ -0,0 +1,246 @@
+"""
+Local stand-ins for LinkedIn, ScraperAPI (Glassdoor) and the Apify API.
+
+Replays the saved pages (search results and job postings) and dataset in
+benchmarks/fixtures/ with configurable latency and injected errors, so the whole search pipeline can be load tested
+without touching the real services:
+
+    python -m benchmarks.stub_upstreams [--port 8790] [--latency-ms 150] [--jitter-ms 50]
+        [--latency-ms glassdoor=900] [--error-rate 0.02] [--error-status 503] [--pages 4]
+        [--tail-rate 0.02] [--tail-ms 10000]
+
+--latency-ms and --error-rate take either a plain value (every upstream) or
+upstream=value (linkedin, glassdoor, apify) and can be repeated. A --tail-rate
+share of responses takes an extra --tail-ms, to exercise hedged requests.
+Point the app at the stand-ins with:
+
+    LINKEDIN_GUEST_API_URL=http://127.0.0.1:8790/linkedin
+    LINKEDIN_JOB_POSTING_URL=http://127.0.0.1:8790/linkedin-posting
+    SCRAPERAPI_URL=http://127.0.0.1:8790/scraperapi
+    APIFY_API_URL=http://127.0.0.1:8790/apify
+
+GET /__stats returns request and injected error counts per upstream.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import uuid
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+FIXTURES = Path(__file__).parent / "fixtures"
+UPSTREAMS = ("linkedin", "glassdoor", "apify")
+EMPTY_PAGE = "<html><body></body></html>"
+# Job ids in the saved LinkedIn (10 digits) and Glassdoor (13 digits) links
+_JOB_ID = re.compile(r"\b\d{10,13}\b")
+
+
+def _per_upstream(values: List[str], default: float) -> Dict[str, float]:
+    settings = dict.fromkeys(UPSTREAMS, default)
+    for value in values:
+        name, _, number = value.rpartition("=")
+        if name:
+            settings[name] = float(number)
+        else:
+            settings = dict.fromkeys(UPSTREAMS, float(number))
+    return settings
+
+
+def _salt(*parts: str) -> int:
+    return zlib.crc32("|".join(parts).lower().encode()) % 1_000_000
+
+
+def _with_unique_ids(page: str, salt: int) -> str:
+    # Distinct queries and pages get distinct apply links, as they would upstream
+    return _JOB_ID.sub(lambda match: str(int(match.group(0)) + salt), page)
+
+
+def _run_payload(run_id: str) -> dict:
+    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    return {
+        "data": {
+            "id": run_id,
+            "actId": "stub-actor",
+            "userId": "stub-user",
+            "startedAt": now,
+            "finishedAt": now,
+            "status": "SUCCEEDED",
+            "meta": {"origin": "API"},
+            "stats": {},
+            "options": {"build": "latest", "timeoutSecs": 300, "memoryMbytes": 1024, "diskMbytes": 2048},
+            "buildId": "stub-build",
+            "defaultDatasetId": run_id,
+            "defaultKeyValueStoreId": run_id,
+            "defaultRequestQueueId": run_id,
+        }
+    }
+
+
+def create_app(
+    latency: Dict[str, float],
+    jitter: float,
+    error_rate: Dict[str, float],
+    error_status: int = 503,
+    pages: int = 4,
+    seed: int = 0,
+    tail_rate: float = 0.0,
+    tail: float = 0.0,
+) -> FastAPI:
+    """
+    Build the stand-in app.
+
+    Args:
+        latency: Mean response latency per upstream, in seconds.
+        jitter: Latency varies uniformly by up to this many seconds either way.
+        error_rate: Share of requests per upstream answered with error_status.
+        error_status: Status of injected errors; 429s carry Retry-After: 1.
+        pages: Result pages a LinkedIn/Glassdoor query has before running dry.
+        seed: Seed of the latency/error random stream.
+        tail_rate: Share of responses delayed by an extra `tail` seconds.
+        tail: Extra latency of the slow responses, in seconds.
+    """
+    app = FastAPI()
+    rng = random.Random(seed)
+    linkedin_page = (FIXTURES / "linkedin_search.html").read_text(encoding="utf-8")
+    glassdoor_page = (FIXTURES / "glassdoor_search.html").read_text(encoding="utf-8")
+    linkedin_posting = (FIXTURES / "linkedin_posting.html").read_text(encoding="utf-8")
+    glassdoor_job = (FIXTURES / "glassdoor_job.html").read_text(encoding="utf-8")
+    apify_items = json.loads((FIXTURES / "apify_indeed_items.json").read_text(encoding="utf-8"))
+    runs: Dict[str, dict] = {}
+    counts = {name: {"requests": 0, "errors": 0} for name in UPSTREAMS}
+
+    async def upstream_delay(name: str) -> Optional[Response]:
+        """
+        Sleep the upstream's latency; return an error response when one is injected.
+        """
+        counts[name]["requests"] += 1
+        delay = max(0.0, latency[name] + rng.uniform(-jitter, jitter))
+        if rng.random() < tail_rate:
+            delay += tail
+        await asyncio.sleep(delay)
+        if rng.random() < error_rate[name]:
+            counts[name]["errors"] += 1
+            headers = {"Retry-After": "1"} if error_status == 429 else None
+            return PlainTextResponse("injected error", status_code=error_status, headers=headers)
+        return None
+
+    @app.get("/__stats")
+    async def stats():
+        return counts
+
+    @app.get("/linkedin")
+    async def linkedin(keywords: str = "", location: str = "", start: int = 0):
+        error = await upstream_delay("linkedin")
+        if error is not None:
+            return error
+        if start >= pages * 25:
+            return Response(EMPTY_PAGE, media_type="text/html")
+        page = _with_unique_ids(linkedin_page, _salt(keywords, location, str(start)))
+        return Response(page, media_type="text/html")
+
+    @app.get("/linkedin-posting/{job_id}")
+    async def linkedin_posting_page(job_id: str):
+        error = await upstream_delay("linkedin")
+        if error is not None:
+            return error
+        return Response(linkedin_posting, media_type="text/html")
+
+    @app.get("/scraperapi")
+    async def scraperapi(url: str = ""):
+        error = await upstream_delay("glassdoor")
+        if error is not None:
+            return error
+        if "/job-listing/" in url:
+            return Response(glassdoor_job, media_type="text/html")
+        query = parse_qs(urlparse(url).query)
+        page_number = int(query.get("p", ["1"])[0])
+        if page_number > pages:
+            return Response(EMPTY_PAGE, media_type="text/html")
+        keyword = query.get("sc.keyword", [""])[0]
+        page = _with_unique_ids(glassdoor_page, _salt(keyword, str(page_number)))
+        return Response(page, media_type="text/html")
+
+    # apify-client 1.x calls the collection "acts", newer releases "actors"
+    @app.post("/apify/v2/acts/{actor_id}/runs")
+    @app.post("/apify/v2/actors/{actor_id}/runs")
+    async def start_run(actor_id: str, request: Request):
+        error = await upstream_delay("apify")
+        if error is not None:
+            return error
+        run_input = json.loads(await request.body() or b"{}")
+        run_id = uuid.uuid4().hex
+        runs[run_id] = run_input
+        return JSONResponse(_run_payload(run_id), status_code=201)
+
+    @app.get("/apify/v2/actor-runs/{run_id}")
+    async def get_run(run_id: str):
+        return _run_payload(run_id)
+
+    @app.get("/apify/v2/actor-runs/{run_id}/log")
+    async def get_log(run_id: str):
+        return PlainTextResponse("")
+
+    @app.get("/apify/v2/datasets/{dataset_id}/items")
+    async def dataset_items(dataset_id: str, offset: int = 0, limit: int = 0):
+        error = await upstream_delay("apify")
+        if error is not None:
+            return error
+        run_input = runs.get(dataset_id, {})
+        total = min(int(run_input.get("maxItems") or len(apify_items)), len(apify_items))
+        salt = _salt(str(run_input.get("position", "")), str(run_input.get("location", "")))
+        end = min(total, offset + limit) if limit else total
+        items = [
+            {**item, "url": f"{item['url']}{salt:06d}"}
+            for item in apify_items[offset:end]
+        ]
+        headers = {
+            "x-apify-pagination-total": str(total),
+            "x-apify-pagination-offset": str(offset),
+            "x-apify-pagination-count": str(len(items)),
+            "x-apify-pagination-limit": str(limit or 999999999999),
+            "x-apify-pagination-desc": "false",
+        }
+        return JSONResponse(items, headers=headers)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency-ms", action="append", default=[], help="ms, or upstream=ms (repeatable)")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", action="append", default=[], help="0-1, or upstream=rate (repeatable)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tail-rate", type=float, default=0.0)
+    parser.add_argument("--tail-ms", type=float, default=10000.0)
+    args = parser.parse_args()
+
+    latency = {name: ms / 1000 for name, ms in _per_upstream(args.latency_ms, 150.0).items()}
+    app = create_app(
+        latency,
+        args.jitter_ms / 1000,
+        _per_upstream(args.error_rate, 0.0),
+        error_status=args.error_status,
+        pages=args.pages,
+        seed=args.seed,
+        tail_rate=args.tail_rate,
+        tail=args.tail_ms / 1000,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
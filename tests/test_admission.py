@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.admission import (
+    MAX_RETRY_AFTER,
+    MIN_RETRY_AFTER,
+    PRIORITY_BACKGROUND,
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    AdmissionRejected,
+    Gate,
+    admission,
+)
+
+
+async def _queue(gate: Gate, priority: int, served: list, name: str) -> None:
+    with await gate.acquire(priority):
+        served.append(name)
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def scenario():
+        gate = Gate("test", 1)
+        served = []
+        permit = await gate.acquire(PRIORITY_INTERACTIVE)
+        tasks = []
+        for priority, name in [
+            (PRIORITY_BACKGROUND, "background"),
+            (PRIORITY_BATCH, "batch"),
+            (PRIORITY_INTERACTIVE, "interactive-1"),
+            (PRIORITY_INTERACTIVE, "interactive-2"),
+        ]:
+            tasks.append(asyncio.ensure_future(_queue(gate, priority, served, name)))
+            await asyncio.sleep(0)
+        assert gate.stats()["queued"] == 4
+        permit.release()
+        await asyncio.gather(*tasks)
+        return served, gate.stats()
+
+    served, stats = asyncio.run(scenario())
+    assert served == ["interactive-1", "interactive-2", "batch", "background"]
+    assert stats["active"] == 0 and stats["queued"] == 0
+
+
+def test_full_queue_rejects_with_429():
+    async def scenario():
+        gate = Gate("test", 1, queue_size=1)
+        permit = await gate.acquire(PRIORITY_INTERACTIVE)
+        waiting = asyncio.ensure_future(gate.acquire(PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await gate.acquire(PRIORITY_INTERACTIVE)
+        permit.release()
+        (await waiting).release()
+        return rejected.value, gate
+
+    rejected, gate = asyncio.run(scenario())
+    assert rejected.status_code == 429
+    assert rejected.retry_after == MIN_RETRY_AFTER
+    assert gate.rejected == 1 and gate.active == 0
+
+
+def test_higher_priority_sheds_the_newest_lowest_waiter():
+    async def scenario():
+        gate = Gate("test", 1, queue_size=2)
+        permit = await gate.acquire(PRIORITY_INTERACTIVE)
+        older = asyncio.ensure_future(gate.acquire(PRIORITY_BACKGROUND))
+        await asyncio.sleep(0)
+        newer = asyncio.ensure_future(gate.acquire(PRIORITY_BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(gate.acquire(PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as shed:
+            await newer
+        permit.release()
+        (await interactive).release()
+        (await older).release()
+        return shed.value
+
+    shed = asyncio.run(scenario())
+    assert shed.status_code == 429
+
+
+def test_no_slot_in_time_rejects_with_503():
+    async def scenario():
+        gate = Gate("test", 1, queue_timeout=0.01)
+        permit = await gate.acquire(PRIORITY_INTERACTIVE)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await gate.acquire(PRIORITY_INTERACTIVE)
+        stats = gate.stats()
+        permit.release()
+        return rejected.value, stats
+
+    rejected, stats = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert rejected.retry_after >= MIN_RETRY_AFTER
+    # The timed-out waiter left the queue
+    assert stats["queued"] == 0
+
+
+@pytest.mark.parametrize("held, expected", [(10.0, 5), (0.01, MIN_RETRY_AFTER), (1000.0, MAX_RETRY_AFTER)])
+def test_retry_after_follows_how_long_slots_are_held(held, expected):
+    async def scenario():
+        gate = Gate("test", 2, queue_size=0)
+        await gate.acquire(PRIORITY_INTERACTIVE)
+        gate.release(held)
+        await gate.acquire(PRIORITY_INTERACTIVE)
+        await gate.acquire(PRIORITY_INTERACTIVE)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await gate.acquire(PRIORITY_INTERACTIVE)
+        return rejected.value
+
+    # Two slots each held `held` seconds: the queue drains in held / 2, clamped
+    assert asyncio.run(scenario()).retry_after == expected
+
+
+def test_rejected_search_gets_retry_after_header(monkeypatch):
+    from app.main import app
+
+    # A search that held the only slot for 7s has finished; another holds it now and nothing may queue
+    saturated = Gate("search", 1, queue_size=0)
+    saturated.active = 2
+    saturated.release(7.0)
+    monkeypatch.setattr(admission, "enabled", True)
+    monkeypatch.setattr(admission, "searches", saturated)
+
+    response = TestClient(app).post(
+        "/search-jobs",
+        json={"position": "Java Developer", "experience": "2 years", "skills": "Java", "location": "Lahore, Pakistan"},
+    )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
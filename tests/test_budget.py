@@ -0,0 +1,135 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from app.models.listing import Listing
+from app.models.schemas import JobSearchRequest
+from app.services import orchestrator
+from app.services.budget import SearchBudget
+from app.services.cache import SourceResultCache
+from app.services.sources import REGISTRY, SourcePlugin
+
+# Upstream fetches made by the fake sources, by source name
+calls: List[str] = []
+
+
+async def _fake_fetch(
+    request: JobSearchRequest, max_jobs: int, max_pages: int, budget: Optional[SearchBudget] = None, source: str = ""
+) -> List[Listing]:
+    await asyncio.sleep(0.05)
+    jobs = [
+        Listing(
+            job_title=f"{request.position} {i}",
+            company=f"{source} company {i}",
+            experience="Not specified",
+            location=request.location,
+            apply_link=f"https://{source}.example.com/jobs/{i}",
+            source=source,
+        )
+        for i in range(max_jobs)
+    ]
+    # Real sources report every page to the search budget as it arrives
+    if budget is not None:
+        budget.add(len(jobs))
+    return jobs
+
+
+async def fetch_cheap(request, max_jobs, max_pages, budget=None):
+    calls.append("cheap")
+    return await _fake_fetch(request, max_jobs, max_pages, budget, "cheap")
+
+
+async def fetch_paid(request, max_jobs, max_pages, budget=None):
+    calls.append("paid")
+    return await _fake_fetch(request, max_jobs, max_pages, budget, "paid")
+
+
+def _plugin(name: str, cost: str) -> SourcePlugin:
+    return SourcePlugin(
+        name=name,
+        module=__name__,
+        function=f"fetch_{name}",
+        capabilities=frozenset({"title", "company", "location"}),
+        cost=cost,
+        latency="fast",
+        page_size=10,
+        default_items=5,
+        max_items=50,
+        cache_fields=["position", "location"],
+    )
+
+
+@pytest.fixture(autouse=True)
+def sources(monkeypatch):
+    calls.clear()
+    monkeypatch.setitem(REGISTRY, "cheap", _plugin("cheap", "free"))
+    monkeypatch.setitem(REGISTRY, "paid", _plugin("paid", "paid"))
+    monkeypatch.setattr(orchestrator, "SOURCE_CACHE_ENABLED", True)
+    monkeypatch.setattr(orchestrator, "source_cache", SourceResultCache(64))
+    return REGISTRY
+
+
+def _request(**fields) -> JobSearchRequest:
+    return JobSearchRequest(
+        position="Java Developer", experience="2 years", skills="Java", location="Lahore, Pakistan", **fields
+    )
+
+
+def test_search_joining_a_shared_fetch_counts_it_against_its_budget():
+    async def scenario():
+        plugin = REGISTRY["cheap"]
+        budget = SearchBudget(5)
+        leader = asyncio.ensure_future(orchestrator._fetch_source(plugin, _request()))
+        await asyncio.sleep(0)
+        joined, cached = await orchestrator._fetch_source(plugin, _request(), budget)
+        return (await leader)[0], joined, cached, budget
+
+    shared, joined, cached, budget = asyncio.run(scenario())
+    assert calls == ["cheap"]
+    assert orchestrator.source_cache.coalesced == 1
+    assert len(joined) == len(shared) == 5 and not cached
+    assert budget.collected == 5 and budget.satisfied
+
+
+def test_budgeted_fetches_are_not_shared():
+    async def scenario():
+        plugin = REGISTRY["cheap"]
+        budgets = [SearchBudget(5), SearchBudget(5)]
+        await asyncio.gather(*(orchestrator._fetch_source(plugin, _request(), budget) for budget in budgets))
+        return budgets
+
+    budgets = asyncio.run(scenario())
+    # Either search's fetch may be cut short by its own budget, so neither waits on the other's
+    assert calls == ["cheap", "cheap"]
+    assert orchestrator.source_cache.coalesced == 0
+    assert [budget.collected for budget in budgets] == [5, 5]
+
+
+def test_cache_hit_counts_against_budget():
+    async def scenario():
+        plugin = REGISTRY["cheap"]
+        await orchestrator._fetch_source(plugin, _request())
+        budget = SearchBudget(5)
+        jobs, cached = await orchestrator._fetch_source(plugin, _request(), budget)
+        return jobs, cached, budget
+
+    jobs, cached, budget = asyncio.run(scenario())
+    assert calls == ["cheap"]
+    assert cached and len(jobs) == 5
+    assert budget.collected == 5
+
+
+def test_dearer_tier_is_skipped_once_a_shared_fetch_fills_the_budget():
+    async def scenario():
+        # An unbudgeted search starts the cheap fetch; the budgeted one joins it
+        leader = asyncio.ensure_future(orchestrator._fetch_source(REGISTRY["cheap"], _request()))
+        await asyncio.sleep(0)
+        result = await orchestrator.fetch_all_sources(_request(sources=["cheap", "paid"], max_results=5))
+        await leader
+        return result
+
+    jobs, statuses = asyncio.run(scenario())
+    assert calls == ["cheap"]
+    assert len(jobs) == 5
+    assert [(status.source, status.status) for status in statuses] == [("cheap", "ok"), ("paid", "skipped")]
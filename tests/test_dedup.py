@@ -0,0 +1,71 @@
+import pytest
+
+from app.models.listing import Listing
+from app.services.dedup import canonical_url, deduplicate_jobs
+
+
+def _listing(title: str, company: str, apply_link: str, source: str = "LinkedIn", location: str = "Lahore, Pakistan") -> Listing:
+    return Listing(
+        job_title=title,
+        company=company,
+        experience="2 years",
+        location=location,
+        apply_link=apply_link,
+        source=source,
+    )
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        # Tracking query strings and www. are dropped, the host is lowercased
+        ("https://www.Glassdoor.com/job-listing/java-dev/?utm_source=x&src=GD", "glassdoor.com/job-listing/java-dev"),
+        # Posting ids carried in the query survive, in a stable order
+        ("https://www.glassdoor.com/partner/jobListing.htm?pos=101&jl=1009&ao=1", "glassdoor.com/partner/jobListing.htm?jl=1009"),
+        ("https://pk.indeed.com/viewjob?from=serp&jk=abc123&tk=1", "pk.indeed.com/viewjob?jk=abc123"),
+        # LinkedIn country subdomains and title slugs fold to the posting id
+        ("https://pk.linkedin.com/jobs/view/java-developer-at-acme-3912345678?refId=x&trk=y", "linkedin.com/jobs/view/3912345678"),
+        ("https://www.linkedin.com/jobs/view/3912345678/", "linkedin.com/jobs/view/3912345678"),
+        ("", ""),
+        ("   ", ""),
+    ],
+)
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_same_posting_on_different_links_is_merged():
+    jobs = [
+        _listing("Java Developer", "Acme", "https://pk.linkedin.com/jobs/view/java-developer-at-acme-3912345678?trk=a"),
+        _listing("Senior Java Engineer", "Acme", "https://www.linkedin.com/jobs/view/3912345678/", source="Glassdoor"),
+    ]
+
+    deduplicated = deduplicate_jobs(jobs)
+
+    assert len(deduplicated) == 1
+    assert deduplicated[0].job_title == "Java Developer"
+    assert deduplicated[0].sources == ("LinkedIn", "Glassdoor")
+
+
+def test_listings_without_apply_link_are_not_merged_on_the_empty_link():
+    jobs = [
+        _listing("Java Developer", "Acme", ""),
+        _listing("Data Analyst", "Globex", ""),
+        _listing("Product Designer", "Initech", "   ", source="Glassdoor"),
+    ]
+
+    assert [job.job_title for job in deduplicate_jobs(jobs)] == ["Java Developer", "Data Analyst", "Product Designer"]
+
+
+def test_listings_without_apply_link_still_merge_on_similarity():
+    jobs = [
+        _listing("Java Developer", "Acme", ""),
+        _listing("Data Analyst", "Globex", "https://www.glassdoor.com/partner/jobListing.htm?jl=1"),
+        _listing("Java Developer", "Acme", "https://pk.indeed.com/viewjob?jk=abc", source="Indeed (via Apify)"),
+    ]
+
+    deduplicated = deduplicate_jobs(jobs)
+
+    assert [job.job_title for job in deduplicated] == ["Java Developer", "Data Analyst"]
+    assert deduplicated[0].apply_link == ""
+    assert deduplicated[0].sources == ("LinkedIn", "Indeed (via Apify)")